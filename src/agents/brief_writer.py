@@ -1,15 +1,10 @@
 # src/agents/brief_writer.py
 
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-import os
-from dotenv import load_dotenv
 import json
+from typing import Dict, List, Optional
 
-# Load environment variables
-load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+from src.agents.runtime import arun_prompt, run_batch, run_prompt
+from src.analyzers.vector_index import grounding_context
 
 # Prompt Template
 brief_prompt = """
@@ -23,30 +18,15 @@ You are a senior content strategist. Based on the topic: "{title}" and the descr
   "cta": "<Call to Action>"
 }}
 
-Only return the JSON. No additional commentary.
+{context}Only return the JSON. No additional commentary.
 """
 
-def generate_brief(title: str, description: str, model_name="gpt-4o-mini"):
-    #print("generate_brief called")
-    #print(f"DEBUG: Title and Description passed are:\nTitle: {title}\nDescription: {description}")
-
-    prompt_template = PromptTemplate(
-        input_variables=["title", "description"],
-        template=brief_prompt
-    )
-
-    llm = ChatOpenAI(
-        openai_api_key=OPENAI_API_KEY,
-        model=model_name,
-        temperature=0.7
-    )
-
-    chain = LLMChain(llm=llm, prompt=prompt_template)
-    #print("DEBUG: Calling chain.run...")
+def _brief_variables(title: str, description: str, related_items: int = 0) -> Dict[str, str]:
+    context = grounding_context(f"{title}. {description}", k=related_items) if related_items else ""
+    return {"title": title, "description": description, "context": context}
 
-    raw_response = chain.run(title=title, description=description)
-    #raw_response = chain.invoke({"title": title, "description": description})
 
+def _parse_brief(raw_response: str):
     #print("DEBUG: Raw response received:", raw_response)
 
     #brief = json.loads(raw_response.strip().strip("```").strip("json").strip())
@@ -60,3 +40,59 @@ def generate_brief(title: str, description: str, model_name="gpt-4o-mini"):
         return raw_response.strip()
 
     return brief
+
+
+def generate_brief(title: str, description: str, model_name="gpt-4o-mini", related_items: int = 0,
+                   use_cache: bool = True):
+    """
+    Write a structured content brief for a topic.
+
+    Args:
+        title (str): Topic title
+        description (str): Topic description
+        model_name (str): OpenAI chat model
+        related_items (int): Number of similar already-collected items to ground the prompt with (0 = none)
+        use_cache (bool): Return a cached brief for the same prompt; False writes a new one
+
+    Returns:
+        dict | str: Parsed brief, or the raw response if it isn't valid JSON
+    """
+    #print("generate_brief called")
+    #print(f"DEBUG: Title and Description passed are:\nTitle: {title}\nDescription: {description}")
+
+    raw_response = run_prompt(brief_prompt, _brief_variables(title, description, related_items),
+                              model_name=model_name, temperature=0.7, stage="brief", use_cache=use_cache)
+    return _parse_brief(raw_response)
+
+
+async def agenerate_brief(title: str, description: str, model_name="gpt-4o-mini", related_items: int = 0,
+                          use_cache: bool = True):
+    """Async version of generate_brief."""
+    raw_response = await arun_prompt(brief_prompt, _brief_variables(title, description, related_items),
+                                     model_name=model_name, temperature=0.7, stage="brief", use_cache=use_cache)
+    return _parse_brief(raw_response)
+
+
+def generate_briefs(topics: List[dict], model_name="gpt-4o-mini", related_items: int = 0,
+                    max_concurrency: Optional[int] = None, use_cache: bool = True) -> List[Dict]:
+    """
+    Write briefs for several topics concurrently.
+
+    Args:
+        topics (List[dict]): Topics with "title" and "description"
+        model_name (str): OpenAI chat model
+        related_items (int): Number of similar already-collected items to ground each prompt with (0 = none)
+        max_concurrency (int): Requests in flight at once (default LLM_MAX_CONCURRENCY)
+        use_cache (bool): Return cached briefs for the same prompts; False writes new ones
+
+    Returns:
+        List[Dict]: One {"result": brief, "error": str | None} per topic, in input order
+    """
+    # Grounding runs the local embedding model, so prompts are prepared here rather than on the event loop
+    variables = [_brief_variables(topic["title"], topic["description"], related_items) for topic in topics]
+
+    async def _job(values):
+        return _parse_brief(await arun_prompt(brief_prompt, values, model_name=model_name, temperature=0.7,
+                                                stage="brief", use_cache=use_cache))
+
+    return run_batch([lambda values=values: _job(values) for values in variables], max_concurrency)
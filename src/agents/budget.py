@@ -0,0 +1,195 @@
+# src/agents/budget.py
+
+"""
+Token budgeting for prompts.
+
+Tokens are counted with tiktoken for the target model. Keyword lists are ranked by
+TF-IDF weight and trimmed to a token budget before they are rendered into the topic
+prompt, and drafts that are too long to polish in one call are split into chunks on
+section and paragraph boundaries. If the tiktoken encoding can't be loaded (it is
+downloaded on first use), counts fall back to an estimate of four characters per token.
+"""
+
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Tokens the joined keyword list may take in the topic prompt
+TOPIC_KEYWORD_BUDGET = int(os.getenv("TOPIC_KEYWORD_BUDGET", 200))
+# Drafts longer than this are polished in chunks of at most this many tokens
+POLISH_CHUNK_TOKENS = int(os.getenv("POLISH_CHUNK_TOKENS", 3000))
+
+# Context window per model; prompts that can't fit are rejected before the request is sent
+MODEL_CONTEXT_TOKENS = {
+    "gpt-4o-mini": 128_000,
+    "gpt-4o": 128_000,
+    "gpt-4-turbo": 128_000,
+    "gpt-4": 8_192,
+    "gpt-3.5-turbo": 16_385,
+}
+DEFAULT_CONTEXT_TOKENS = 16_385
+# Room left for the response when checking a prompt against the context window
+RESPONSE_RESERVE_TOKENS = int(os.getenv("RESPONSE_RESERVE_TOKENS", 4000))
+
+_HEADING = re.compile(r"^#{1,6}\s", re.MULTILINE)
+
+
+_encodings = {}
+
+
+def _encoding(model_name: str):
+    # Loaded once per model; None (and estimated counts) if the encoding can't be loaded
+    if model_name not in _encodings:
+        try:
+            import tiktoken
+            try:
+                _encodings[model_name] = tiktoken.encoding_for_model(model_name)
+            except KeyError:
+                _encodings[model_name] = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            print(f"Warning: tiktoken encoding for {model_name} unavailable ({type(e).__name__}). Estimating token counts.")
+            _encodings[model_name] = None
+    return _encodings[model_name]
+
+
+def count_tokens(text: str, model_name: str = "gpt-4o-mini") -> int:
+    """Number of tokens text encodes to for a model."""
+    if not text:
+        return 0
+    encoding = _encoding(model_name)
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def context_window(model_name: str) -> int:
+    """Context window of a model (longest matching name prefix, or DEFAULT_CONTEXT_TOKENS)."""
+    matches = [name for name in MODEL_CONTEXT_TOKENS if model_name.startswith(name)]
+    return MODEL_CONTEXT_TOKENS[max(matches, key=len)] if matches else DEFAULT_CONTEXT_TOKENS
+
+
+def check_prompt(rendered_prompt: str, model_name: str = "gpt-4o-mini") -> int:
+    """
+    Count a rendered prompt's tokens and make sure it leaves room for the response.
+
+    Returns:
+        int: Prompt tokens
+
+    Raises:
+        ValueError: If the prompt doesn't fit in the model's context window
+    """
+    tokens = count_tokens(rendered_prompt, model_name)
+    limit = context_window(model_name) - RESPONSE_RESERVE_TOKENS
+    if tokens > limit:
+        raise ValueError(f"Prompt is {tokens} tokens; {model_name} allows {limit} with room for the response.")
+    return tokens
+
+
+def keyword_weights(keywords: Iterable[str], df=None) -> Dict[str, float]:
+    """
+    TF-IDF weight of each keyword across the analyzed content.
+
+    Term frequency is how many analyzed rows list the keyword in top_keywords; IDF comes from the
+    TF-IDF model saved by the last analysis run (batch vectorizer or the streaming IncrementalTfidf).
+
+    Args:
+        keywords (Iterable[str]): Keywords to weight
+        df (pd.DataFrame): Analyzed data with a top_keywords column (optional)
+
+    Returns:
+        Dict[str, float]: Keyword -> weight (1.0 for every keyword when nothing is known)
+    """
+    import numpy as np
+    from src.analyzers.clustering import load_model
+
+    keywords = list(dict.fromkeys(keywords))
+    counts = dict.fromkeys(keywords, 1)
+    if df is not None and "top_keywords" in df:
+        wanted = set(keywords)
+        for row in df["top_keywords"]:
+            for keyword in set(row or []) & wanted:
+                counts[keyword] += 1
+
+    idf = {}
+    vectorizer = load_model("tfidf_vectorizer")
+    if vectorizer is not None and hasattr(vectorizer, "idf_"):
+        idf = {k: float(vectorizer.idf_[vectorizer.vocabulary_[k]]) for k in keywords if k in vectorizer.vocabulary_}
+    else:
+        incremental = load_model("tfidf_incremental")
+        if incremental is not None and incremental.n_docs:
+            idf = {
+                k: float(np.log((1 + incremental.n_docs) / (1 + incremental.doc_freq[k])) + 1)
+                for k in keywords if k in incremental.doc_freq
+            }
+
+    return {keyword: counts[keyword] * idf.get(keyword, 1.0) for keyword in keywords}
+
+
+def fit_keywords(keywords: List[str], budget: int = TOPIC_KEYWORD_BUDGET, weights: Optional[Dict[str, float]] = None,
+                 model_name: str = "gpt-4o-mini") -> List[str]:
+    """
+    Highest-weighted keywords whose comma-joined list fits in a token budget.
+
+    Args:
+        keywords (List[str]): Candidate keywords
+        budget (int): Tokens the joined list may take
+        weights (Dict[str, float]): Ranking weights, e.g. from keyword_weights (default: keep input order)
+        model_name (str): Model whose tokenizer is used
+
+    Returns:
+        List[str]: Kept keywords, highest weight first
+    """
+    keywords = list(dict.fromkeys(keywords))
+    if weights:
+        keywords = sorted(keywords, key=lambda k: weights.get(k, 0.0), reverse=True)
+
+    kept, used = [], 0
+    for keyword in keywords:
+        tokens = count_tokens(f", {keyword}" if kept else keyword, model_name)
+        if used + tokens > budget:
+            continue
+        kept.append(keyword)
+        used += tokens
+    return kept
+
+
+def _split_units(text: str) -> List[str]:
+    # Sections (at Markdown headings), then paragraphs
+    starts = [match.start() for match in _HEADING.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    units = []
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        units.extend(paragraph.strip() for paragraph in text[start:end].split("\n\n") if paragraph.strip())
+    return units
+
+
+def chunk_text(text: str, max_tokens: int = POLISH_CHUNK_TOKENS, model_name: str = "gpt-4o-mini") -> List[str]:
+    """
+    Split text into chunks of at most max_tokens, breaking at headings and paragraphs.
+
+    A chunk never ends right after a heading, and a single paragraph longer than max_tokens
+    becomes its own chunk.
+
+    Returns:
+        List[str]: Chunks that join back (with blank lines) into the original text
+    """
+    if count_tokens(text, model_name) <= max_tokens:
+        return [text]
+
+    chunks, current, used = [], [], 0
+    for unit in _split_units(text):
+        tokens = count_tokens(unit, model_name)
+        ends_with_heading = bool(current) and bool(_HEADING.match(current[-1])) and "\n" not in current[-1]
+        if current and used + tokens > max_tokens and not ends_with_heading:
+            chunks.append("\n\n".join(current))
+            current, used = [], 0
+        current.append(unit)
+        used += tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
@@ -0,0 +1,60 @@
+# src/agents/cli.py
+
+"""
+Headless drafting and polishing, streamed to stdout as the text is generated.
+
+    python -m src.agents.cli draft brief.json                 # brief JSON from the Write Briefs step
+    python -m src.agents.cli polish draft.md --tone Friendly  # '-' reads from stdin
+    python -m src.agents.cli draft brief.json | python -m src.agents.cli polish -
+"""
+
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+
+def _read(path: str) -> str:
+    if path == "-":
+        return sys.stdin.read()
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Stream content drafts and polished articles to stdout.")
+    parser.add_argument("--model", default="gpt-4o-mini", help="OpenAI chat model")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached responses and generate anew")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    draft = subparsers.add_parser("draft", help="Write a draft from a brief")
+    draft.add_argument("brief", help="JSON file with title, outline, tone, audience and cta ('-' = stdin)")
+
+    polish = subparsers.add_parser("polish", help="Polish a draft")
+    polish.add_argument("draft", help="Draft text file ('-' = stdin)")
+    polish.add_argument("--tone", default="Professional")
+    polish.add_argument("--audience", default="Business Decision Makers")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "draft":
+        from src.agents.content_drafter import stream_draft
+        brief = json.loads(_read(args.brief))
+        # Accept either a bare brief or an entry saved by the Write Briefs step ({"title", "brief": {...}})
+        if isinstance(brief.get("brief"), dict):
+            brief = {**brief["brief"], "title": brief.get("title") or brief["brief"].get("title")}
+        chunks = stream_draft(brief, model_name=args.model, use_cache=not args.no_cache)
+    else:
+        from src.agents.content_polisher import stream_polish
+        chunks = stream_polish(_read(args.draft), tone=args.tone, audience=args.audience, model_name=args.model,
+                               use_cache=not args.no_cache)
+
+    for chunk in chunks:
+        sys.stdout.write(chunk)
+        sys.stdout.flush()
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
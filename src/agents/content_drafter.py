@@ -1,11 +1,6 @@
-import os
-from dotenv import load_dotenv
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from langchain_openai import ChatOpenAI
+from typing import Dict, Iterator, List, Optional
 
-load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+from src.agents.runtime import arun_prompt, run_batch, run_prompt, stream_prompt
 
 # Define the structured prompt
 draft_prompt = """
@@ -28,18 +23,56 @@ Instructions:
 Begin writing the blog post now:
 """
 
-def generate_draft(brief: dict, model_name="gpt-4o-mini"):
-    prompt_template = PromptTemplate(
-        input_variables=["title", "outline", "tone", "audience", "cta"],
-        template=draft_prompt,
-    )
+def _draft_variables(brief: dict) -> Dict[str, str]:
+    return {key: brief.get(key, "") for key in ("title", "outline", "tone", "audience", "cta")}
 
-    llm = ChatOpenAI(
-        openai_api_key=OPENAI_API_KEY,
-        model=model_name,
-        temperature=0.7
-    )
 
-    chain = LLMChain(prompt=prompt_template, llm=llm)
+def generate_draft(brief: dict, model_name="gpt-4o-mini", use_cache: bool = True):
+    return run_prompt(draft_prompt, _draft_variables(brief), model_name=model_name, temperature=0.7,
+                      stage="draft", use_cache=use_cache).strip()
 
-    return chain.run(brief).strip()
+
+def stream_draft(brief: dict, model_name="gpt-4o-mini", use_cache: bool = True) -> Iterator[str]:
+    """
+    Draft a brief, yielding the text as it is generated.
+
+    Args:
+        brief (dict): Brief with title, outline, tone, audience and cta
+        model_name (str): OpenAI chat model
+        use_cache (bool): Return a cached draft for the same brief; False writes a new one
+
+    Yields:
+        str: Draft text chunks (leading whitespace dropped, like generate_draft)
+    """
+    started = False
+    for chunk in stream_prompt(draft_prompt, _draft_variables(brief), model_name=model_name, temperature=0.7,
+                               stage="draft", use_cache=use_cache):
+        if not started:
+            chunk = chunk.lstrip()
+            started = bool(chunk)
+        if chunk:
+            yield chunk
+
+
+async def agenerate_draft(brief: dict, model_name="gpt-4o-mini", use_cache: bool = True):
+    draft = await arun_prompt(draft_prompt, _draft_variables(brief), model_name=model_name, temperature=0.7,
+                              stage="draft", use_cache=use_cache)
+    return draft.strip()
+
+
+def generate_drafts(briefs: List[dict], model_name="gpt-4o-mini", max_concurrency: Optional[int] = None,
+                    use_cache: bool = True) -> List[Dict]:
+    """
+    Draft several briefs concurrently.
+
+    Args:
+        briefs (List[dict]): Briefs with title, outline, tone, audience and cta
+        model_name (str): OpenAI chat model
+        max_concurrency (int): Requests in flight at once (default LLM_MAX_CONCURRENCY)
+        use_cache (bool): Return cached drafts for the same briefs; False writes new ones
+
+    Returns:
+        List[Dict]: One {"result": draft, "error": str | None} per brief, in input order
+    """
+    return run_batch([lambda brief=brief: agenerate_draft(brief, model_name, use_cache) for brief in briefs],
+                     max_concurrency)
@@ -0,0 +1,361 @@
+# src/agents/content_pipeline.py
+
+"""
+Fused draft + polish pipeline, and section-parallel drafting.
+
+The two-pass path drafts an article, then sends the whole draft back to be rewritten
+by the polisher, so the article is generated twice and read once more as input. The
+fused path drafts directly in the target tone and audience with the editor's
+instructions folded into the prompt, then checks each section with cheap heuristics
+and re-polishes only the sections that are flagged.
+
+Token usage is reported per stage, with an estimate of what the two-pass path would
+have used for the same article.
+
+Section-parallel drafting writes every outline section of a brief concurrently with
+the shared title, tone, audience and CTA, so a long article takes about as long as its
+longest section. A single short call then writes the introduction and the transitions
+between sections, which are stitched in locally rather than regenerating the article.
+A failed section is reported on its own and the sections that succeeded are kept
+(cached), so running the brief again only re-drafts the failed ones.
+"""
+
+import asyncio
+import json
+import re
+from typing import Dict, List, Optional
+
+from src.agents.budget import count_tokens
+from src.agents.content_drafter import _draft_variables, agenerate_draft
+from src.agents.content_polisher import polish_prompt
+from src.agents.runtime import LLM_MAX_CONCURRENCY, ainvoke_prompt, run_async, run_batch
+
+# Drafting prompt with the polisher's instructions folded in
+fused_prompt = """
+You are an expert content writer and senior editor.
+
+Using the following brief, write a complete, publication-ready blog post.
+
+Title: {title}
+Outline: {outline}
+Tone: {tone}
+Audience: {audience}
+Call to Action: {cta}
+
+Instructions:
+- Use the outline to structure the blog, with a "## " Markdown heading for each section.
+- Write in the given tone for the target audience from the first sentence; the text will not be edited again.
+- Keep sentences short and clear, with logical transitions between paragraphs.
+- Use correct grammar and punctuation and a consistent voice.
+- Keep the content informative, engaging, and SEO-friendly.
+- Conclude with the given Call to Action.
+
+Return only the article.
+"""
+
+section_polish_prompt = """
+You are a senior content editor. Polish the following section of the article "{title}" to improve clarity, flow, and tone.
+Make sure the tone is {tone} and suitable for the audience: {audience}.
+
+Issues found in this section: {issues}
+
+Keep the heading and the key ideas. Return only the polished section.
+
+Section:
+{section}
+"""
+
+section_prompt = """
+You are an expert content writer. You are writing one section of a blog post; other writers are
+writing the other sections at the same time.
+
+Title: {title}
+Full outline: {outline}
+Tone: {tone}
+Audience: {audience}
+Call to Action: {cta}
+
+Write only section {number} of {total}: "{section}".
+- Start with the heading "## {section}".
+- Do not write an introduction or conclusion for the whole article, and do not repeat other sections.
+- Keep the content informative, engaging, and SEO-friendly.
+{closing}
+Return only the section.
+"""
+
+smooth_prompt = """
+You are a senior content editor. The sections of the blog post "{title}" were written separately.
+Tone: {tone}. Audience: {audience}.
+
+Here is the start and end of each section:
+{sections}
+
+Write a short introduction for the article and one transition sentence to open each section
+after the first, so the article reads as one piece. Return ONLY a JSON object:
+{{"intro": "<introduction>", "transitions": ["<opens section 2>", "<opens section 3>", ...]}}
+"""
+
+# Quality-check thresholds
+MAX_AVG_SENTENCE_WORDS = 25
+MAX_SENTENCE_WORDS = 45
+MAX_PARAGRAPH_WORDS = 180
+MIN_SECTION_WORDS = 40
+
+_HEADING = re.compile(r"^#{1,6}\s", re.MULTILINE)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_REPEATED_WORD = re.compile(r"\b(\w+)\s+\1\b", re.IGNORECASE)
+
+
+def split_sections(article: str) -> List[str]:
+    """Split a Markdown article before each heading (text before the first heading is its own section)."""
+    starts = [match.start() for match in _HEADING.finditer(article)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    sections = [article[start:end].strip() for start, end in zip(starts, starts[1:] + [len(article)])]
+    return [section for section in sections if section]
+
+
+def section_issues(section: str) -> List[str]:
+    """
+    Cheap quality check of one article section.
+
+    Args:
+        section (str): Section text, optionally starting with its heading
+
+    Returns:
+        List[str]: Problems found (empty if the section can be kept as is)
+    """
+    has_heading = bool(_HEADING.match(section))
+    body = section
+    if has_heading:
+        body = section.split("\n", 1)[1] if "\n" in section else ""
+    words = body.split()
+    sentences = [s for s in _SENTENCE_END.split(" ".join(words)) if s]
+    sentence_words = [len(s.split()) for s in sentences]
+
+    issues = []
+    if has_heading and len(words) < MIN_SECTION_WORDS:  # a short untitled intro is fine
+        issues.append("section is too thin")
+    if sentence_words and sum(sentence_words) / len(sentence_words) > MAX_AVG_SENTENCE_WORDS:
+        issues.append("sentences are too long on average")
+    if any(n > MAX_SENTENCE_WORDS for n in sentence_words):
+        issues.append("contains run-on sentences")
+    if any(len(paragraph.split()) > MAX_PARAGRAPH_WORDS for paragraph in body.split("\n\n")):
+        issues.append("paragraphs are too long")
+    if _REPEATED_WORD.search(body):
+        issues.append("repeated words")
+    return issues
+
+
+def _add_usage(total: Dict, usage: Dict) -> None:
+    total["prompt_tokens"] += usage["prompt_tokens"]
+    total["completion_tokens"] += usage["completion_tokens"]
+
+
+async def adraft_and_polish(brief: dict, model_name="gpt-4o-mini", use_cache: bool = True) -> Dict:
+    """Async version of draft_and_polish."""
+    variables = _draft_variables(brief)
+    draft, draft_usage = await ainvoke_prompt(fused_prompt, variables, model_name=model_name, temperature=0.7,
+                                              stage="fused_draft", use_cache=use_cache)
+    draft = draft.strip()
+
+    sections = split_sections(draft)
+    flagged = [(i, section_issues(section)) for i, section in enumerate(sections)]
+    flagged = [(i, issues) for i, issues in flagged if issues]
+
+    # Flagged sections are polished concurrently; a failed section keeps its drafted text
+    results = await asyncio.gather(*(
+        ainvoke_prompt(section_polish_prompt, {
+            "title": variables["title"],
+            "tone": variables["tone"],
+            "audience": variables["audience"],
+            "issues": "; ".join(issues),
+            "section": sections[i],
+        }, model_name=model_name, temperature=0.5, stage="section_polish", use_cache=use_cache)
+        for i, issues in flagged
+    ), return_exceptions=True)
+
+    polish_usage = {"prompt_tokens": 0, "completion_tokens": 0}
+    polished_sections = list(sections)
+    for (i, issues), result in zip(flagged, results):
+        if isinstance(result, Exception):
+            print(f"Warning: Polishing section {i + 1} failed ({result}). Keeping the draft text.")
+            continue
+        polished_sections[i] = result[0].strip()
+        _add_usage(polish_usage, result[1])
+
+    # What the two-pass path would have cost: the same draft, then the whole draft re-read and rewritten
+    draft_tokens = draft_usage["completion_tokens"] or count_tokens(draft, model_name)
+    draft_prompt_tokens = draft_usage["prompt_tokens"] or count_tokens(fused_prompt.format(**variables), model_name)
+    polish_overhead = count_tokens(polish_prompt.format(draft="", tone=variables["tone"], audience=variables["audience"]),
+                                   model_name)
+    two_pass = {
+        "prompt_tokens": draft_prompt_tokens + polish_overhead + draft_tokens,
+        "completion_tokens": 2 * draft_tokens,
+    }
+    total = {
+        "prompt_tokens": draft_usage["prompt_tokens"] + polish_usage["prompt_tokens"],
+        "completion_tokens": draft_usage["completion_tokens"] + polish_usage["completion_tokens"],
+    }
+
+    return {
+        "draft": draft,
+        "polished": "\n\n".join(polished_sections),
+        "flagged": [{"section": i + 1, "issues": issues} for i, issues in flagged],
+        "usage": {
+            "draft": {key: draft_usage[key] for key in ("prompt_tokens", "completion_tokens")},
+            "polish": polish_usage,
+            "total": total,
+            "two_pass_estimate": two_pass,
+            "cached": draft_usage["cached"],
+        },
+    }
+
+
+def draft_and_polish(brief: dict, model_name="gpt-4o-mini", use_cache: bool = True) -> Dict:
+    """
+    Draft an article in its final tone and polish only the sections that need it.
+
+    Args:
+        brief (dict): Brief with title, outline, tone, audience and cta
+        model_name (str): OpenAI chat model
+        use_cache (bool): Reuse cached responses for the same prompts; False drafts and polishes anew
+
+    Returns:
+        Dict: "draft" (fused draft), "polished" (final article), "flagged" (sections re-polished
+              and why) and "usage" (prompt/completion tokens for the draft and polish stages,
+              their total, and the estimated two-pass cost)
+    """
+    return run_async(adraft_and_polish(brief, model_name, use_cache))
+
+
+def draft_and_polish_many(briefs: List[dict], model_name="gpt-4o-mini", max_concurrency: Optional[int] = None,
+                          use_cache: bool = True) -> List[Dict]:
+    """
+    Run the fused pipeline for several briefs concurrently.
+
+    Returns:
+        List[Dict]: One {"result": draft_and_polish output, "error": str | None} per brief, in input order
+    """
+    return run_batch([lambda brief=brief: adraft_and_polish(brief, model_name, use_cache) for brief in briefs],
+                     max_concurrency)
+
+
+def _outline_items(brief: dict) -> List[str]:
+    outline = brief.get("outline")
+    if isinstance(outline, str):
+        outline = [line.strip(" -*\t") for line in outline.splitlines()]
+    return [str(item).strip() for item in outline or [] if str(item).strip()]
+
+
+def _section_summary(number: int, section: str) -> str:
+    # Heading plus the first and last sentence is enough context for transitions
+    lines = section.split("\n", 1)
+    heading, body = (lines[0], lines[1]) if len(lines) > 1 else (lines[0], "")
+    sentences = [s for s in _SENTENCE_END.split(" ".join(body.split())) if s]
+    start, end = (sentences[0], sentences[-1]) if sentences else ("", "")
+    return f"{number}. {heading}\n   Starts: {start}\n   Ends: {end}"
+
+
+def stitch_sections(sections: List[str], intro: str = "", transitions: Optional[List[str]] = None) -> str:
+    """Join drafted sections, adding the intro and a transition sentence after each later section's heading."""
+    transitions = transitions or []
+    parts = [intro.strip()] if intro and intro.strip() else []
+    for i, section in enumerate(sections):
+        transition = transitions[i - 1].strip() if 0 < i <= len(transitions) and transitions[i - 1] else ""
+        if transition and _HEADING.match(section) and "\n" in section:
+            heading, body = section.split("\n", 1)
+            section = f"{heading}\n{transition} {body.lstrip()}"
+        parts.append(section)
+    return "\n\n".join(parts)
+
+
+async def adraft_by_sections(brief: dict, model_name="gpt-4o-mini", max_concurrency: Optional[int] = None,
+                             use_cache: bool = True, semaphore: Optional[asyncio.Semaphore] = None) -> Dict:
+    """Async version of draft_by_sections; pass a semaphore to share one request limit across briefs."""
+    variables = _draft_variables(brief)
+    outline = _outline_items(brief)
+    if not outline:  # nothing to split on
+        draft = await agenerate_draft(brief, model_name, use_cache)
+        return {"article": draft, "sections": [draft], "failed": []}
+
+    semaphore = semaphore or asyncio.Semaphore(max(1, max_concurrency or LLM_MAX_CONCURRENCY))
+
+    async def _section(i: int) -> str:
+        section_variables = {
+            **variables,
+            "outline": "; ".join(outline),
+            "number": i + 1,
+            "total": len(outline),
+            "section": outline[i],
+            "closing": "- End this section with the Call to Action.\n" if i == len(outline) - 1 else "",
+        }
+        # Rate limits, server and transport errors are already retried by the outbound scheduler
+        async with semaphore:
+            text, _ = await ainvoke_prompt(section_prompt, section_variables, model_name=model_name,
+                                           temperature=0.7, stage="section_draft", use_cache=use_cache)
+        return text.strip()
+
+    results = await asyncio.gather(*(_section(i) for i in range(len(outline))), return_exceptions=True)
+    sections = [None if isinstance(result, Exception) else result for result in results]
+    failed = [i for i, result in enumerate(results) if isinstance(result, Exception)]
+    for i in failed:
+        print(f"Warning: Section {i + 1} ('{outline[i]}') failed: {results[i]}")
+
+    drafted = [section for section in sections if section]
+    if failed:
+        return {"article": stitch_sections(drafted), "sections": sections, "failed": failed}
+
+    # Intro and transitions; if this call fails, the sections are still joined as they are
+    try:
+        async with semaphore:
+            raw, _ = await ainvoke_prompt(smooth_prompt, {
+                "title": variables["title"],
+                "tone": variables["tone"],
+                "audience": variables["audience"],
+                "sections": "\n".join(_section_summary(i + 1, section) for i, section in enumerate(drafted)),
+            }, model_name=model_name, temperature=0.5, stage="smooth", use_cache=use_cache)
+        smoothing = json.loads(raw.replace("```json", "").replace("```", "").strip())
+        article = stitch_sections(drafted, smoothing.get("intro", ""), smoothing.get("transitions"))
+    except Exception as e:
+        print(f"Warning: Smoothing failed ({e}). Joining sections as drafted.")
+        article = stitch_sections(drafted)
+
+    return {"article": article, "sections": sections, "failed": []}
+
+
+def draft_by_sections(brief: dict, model_name="gpt-4o-mini", max_concurrency: Optional[int] = None,
+                      use_cache: bool = True) -> Dict:
+    """
+    Draft every outline section of a brief concurrently, then stitch and smooth the article.
+
+    Responses are cached, so calling this again after a failure only re-drafts the sections that failed
+    (use_cache=False re-drafts every section).
+
+    Args:
+        brief (dict): Brief with title, outline (list), tone, audience and cta
+        model_name (str): OpenAI chat model
+        max_concurrency (int): Sections in flight at once (default LLM_MAX_CONCURRENCY)
+        use_cache (bool): Reuse cached sections for the same brief; False drafts them all anew
+
+    Returns:
+        Dict: "article" (stitched text), "sections" (drafted text per outline item, None if it failed)
+              and "failed" (indices of sections that failed after all retries)
+    """
+    return run_async(adraft_by_sections(brief, model_name, max_concurrency, use_cache))
+
+
+def draft_by_sections_many(briefs: List[dict], model_name="gpt-4o-mini", max_concurrency: Optional[int] = None,
+                           use_cache: bool = True) -> List[Dict]:
+    """
+    Section-parallel drafting for several briefs concurrently.
+
+    max_concurrency (default LLM_MAX_CONCURRENCY) bounds the requests in flight across all briefs.
+
+    Returns:
+        List[Dict]: One {"result": draft_by_sections output, "error": str | None} per brief, in input order
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or LLM_MAX_CONCURRENCY))
+    jobs = [lambda brief=brief: adraft_by_sections(brief, model_name, use_cache=use_cache, semaphore=semaphore)
+            for brief in briefs]
+    return run_batch(jobs, max_concurrency)
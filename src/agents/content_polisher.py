@@ -1,12 +1,8 @@
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-import os
-from dotenv import load_dotenv
+import asyncio
+from typing import Dict, Iterator, List, Optional
 
-# Load environment variables
-load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+from src.agents.budget import POLISH_CHUNK_TOKENS, chunk_text
+from src.agents.runtime import LLM_MAX_CONCURRENCY, arun_prompt, run_async, run_batch, run_prompt, stream_prompt
 
 # Prompt Template
 polish_prompt = """
@@ -25,19 +21,115 @@ Here is the draft content:
 Return only the polished article.
 """
 
-def polish_draft(draft: str, tone: str = "Professional", audience: str = "Business Decision Makers", model_name="gpt-4o-mini"):
-    prompt_template = PromptTemplate(
-        input_variables=["draft", "tone", "audience"],
-        template=polish_prompt
-    )
+# Used for each chunk of a draft too long to polish in one call
+polish_part_prompt = """
+You are a senior content editor. Your task is to polish the following content to improve clarity, flow, and tone.
+Make sure the tone is {tone} and suitable for the audience: {audience}.
+This is part {part} of {parts} of a longer article: polish only this part, without adding an introduction or conclusion.
+
+Do not remove key ideas, but feel free to:
+- Simplify complex sentences
+- Improve logical transitions
+- Fix grammar and punctuation
+- Use a consistent tone and voice
+
+Here is the content:
+{draft}
+
+Return only the polished content.
+"""
+
+
+def _polish_calls(draft: str, tone: str, audience: str, model_name: str) -> List[tuple]:
+    # (template, variables) per call: the whole draft, or one per chunk if it is over POLISH_CHUNK_TOKENS
+    chunks = chunk_text(draft, POLISH_CHUNK_TOKENS, model_name)
+    if len(chunks) == 1:
+        return [(polish_prompt, {"draft": draft, "tone": tone, "audience": audience})]
+    return [
+        (polish_part_prompt, {"draft": chunk, "tone": tone, "audience": audience, "part": i + 1, "parts": len(chunks)})
+        for i, chunk in enumerate(chunks)
+    ]
 
-    llm = ChatOpenAI(
-        openai_api_key=OPENAI_API_KEY,
-        model=model_name,
-        temperature=0.5  # Slightly lower for polish (less creative, more precise)
-    )
 
-    chain = LLMChain(llm=llm, prompt=prompt_template)
+def polish_draft(draft: str, tone: str = "Professional", audience: str = "Business Decision Makers", model_name="gpt-4o-mini",
+                 use_cache: bool = True):
+    calls = _polish_calls(draft, tone, audience, model_name)
+    if len(calls) > 1:
+        return run_async(apolish_draft(draft, tone, audience, model_name, use_cache))
 
-    polished = chain.run(draft=draft, tone=tone, audience=audience)
+    # Slightly lower temperature for polish (less creative, more precise)
+    template, variables = calls[0]
+    polished = run_prompt(template, variables, model_name=model_name, temperature=0.5, stage="polish",
+                          use_cache=use_cache)
     return polished
+
+
+def stream_polish(draft: str, tone: str = "Professional", audience: str = "Business Decision Makers",
+                  model_name="gpt-4o-mini", use_cache: bool = True) -> Iterator[str]:
+    """
+    Polish a draft, yielding the polished text as it is generated.
+
+    Long drafts are polished chunk by chunk, in order.
+
+    Args:
+        draft (str): Draft article
+        tone (str): Target tone
+        audience (str): Target audience
+        model_name (str): OpenAI chat model
+        use_cache (bool): Return a cached polish of the same draft; False polishes it again
+
+    Yields:
+        str: Polished text chunks
+    """
+    for i, (template, variables) in enumerate(_polish_calls(draft, tone, audience, model_name)):
+        if i:
+            yield "\n\n"
+        yield from stream_prompt(template, variables, model_name=model_name, temperature=0.5, stage="polish",
+                                 use_cache=use_cache)
+
+
+async def apolish_draft(draft: str, tone: str = "Professional", audience: str = "Business Decision Makers", model_name="gpt-4o-mini",
+                        use_cache: bool = True, max_concurrency: Optional[int] = None,
+                        semaphore: Optional[asyncio.Semaphore] = None):
+    # Chunks of a long draft are polished concurrently (at most max_concurrency, or the shared
+    # semaphore's limit, at a time) and joined in order
+    semaphore = semaphore or asyncio.Semaphore(max(1, max_concurrency or LLM_MAX_CONCURRENCY))
+
+    async def _polish(template, variables):
+        async with semaphore:
+            return await arun_prompt(template, variables, model_name=model_name, temperature=0.5, stage="polish",
+                                     use_cache=use_cache)
+
+    parts = await asyncio.gather(*(_polish(template, variables)
+                                   for template, variables in _polish_calls(draft, tone, audience, model_name)))
+    return "\n\n".join(part.strip() for part in parts) if len(parts) > 1 else parts[0]
+
+
+def polish_drafts(items: List[dict], model_name="gpt-4o-mini", max_concurrency: Optional[int] = None,
+                  use_cache: bool = True) -> List[Dict]:
+    """
+    Polish several drafts concurrently.
+
+    Args:
+        items (List[dict]): Dicts with "draft" and optional "tone" and "audience"
+        model_name (str): OpenAI chat model
+        max_concurrency (int): Requests in flight at once (default LLM_MAX_CONCURRENCY)
+        use_cache (bool): Return cached polishes of the same drafts; False polishes them again
+
+    Returns:
+        List[Dict]: One {"result": polished, "error": str | None} per draft, in input order
+    """
+    # One limit across drafts: the chunks of a long draft count towards it too
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or LLM_MAX_CONCURRENCY))
+    jobs = [
+        lambda item=item: apolish_draft(
+            item["draft"],
+            tone=item.get("tone") or "Professional",
+            audience=item.get("audience") or "Business Decision Makers",
+            model_name=model_name,
+            use_cache=use_cache,
+            semaphore=semaphore,
+        )
+        for item in items
+    ]
+    return run_batch(jobs, max_concurrency)
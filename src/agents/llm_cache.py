@@ -0,0 +1,116 @@
+# src/agents/llm_cache.py
+
+"""
+Persistent cache of model responses, stored in the content database.
+
+Entries are keyed on a hash of the rendered prompt, model name and temperature, so a
+Streamlit rerun or a revisited tab returns the earlier response instead of calling the
+model again. Entries expire after LLM_CACHE_TTL_HOURS, and the least recently used ones
+are evicted once the cache grows past LLM_CACHE_MAX_MB.
+
+In semantic mode (used for topic generation) a miss falls back to an entry rendered from
+the same template and other variables whose keyword set is nearly identical: Jaccard
+similarity of at least LLM_CACHE_SIMILARITY.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Iterable, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", 168))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", 100))
+LLM_CACHE_SIMILARITY = float(os.getenv("LLM_CACHE_SIMILARITY", 0.8))
+
+
+def _hash(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _min_created() -> float:
+    return time.time() - LLM_CACHE_TTL_HOURS * 3600
+
+
+def normalize_keywords(keywords: Iterable[str]) -> List[str]:
+    """Lower-cased, de-duplicated, sorted keywords."""
+    return sorted({str(keyword).strip().lower() for keyword in keywords if str(keyword).strip()})
+
+
+def keyword_similarity(a: Iterable[str], b: Iterable[str]) -> float:
+    """Jaccard similarity of two keyword sets."""
+    a, b = set(normalize_keywords(a)), set(normalize_keywords(b))
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def cache_key(rendered_prompt: str, model_name: str, temperature: float) -> str:
+    """Key of a fully rendered prompt sent to a model."""
+    return _hash(rendered_prompt, model_name, float(temperature))
+
+
+def cache_namespace(template: str, variables: dict, model_name: str, temperature: float,
+                    semantic_key: Optional[str] = None) -> str:
+    """Groups prompts that differ only in their semantic_key variable."""
+    others = {name: value for name, value in variables.items() if name != semantic_key}
+    return _hash(template, others, model_name, float(temperature))
+
+
+def lookup(key: str, namespace: Optional[str] = None, keywords: Optional[Iterable[str]] = None) -> Optional[str]:
+    """
+    Cached response for a prompt.
+
+    Args:
+        key (str): cache_key of the rendered prompt
+        namespace (str): cache_namespace, needed for semantic lookups
+        keywords (Iterable[str]): Keywords of the prompt; enables the semantic fallback
+
+    Returns:
+        str | None: The cached response, or None on a miss
+    """
+    if not LLM_CACHE_ENABLED:
+        return None
+
+    from src.database.db_reader import read_llm_cache, read_llm_cache_namespace
+    from src.database.db_writer import touch_llm_cache
+    from src.database.schema import get_connection
+
+    conn = get_connection()
+    try:
+        response = read_llm_cache(conn, key, _min_created())
+        if response is None and namespace is not None and keywords is not None:
+            best_score = LLM_CACHE_SIMILARITY
+            for candidate_key, candidate_keywords, candidate_response in read_llm_cache_namespace(conn, namespace, _min_created()):
+                score = keyword_similarity(keywords, candidate_keywords)
+                if score >= best_score:
+                    best_score, key, response = score, candidate_key, candidate_response
+        if response is not None:
+            touch_llm_cache(conn, key)
+        return response
+    finally:
+        conn.close()
+
+
+def store(key: str, rendered_prompt: str, response: str, namespace: str,
+          keywords: Optional[Iterable[str]] = None) -> None:
+    """Cache a response and evict expired / least recently used entries."""
+    if not LLM_CACHE_ENABLED:
+        return
+
+    from src.database.db_writer import evict_llm_cache, save_llm_cache
+    from src.database.schema import get_connection
+
+    size = len(rendered_prompt.encode("utf-8")) + len(response.encode("utf-8"))
+    conn = get_connection()
+    try:
+        save_llm_cache(conn, key, namespace, response, size,
+                       keywords=normalize_keywords(keywords) if keywords is not None else None)
+        evict_llm_cache(conn, _min_created(), int(LLM_CACHE_MAX_MB * 1024 * 1024))
+    finally:
+        conn.close()
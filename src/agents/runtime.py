@@ -0,0 +1,314 @@
+# src/agents/runtime.py
+
+"""
+Shared LLM runtime for the agents.
+
+Model clients, prompt templates and chains are built once per process and reused:
+clients are keyed by (model name, temperature) and all of them send requests through
+one pooled HTTP client, so keep-alive connections (and their TLS sessions) are reused
+across calls instead of being set up again for every topic, brief or draft.
+Responses are cached on disk (see llm_cache); use_cache=False skips the lookup and
+replaces the cached response with a fresh one (regenerate). Prompts are
+checked against the model's context window, and the prompt/completion tokens of every
+call are recorded in the llm_calls table (see budget).
+
+Batches of prompts run concurrently on one background event loop (so the pooled async
+client always lives on the same loop), at most LLM_MAX_CONCURRENCY at a time.
+"""
+
+import asyncio
+import itertools
+import os
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+from dotenv import load_dotenv
+from langchain_core.prompts import PromptTemplate
+from langchain_openai import ChatOpenAI
+
+from src.agents import budget, llm_cache
+from src.utils import outbound
+
+load_dotenv()
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+DEFAULT_MODEL_NAME = "gpt-4o-mini"
+
+# Connection pool shared by every model client
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 20))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 120))
+
+# Requests in flight per batch, and retries on rate limits / server errors (see src.utils.outbound)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 10))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 4))
+
+_lock = threading.Lock()
+_http_clients: Dict[str, object] = {}
+_llms: Dict[Tuple[str, float], ChatOpenAI] = {}
+_prompts: Dict[str, PromptTemplate] = {}
+_chains: Dict[Tuple[str, str, float], object] = {}
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS)
+
+
+def get_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """The process-wide pooled sync and async HTTP clients."""
+    with _lock:
+        if not _http_clients:
+            _http_clients["sync"] = httpx.Client(limits=_limits(), timeout=LLM_TIMEOUT)
+            _http_clients["async"] = httpx.AsyncClient(limits=_limits(), timeout=LLM_TIMEOUT)
+        return _http_clients["sync"], _http_clients["async"]
+
+
+def get_llm(model_name: str = DEFAULT_MODEL_NAME, temperature: float = 0.7) -> ChatOpenAI:
+    """Chat model client for (model_name, temperature), created on first use."""
+    key = (model_name, float(temperature))
+    if key not in _llms:
+        http_client, http_async_client = get_http_clients()
+        with _lock:
+            if key not in _llms:
+                _llms[key] = ChatOpenAI(
+                    openai_api_key=OPENAI_API_KEY,
+                    model=model_name,
+                    temperature=temperature,
+                    max_retries=0,  # retries, backoff and rate limiting are done by the outbound scheduler
+                    stream_usage=True,
+                    http_client=http_client,
+                    http_async_client=http_async_client,
+                )
+    return _llms[key]
+
+
+def get_prompt(template: str) -> PromptTemplate:
+    """PromptTemplate for a template string (input variables are inferred), parsed once."""
+    with _lock:
+        if template not in _prompts:
+            _prompts[template] = PromptTemplate.from_template(template)
+        return _prompts[template]
+
+
+def get_chain(template: str, model_name: str = DEFAULT_MODEL_NAME, temperature: float = 0.7):
+    """prompt | model chain, cached per (template, model_name, temperature). Returns chat messages."""
+    key = (template, model_name, float(temperature))
+    if key not in _chains:
+        chain = get_prompt(template) | get_llm(model_name, temperature)
+        with _lock:
+            _chains.setdefault(key, chain)
+    return _chains[key]
+
+
+def _prepare(template: str, variables: Dict, model_name: str, temperature: float,
+             semantic_key: Optional[str] = None, keywords: Optional[List[str]] = None):
+    # Render once: the text is checked against the context window and keys the cache
+    rendered = get_prompt(template).format(**variables)
+    budget.check_prompt(rendered, model_name)
+    key = llm_cache.cache_key(rendered, model_name, temperature)
+    namespace = llm_cache.cache_namespace(template, variables, model_name, temperature, semantic_key)
+    return rendered, key, namespace, keywords if semantic_key else None
+
+
+def _stage(template: str, stage: Optional[str]) -> str:
+    return stage or "prompt-" + llm_cache.cache_key(template, "", 0)[:8]
+
+
+def _usage(rendered: str, response: str, model_name: str, message=None, cached: bool = False) -> Dict:
+    """Token usage of one response: as reported by the API, counted locally if it wasn't, zero for cache hits."""
+    if cached:
+        return {"prompt_tokens": 0, "completion_tokens": 0, "cached": True}
+    metadata = getattr(message, "usage_metadata", None) or {}
+    return {
+        "prompt_tokens": int(metadata.get("input_tokens") or budget.count_tokens(rendered, model_name)),
+        "completion_tokens": int(metadata.get("output_tokens") or budget.count_tokens(response, model_name)),
+        "cached": False,
+    }
+
+
+def _record(stage: str, model_name: str, usage: Dict, seconds: float) -> None:
+    """Store the token usage of a call in the llm_calls table (never fails the call itself)."""
+    from src.database.db_writer import save_llm_call
+    from src.database.schema import get_connection
+
+    try:
+        conn = get_connection()
+        try:
+            save_llm_call(conn, stage, model_name, usage["prompt_tokens"], usage["completion_tokens"],
+                          cached=usage["cached"], seconds=round(seconds, 3))
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"Warning: Could not record LLM usage ({e})")
+
+
+def invoke_prompt(template: str, variables: Dict, model_name: str = DEFAULT_MODEL_NAME, temperature: float = 0.7,
+                  use_cache: bool = True, semantic_key: Optional[str] = None,
+                  keywords: Optional[List[str]] = None, stage: Optional[str] = None) -> Tuple[str, Dict]:
+    """
+    Render a prompt template and return the model's text response and its token usage.
+
+    Args:
+        template (str): Prompt template with {variable} placeholders
+        variables (Dict): Values for the placeholders
+        model_name (str): OpenAI chat model
+        temperature (float): Sampling temperature
+        use_cache (bool): Reuse a cached response for an identical prompt (see llm_cache). If False,
+                          the model is called and its response replaces the cached one
+        semantic_key (str): Variable holding the keywords; with keywords, also reuse responses
+                            for prompts that differ only in a nearly identical keyword set
+        keywords (List[str]): The keyword list rendered into variables[semantic_key]
+        stage (str): Name the call's token usage is recorded under (e.g. "draft")
+
+    Returns:
+        Tuple[str, Dict]: Response text and {"prompt_tokens", "completion_tokens", "cached"}
+
+    Raises:
+        ValueError: If the rendered prompt doesn't fit in the model's context window
+    """
+    started = time.perf_counter()
+    rendered, key, namespace, keywords = _prepare(template, variables, model_name, temperature, semantic_key, keywords)
+
+    response = llm_cache.lookup(key, namespace, keywords) if use_cache else None
+    if response is not None:
+        usage = _usage(rendered, response, model_name, cached=True)
+    else:
+        message = outbound.call("openai", get_chain(template, model_name, temperature).invoke, variables,
+                                retries=LLM_MAX_RETRIES)
+        response = message.content
+        usage = _usage(rendered, response, model_name, message)
+        llm_cache.store(key, rendered, response, namespace, keywords)
+
+    _record(_stage(template, stage), model_name, usage, time.perf_counter() - started)
+    return response, usage
+
+
+async def ainvoke_prompt(template: str, variables: Dict, model_name: str = DEFAULT_MODEL_NAME, temperature: float = 0.7,
+                         use_cache: bool = True, semantic_key: Optional[str] = None,
+                         keywords: Optional[List[str]] = None, stage: Optional[str] = None) -> Tuple[str, Dict]:
+    """Async version of invoke_prompt."""
+    started = time.perf_counter()
+    rendered, key, namespace, keywords = _prepare(template, variables, model_name, temperature, semantic_key, keywords)
+
+    response = await asyncio.to_thread(llm_cache.lookup, key, namespace, keywords) if use_cache else None
+    if response is not None:
+        usage = _usage(rendered, response, model_name, cached=True)
+    else:
+        chain = get_chain(template, model_name, temperature)
+        message = await outbound.acall("openai", lambda: chain.ainvoke(variables), retries=LLM_MAX_RETRIES)
+        response = message.content
+        usage = _usage(rendered, response, model_name, message)
+        await asyncio.to_thread(llm_cache.store, key, rendered, response, namespace, keywords)
+
+    await asyncio.to_thread(_record, _stage(template, stage), model_name, usage, time.perf_counter() - started)
+    return response, usage
+
+
+def run_prompt(template: str, variables: Dict, model_name: str = DEFAULT_MODEL_NAME, temperature: float = 0.7,
+               use_cache: bool = True, semantic_key: Optional[str] = None, keywords: Optional[List[str]] = None,
+               stage: Optional[str] = None) -> str:
+    """Render a prompt template and return the model's text response (see invoke_prompt)."""
+    return invoke_prompt(template, variables, model_name, temperature, use_cache, semantic_key, keywords, stage)[0]
+
+
+async def arun_prompt(template: str, variables: Dict, model_name: str = DEFAULT_MODEL_NAME, temperature: float = 0.7,
+                      use_cache: bool = True, semantic_key: Optional[str] = None, keywords: Optional[List[str]] = None,
+                      stage: Optional[str] = None) -> str:
+    """Async version of run_prompt."""
+    return (await ainvoke_prompt(template, variables, model_name, temperature, use_cache, semantic_key, keywords, stage))[0]
+
+
+def stream_prompt(template: str, variables: Dict, model_name: str = DEFAULT_MODEL_NAME, temperature: float = 0.7,
+                  use_cache: bool = True, stage: Optional[str] = None) -> Iterator[str]:
+    """
+    Render a prompt template and yield the model's response as it is generated.
+
+    A cached response is yielded in one piece; a streamed response is cached once it completes.
+
+    Args:
+        template (str): Prompt template with {variable} placeholders
+        variables (Dict): Values for the placeholders
+        model_name (str): OpenAI chat model
+        temperature (float): Sampling temperature
+        use_cache (bool): Reuse a cached response for an identical prompt (see llm_cache). If False,
+                          the model is called and its response replaces the cached one
+        stage (str): Name the call's token usage is recorded under
+
+    Yields:
+        str: Response text chunks
+    """
+    started = time.perf_counter()
+    rendered, key, namespace, _ = _prepare(template, variables, model_name, temperature)
+
+    response = llm_cache.lookup(key) if use_cache else None
+    if response is not None:
+        yield response
+        _record(_stage(template, stage), model_name, _usage(rendered, response, model_name, cached=True),
+                time.perf_counter() - started)
+        return
+
+    chain = get_chain(template, model_name, temperature)
+
+    def _open_stream():
+        # Only opening the stream is retried: text that has been yielded can't be taken back
+        iterator = iter(chain.stream(variables))
+        return iterator, next(iterator, None)
+
+    iterator, first = outbound.call("openai", _open_stream, retries=LLM_MAX_RETRIES)
+    chunks, message = [], None
+    for chunk in itertools.chain([first] if first is not None else [], iterator):
+        message = chunk if message is None else message + chunk  # the last chunk carries the usage
+        chunks.append(chunk.content)
+        yield chunk.content
+    response = "".join(chunks)
+    llm_cache.store(key, rendered, response, namespace)
+    _record(_stage(template, stage), model_name, _usage(rendered, response, model_name, message),
+            time.perf_counter() - started)
+
+
+def _event_loop() -> asyncio.AbstractEventLoop:
+    """The background event loop all async model calls run on, started on first use."""
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-event-loop", daemon=True).start()
+        return _loop
+
+
+def run_async(coroutine: Awaitable):
+    """Run a coroutine on the background event loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coroutine, _event_loop()).result()
+
+
+def run_batch(jobs: List[Callable[[], Awaitable]], max_concurrency: Optional[int] = None) -> List[Dict]:
+    """
+    Run async jobs concurrently, at most max_concurrency at a time.
+
+    One failing job does not stop the others: each result is reported separately.
+
+    Args:
+        jobs (List[Callable]): Zero-argument functions returning a coroutine, e.g. lambda: arun_prompt(...)
+        max_concurrency (int): Jobs in flight at once (default LLM_MAX_CONCURRENCY)
+
+    Returns:
+        List[Dict]: One {"result": ..., "error": str | None} per job, in input order
+    """
+    if not jobs:
+        return []
+
+    async def _run_all():
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or LLM_MAX_CONCURRENCY))
+
+        async def _run(job):
+            async with semaphore:
+                try:
+                    return {"result": await job(), "error": None}
+                except Exception as e:
+                    return {"result": None, "error": f"{type(e).__name__}: {e}"}
+
+        return await asyncio.gather(*(_run(job) for job in jobs))
+
+    return run_async(_run_all())
@@ -1,15 +1,9 @@
 import json
-from langchain_openai import ChatOpenAI # Wrapper for OpenAI's chat models
-from langchain.prompts import PromptTemplate # Reusable template for prompt formatting
-from langchain.chains import LLMChain # Combines LLMs with prompts to create a chain of operations
-import os
-from dotenv import load_dotenv
+from typing import Dict, Optional
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Load the OpenAI API key from environment variables
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+from src.agents.budget import TOPIC_KEYWORD_BUDGET, fit_keywords
+from src.agents.runtime import run_prompt # Shared, pooled model clients and cached prompt chains
+from src.analyzers.vector_index import grounding_context
 
 # Return a JSON array instead of a text response so that it is easier to parse one topic at a time.
     # Note the double curly braces {{ and }} around the JSON object literals inside the prompt. 
@@ -33,34 +27,49 @@ Example output:
   }}
 ]
 
-Return ONLY the JSON array, no extra text.
+{context}Return ONLY the JSON array, no extra text.
 """
 
 
-def generate_topics(keywords: list, model_name = "gpt-4o-mini"):
-    
-    #print("generate_topics called")
-    #print("DEBUG: Keywords passed in:", keywords[:5])  # preview first 5 keywords
+def generate_topics(keywords: list, model_name = "gpt-4o-mini", related_items: int = 0, semantic_cache: bool = False,
+                    keyword_weights: Optional[Dict[str, float]] = None, keyword_budget: int = TOPIC_KEYWORD_BUDGET,
+                    use_cache: bool = True):
+    """
+    Suggest article topics for a list of keywords.
 
-    # Langhchain PromptTemplate needs to know the name # of the variables it will use in the template, not the values.
-    # In this case, we have a single variable called "keywords".
-    # The template will be filled in with the actual keywords when the prompt is run.
-    # This allows for dynamic generation of prompts based on user input or other variables.
-    prompt_template = PromptTemplate(
-        input_variables=["keywords"], # Variables to be filled in the prompt 
-        template=prompt
-    )
+    Args:
+        keywords (list): Keywords selected from the analysis
+        model_name (str): OpenAI chat model
+        related_items (int): Number of similar already-collected items to ground the prompt with (0 = none)
+        semantic_cache (bool): Reuse cached topics generated for a nearly identical keyword set
+        keyword_weights (Dict[str, float]): Ranking used when the keywords don't fit the budget,
+                                            e.g. budget.keyword_weights (default: keep the given order)
+        keyword_budget (int): Tokens the keyword list may take in the prompt
+        use_cache (bool): Return cached topics for the same prompt; False generates a new set
 
-    llm = ChatOpenAI(openai_api_key=OPENAI_API_KEY, 
-                     model=model_name, 
-                     temperature=0.7) # Controls randomness. 0 = deterministic, 1 = creative. 0.7 gives moderately creative results.
+    Returns:
+        list | str: Parsed topics, or the raw response if it isn't valid JSON
+    """
     
-    chain = LLMChain(llm=llm, prompt=prompt_template)
+    #print("generate_topics called")
+    #print("DEBUG: Keywords passed in:", keywords[:5])  # preview first 5 keywords
 
+    # The prompt template and the model client (keyed by model and temperature) are built once per
+    # process by the shared runtime; only the variables change between calls.
+    # Temperature 0.7 gives moderately creative results.
+    # Keep the highest-weighted keywords that fit the token budget
+    kept = fit_keywords(keywords, keyword_budget, keyword_weights, model_name)
+    if len(kept) < len(keywords):
+        print(f"Using {len(kept)} of {len(keywords)} keywords to stay within {keyword_budget} tokens.")
+    keywords = kept
     keywords_str = ", ".join(keywords)
+    context = grounding_context(keywords_str, k=related_items) if related_items else ""
 
-    #print("DEBUG: Calling chain.run with keywords:", keywords_str)
-    raw_response = chain.run(keywords=keywords_str)
+    #print("DEBUG: Calling run_prompt with keywords:", keywords_str)
+    raw_response = run_prompt(prompt, {"keywords": keywords_str, "context": context},
+                              model_name=model_name, temperature=0.7, stage="topics",
+                              semantic_key="keywords" if semantic_cache else None, keywords=keywords,
+                              use_cache=use_cache)
     #print("DEBUG: Raw response:", raw_response)
 
     # Parse the JSON response
@@ -0,0 +1,205 @@
+# src/analyzers/clustering.py
+
+"""
+Scalable clustering of title embeddings.
+
+MiniBatchKMeans is trained with partial_fit over fixed-size chunks, so memory stays
+bounded and new data can be streamed in. The number of clusters can be picked
+automatically on a sample, and fitted centroids are saved so the next run can warm
+start from them instead of re-initializing.
+"""
+
+import os
+import pickle
+import re
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.decomposition import PCA
+from sklearn.metrics import silhouette_score
+
+ROOT = Path(__file__).resolve().parents[2]
+MODELS_DIR = Path(os.getenv("MODELS_DIR", ROOT / "data" / "models"))
+
+BATCH_SIZE = 1024
+K_RANGE = range(3, 11)
+SAMPLE_SIZE = 2000
+RANDOM_STATE = 42
+
+
+def _centroids_path(key: str) -> Path:
+    return MODELS_DIR / f"centroids_{re.sub(r'[^A-Za-z0-9_.-]', '_', key)}.npy"
+
+
+def load_centroids(key: str) -> Optional[np.ndarray]:
+    path = _centroids_path(key)
+    return np.load(path) if path.exists() else None
+
+
+def save_centroids(key: str, centroids: np.ndarray) -> None:
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    np.save(_centroids_path(key), centroids)
+
+
+def save_model(key: str, model) -> None:
+    """Pickle a fitted model (vectorizer, projection, ...) to MODELS_DIR."""
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(MODELS_DIR / f"{key}.pkl", "wb") as f:
+        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_model(key: str):
+    path = MODELS_DIR / f"{key}.pkl"
+    if not path.exists():
+        return None
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _sample(embeddings: np.ndarray, sample_size: int) -> np.ndarray:
+    if len(embeddings) <= sample_size:
+        return embeddings
+    rng = np.random.default_rng(RANDOM_STATE)
+    return embeddings[rng.choice(len(embeddings), sample_size, replace=False)]
+
+
+def _chunks(embeddings: np.ndarray, batch_size: int) -> Iterable[np.ndarray]:
+    for start in range(0, len(embeddings), batch_size):
+        yield embeddings[start:start + batch_size]
+
+
+def choose_k(embeddings: np.ndarray, k_range: Iterable[int] = K_RANGE, sample_size: int = SAMPLE_SIZE) -> int:
+    """
+    Pick the number of clusters with the best silhouette score on a random sample.
+
+    Args:
+        embeddings (np.ndarray): (n, dim) embeddings
+        k_range (Iterable[int]): Candidate cluster counts
+        sample_size (int): Max number of points scored
+
+    Returns:
+        int: Chosen number of clusters
+    """
+    sample = _sample(embeddings, sample_size)
+    candidates = [k for k in k_range if 2 <= k < len(sample)]
+    if not candidates:
+        return max(1, min(len(sample), 2))
+
+    best_k, best_score = candidates[0], -1.0
+    for k in candidates:
+        labels = MiniBatchKMeans(n_clusters=k, n_init=3, random_state=RANDOM_STATE).fit_predict(sample)
+        if len(set(labels)) < 2:
+            continue
+        score = silhouette_score(sample, labels)
+        if score > best_score:
+            best_k, best_score = k, score
+    return best_k
+
+
+def fit_minibatch(chunks: Iterable[np.ndarray], n_clusters: int, init_centroids: Optional[np.ndarray] = None,
+                  batch_size: int = BATCH_SIZE, model: Optional[MiniBatchKMeans] = None) -> MiniBatchKMeans:
+    """
+    Train (or keep training) MiniBatchKMeans with partial_fit over a stream of chunks.
+
+    Args:
+        chunks (Iterable[np.ndarray]): Embedding chunks
+        n_clusters (int): Number of clusters
+        init_centroids (np.ndarray): Warm start centroids, e.g. from load_centroids()
+        batch_size (int): Mini-batch size
+        model (MiniBatchKMeans): Existing model to update instead of creating one
+
+    Returns:
+        MiniBatchKMeans: The fitted model
+    """
+    if model is None:
+        model = MiniBatchKMeans(
+            n_clusters=n_clusters,
+            init=init_centroids if init_centroids is not None else "k-means++",
+            n_init=1 if init_centroids is not None else 3,
+            batch_size=batch_size,
+            random_state=RANDOM_STATE,
+        )
+
+    pending = None
+    for chunk in chunks:
+        # partial_fit needs at least n_clusters points the first time it is called
+        pending = chunk if pending is None else np.vstack([pending, chunk])
+        if len(pending) >= n_clusters:
+            model.partial_fit(pending)
+            pending = None
+    if pending is not None and hasattr(model, "cluster_centers_"):
+        model.partial_fit(pending)
+
+    return model
+
+
+def cluster_embeddings(embeddings: np.ndarray, n_clusters: Optional[int] = None, method: str = "minibatch",
+                       warm_start_key: Optional[str] = None, batch_size: int = BATCH_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cluster embeddings with a pluggable backend.
+
+    Args:
+        embeddings (np.ndarray): (n, dim) embeddings
+        n_clusters (int): Number of clusters. None = choose_k() on these embeddings
+        method (str): "minibatch" (streaming MiniBatchKMeans) or "kmeans" (full-batch KMeans)
+        warm_start_key (str): Name under which centroids are loaded/saved (e.g. the embedding model);
+                              saved centroids seed the fit only when their k matches
+        batch_size (int): Mini-batch size
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Cluster label per row and the fitted centroids
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    saved = load_centroids(warm_start_key) if warm_start_key else None
+    if saved is not None and saved.shape[1] != embeddings.shape[1]:
+        saved = None
+
+    # k is chosen afresh on every refit, so it follows the corpus as it grows
+    if n_clusters is None:
+        n_clusters = choose_k(embeddings)
+    n_clusters = max(1, min(n_clusters, len(embeddings)))
+    init_centroids = saved if saved is not None and len(saved) == n_clusters else None
+
+    if method == "kmeans":
+        model = KMeans(n_clusters=n_clusters, random_state=RANDOM_STATE,
+                       init=init_centroids if init_centroids is not None else "k-means++",
+                       n_init=1 if init_centroids is not None else "auto")
+        labels = model.fit_predict(embeddings)
+    elif method == "minibatch":
+        model = fit_minibatch(_chunks(embeddings, batch_size), n_clusters, init_centroids, batch_size)
+        labels = np.concatenate([model.predict(chunk) for chunk in _chunks(embeddings, batch_size)])
+    else:
+        raise ValueError(f"Unknown clustering method '{method}'. Expected 'minibatch' or 'kmeans'")
+
+    if warm_start_key:
+        save_centroids(warm_start_key, model.cluster_centers_)
+
+    return labels, model.cluster_centers_
+
+
+def assign_clusters(embeddings: np.ndarray, centroids: np.ndarray, batch_size: int = 10000) -> np.ndarray:
+    """Label of the nearest centroid for each row (no refit)."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    centroid_norms = (centroids ** 2).sum(axis=1)
+    labels = [
+        np.argmin(centroid_norms - 2 * chunk @ centroids.T, axis=1)
+        for chunk in _chunks(embeddings, batch_size)
+    ]
+    return np.concatenate(labels) if labels else np.empty(0, dtype=np.int64)
+
+
+def fit_projection(embeddings: np.ndarray, sample_size: int = 10000) -> PCA:
+    """2D PCA fitted on a random sample."""
+    pca = PCA(n_components=2, random_state=RANDOM_STATE)
+    pca.fit(_sample(np.asarray(embeddings, dtype=np.float32), sample_size))
+    return pca
+
+
+def project_2d(embeddings: np.ndarray, sample_size: int = 10000, batch_size: int = 10000,
+               pca: Optional[PCA] = None) -> np.ndarray:
+    """PCA to 2D for plotting: fit on a sample (unless a fitted pca is given), then transform in chunks."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    pca = pca or fit_projection(embeddings, sample_size)
+    return np.vstack([pca.transform(chunk) for chunk in _chunks(embeddings, batch_size)])
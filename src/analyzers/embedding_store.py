@@ -0,0 +1,181 @@
+# src/analyzers/embedding_store.py
+
+"""
+Persistent on-disk embedding cache.
+
+Vectors for each model live in a memory-mapped float32 (or float16) file, one row
+per text, next to a JSON index mapping normalized-text hash -> row. Only texts that
+are not in the index are sent to the encoder, in batches and - for large inputs -
+on a multi-process pool spanning the CPU cores.
+"""
+
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.analyzers.model_registry import DEFAULT_MODEL_NAME, get_sentence_model
+from src.utils.text_cleaner import text_hash
+
+ROOT = Path(__file__).resolve().parents[2]
+EMBEDDINGS_DIR = Path(os.getenv("EMBEDDINGS_DIR", ROOT / "data" / "embeddings"))
+
+# Encoding settings (overridable per call)
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 64))
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", os.cpu_count() or 1))
+EMBED_DTYPE = os.getenv("EMBED_DTYPE", "float32")
+EMBED_INCLUDE_SUMMARY = os.getenv("EMBED_INCLUDE_SUMMARY", "").lower() in ("1", "true", "yes")
+
+# Below this many new texts a worker pool costs more to start than it saves
+MULTI_PROCESS_MIN_TEXTS = 2000
+
+# Storage dtype -> (vector file, index file)
+STORAGE_FILES = {
+    "float32": ("vectors.f32", "index.json"),
+    "float16": ("vectors.f16", "index.f16.json"),
+}
+
+
+class EmbeddingStore:
+    """Append-only embedding store for one model and storage dtype."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, base_dir: Optional[Path] = None, dtype: str = "float32"):
+        if dtype not in STORAGE_FILES:
+            raise ValueError(f"Unsupported embedding dtype '{dtype}'. Expected one of {list(STORAGE_FILES)}")
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        self.path = Path(base_dir or EMBEDDINGS_DIR) / re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+        vectors_file, index_file = STORAGE_FILES[dtype]
+        self.vectors_path = self.path / vectors_file
+        self.index_path = self.path / index_file
+        self._lock = threading.Lock()
+
+        self.dim: Optional[int] = None
+        self.index: Dict[str, int] = {}
+        if self.index_path.exists():
+            meta = json.loads(self.index_path.read_text())
+            self.dim = meta["dim"]
+            self.index = meta["rows"]
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def _n_rows(self) -> int:
+        # Count rows from the file itself: a crash between writing vectors and index leaves orphan rows
+        if self.dim is None or not self.vectors_path.exists():
+            return 0
+        return self.vectors_path.stat().st_size // (self.dim * self.dtype.itemsize)
+
+    def _vectors(self) -> np.ndarray:
+        n_rows = self._n_rows()
+        if not n_rows:
+            return np.empty((0, self.dim or 0), dtype=self.dtype)
+        return np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(n_rows, self.dim))
+
+    def get(self, hashes: List[str]) -> np.ndarray:
+        """Vectors for hashes that are all in the store, in the given order."""
+        rows = [self.index[h] for h in hashes]
+        return np.asarray(self._vectors()[rows])
+
+    def missing(self, hashes: List[str]) -> List[str]:
+        return [h for h in hashes if h not in self.index]
+
+    def add(self, hashes: List[str], vectors: np.ndarray) -> None:
+        """Append new vectors and persist the index (existing hashes are skipped)."""
+        vectors = np.asarray(vectors, dtype=self.dtype)
+        with self._lock:
+            keep = [i for i, h in enumerate(hashes) if h not in self.index]
+            if not keep:
+                return
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dim {vectors.shape[1]} does not match store dim {self.dim}")
+
+            self.path.mkdir(parents=True, exist_ok=True)
+            start = self._n_rows()
+            with open(self.vectors_path, "ab") as f:
+                f.write(vectors[keep].tobytes())
+
+            for offset, i in enumerate(keep):
+                self.index[hashes[i]] = start + offset
+
+            # Write the index only after the vectors are on disk, via an atomic rename
+            tmp_path = self.index_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({"model": self.model_name, "dim": self.dim, "rows": self.index}))
+            os.replace(tmp_path, self.index_path)
+
+
+_stores: Dict[tuple, EmbeddingStore] = {}
+
+
+def get_embedding_store(model_name: str = DEFAULT_MODEL_NAME, dtype: str = EMBED_DTYPE) -> EmbeddingStore:
+    key = (model_name, dtype)
+    if key not in _stores:
+        _stores[key] = EmbeddingStore(model_name, dtype=dtype)
+    return _stores[key]
+
+
+def encode_texts(texts: List[str], model_name: str = DEFAULT_MODEL_NAME, batch_size: int = EMBED_BATCH_SIZE,
+                 num_workers: int = EMBED_WORKERS) -> np.ndarray:
+    """
+    Encode texts with the shared model, fanning out to one process per core for large inputs.
+
+    Args:
+        texts (List[str]): Texts to embed
+        model_name (str): sentence-transformers model name
+        batch_size (int): Encoder batch size
+        num_workers (int): Number of encoder processes (1 = encode in this process)
+
+    Returns:
+        np.ndarray: (len(texts), dim) embeddings
+    """
+    model = get_sentence_model(model_name)
+
+    if num_workers > 1 and len(texts) >= MULTI_PROCESS_MIN_TEXTS:
+        pool = model.start_multi_process_pool(target_devices=["cpu"] * num_workers)
+        try:
+            return model.encode_multi_process(texts, pool, batch_size=batch_size)
+        finally:
+            model.stop_multi_process_pool(pool)
+
+    return model.encode(texts, batch_size=batch_size, show_progress_bar=False)
+
+
+def encode_with_cache(texts: List[str], model_name: str = DEFAULT_MODEL_NAME,
+                      store: Optional[EmbeddingStore] = None, batch_size: int = EMBED_BATCH_SIZE,
+                      num_workers: int = EMBED_WORKERS, dtype: str = EMBED_DTYPE) -> np.ndarray:
+    """
+    Embed texts, encoding only the ones not already in the on-disk store.
+
+    Args:
+        texts (List[str]): Texts to embed
+        model_name (str): sentence-transformers model name
+        store (EmbeddingStore): Store to use. Defaults to the shared store for model_name and dtype
+        batch_size (int): Encoder batch size
+        num_workers (int): Number of encoder processes for large inputs
+        dtype (str): Storage dtype, "float32" or "float16" (half the disk and page cache)
+
+    Returns:
+        np.ndarray: (len(texts), dim) float32 embeddings in input order
+    """
+    store = store or get_embedding_store(model_name, dtype)
+    hashes = [text_hash(t) for t in texts]
+
+    # Encode each missing text once, even if it appears several times
+    to_encode = {}
+    for h, text in zip(hashes, texts):
+        if h not in store.index and h not in to_encode:
+            to_encode[h] = text
+
+    if to_encode:
+        vectors = encode_texts(list(to_encode.values()), model_name, batch_size=batch_size, num_workers=num_workers)
+        store.add(list(to_encode.keys()), vectors)
+
+    if not hashes:
+        return np.empty((0, store.dim or 0), dtype=np.float32)
+    return store.get(hashes).astype(np.float32)
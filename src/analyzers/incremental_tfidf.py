@@ -0,0 +1,95 @@
+# src/analyzers/incremental_tfidf.py
+
+"""
+TF-IDF whose vocabulary and document frequencies are updated with partial fits.
+
+Each chunk of cleaned titles is counted on its own (CountVectorizer with the same
+n-gram settings as vectorize_text), its document frequencies are merged into a
+running total, and the chunk is weighted with the IDF of every document seen so far.
+Memory is bounded by the vocabulary, not the corpus: when it grows past max_terms the
+rarest terms are pruned. Each analysis pass starts from an empty state (it reads the
+whole slice, so carrying counts over would count rows twice); the state at the end of
+the pass is pickled to MODELS_DIR for later keyword weighting.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.analyzers.clustering import load_model, save_model
+
+NGRAM_RANGE = (1, 2)
+MAX_TERMS = 2_000_000
+
+
+class IncrementalTfidf:
+    """Streaming equivalent of TfidfVectorizer(ngram_range=(1, 2)) with smooth IDF and L2 norm."""
+
+    def __init__(self, ngram_range: Tuple[int, int] = NGRAM_RANGE, max_terms: int = MAX_TERMS):
+        self.ngram_range = ngram_range
+        self.max_terms = max_terms
+        self.n_docs = 0
+        self.doc_freq: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.doc_freq)
+
+    def _count(self, texts: Iterable[str]):
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        vectorizer = CountVectorizer(ngram_range=self.ngram_range, dtype=np.float32)
+        try:
+            counts = vectorizer.fit_transform(texts).tocsr()
+        except ValueError:  # only empty / stop-word texts in this chunk
+            return None, np.array([], dtype=object)
+        return counts, vectorizer.get_feature_names_out()
+
+    def _prune(self) -> None:
+        # Drop the rarest terms until the vocabulary is back to 90% of the budget
+        if len(self.doc_freq) <= self.max_terms:
+            return
+        keep = int(self.max_terms * 0.9)
+        terms = list(self.doc_freq)
+        counts = np.fromiter(self.doc_freq.values(), dtype=np.int64, count=len(terms))
+        # argpartition breaks ties at the cut-off, so exactly keep terms survive
+        kept = np.argpartition(-counts, keep - 1)[:keep]
+        self.doc_freq = {terms[i]: int(counts[i]) for i in kept}
+
+    def partial_fit_transform(self, texts: List[str]) -> Tuple["sparse.csr_matrix", np.ndarray]:
+        """
+        Add a chunk of documents to the document frequencies and return its TF-IDF weights.
+
+        Args:
+            texts (List[str]): Cleaned texts
+
+        Returns:
+            Tuple[sparse.csr_matrix, np.ndarray]: (len(texts), n_chunk_terms) L2-normalized weights
+                                                  and the chunk's feature names
+        """
+        from scipy import sparse
+        from sklearn.preprocessing import normalize
+
+        texts = list(texts)
+        counts, feature_names = self._count(texts)
+        self.n_docs += len(texts)
+        if counts is None:
+            return sparse.csr_matrix((len(texts), 0), dtype=np.float32), feature_names
+
+        chunk_df = np.bincount(counts.indices, minlength=len(feature_names))
+        doc_freq = np.empty(len(feature_names), dtype=np.float64)
+        for i, (term, df) in enumerate(zip(feature_names, chunk_df)):
+            total = self.doc_freq.get(term, 0) + int(df)
+            self.doc_freq[term] = total
+            doc_freq[i] = total
+        self._prune()
+
+        idf = np.log((1 + self.n_docs) / (1 + doc_freq)) + 1
+        weights = counts @ sparse.diags(idf.astype(np.float32))
+        return normalize(weights, norm="l2", copy=False).tocsr(), feature_names
+
+    def save(self, key: str = "tfidf_incremental") -> None:
+        save_model(key, self)
+
+    @classmethod
+    def load(cls, key: str = "tfidf_incremental") -> Optional["IncrementalTfidf"]:
+        return load_model(key)
@@ -0,0 +1,74 @@
+# src/analyzers/model_registry.py
+
+"""
+Process-wide registry of SentenceTransformer models.
+
+Models are loaded lazily on first use and then shared by every caller in the
+process (including all Streamlit reruns and sessions, since modules stay imported).
+"""
+
+import threading
+from typing import Dict, Iterable, Optional
+
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+
+_models: Dict[str, object] = {}
+_lock = threading.Lock()
+_prewarm_thread: Optional[threading.Thread] = None
+
+
+def get_sentence_model(model_name: str = DEFAULT_MODEL_NAME):
+    """
+    Return the shared SentenceTransformer for model_name, loading it on first call.
+
+    Args:
+        model_name (str): sentence-transformers model name
+
+    Returns:
+        SentenceTransformer: The cached model instance
+    """
+    model = _models.get(model_name)
+    if model is None:
+        with _lock:
+            # Another thread may have loaded it while we waited for the lock
+            model = _models.get(model_name)
+            if model is None:
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(model_name)
+                _models[model_name] = model
+    return model
+
+
+def is_loaded(model_name: str = DEFAULT_MODEL_NAME) -> bool:
+    return model_name in _models
+
+
+def prewarm(model_names: Iterable[str] = (DEFAULT_MODEL_NAME,), background: bool = True) -> Optional[threading.Thread]:
+    """
+    Load models ahead of the first analysis run.
+
+    Args:
+        model_names (Iterable[str]): Models to load
+        background (bool): Load on a daemon thread instead of blocking the caller
+
+    Returns:
+        threading.Thread: The loader thread when background=True (started once per process)
+    """
+    global _prewarm_thread
+
+    def _load():
+        for name in model_names:
+            try:
+                get_sentence_model(name)
+            except Exception as e:
+                print(f"⚠️ Could not pre-load model {name}: {e}")
+
+    if not background:
+        _load()
+        return None
+
+    with _lock:
+        if _prewarm_thread is None:
+            _prewarm_thread = threading.Thread(target=_load, name="model-prewarm", daemon=True)
+            _prewarm_thread.start()
+    return _prewarm_thread
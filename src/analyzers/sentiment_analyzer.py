@@ -0,0 +1,126 @@
+# src/analyzers/sentiment_analyzer.py
+
+"""
+Batch sentiment scoring.
+
+Texts are scored in chunks by a pluggable batch scorer (VADER by default), optionally
+across a process pool. Scores are cached per normalized-text hash in the content
+database, so unchanged titles are never re-scored.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from src.database.schema import get_connection
+from src.database.db_reader import read_sentiment_cache
+from src.database.db_writer import save_sentiment_cache
+from src.utils.text_cleaner import text_hash
+
+CHUNK_SIZE = 5000
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+# A batch scorer takes a list of texts and returns one compound score in [-1, 1] per text
+BatchScorer = Callable[[List[str]], List[float]]
+
+
+def _vader_scorer() -> BatchScorer:
+    from nltk.sentiment import SentimentIntensityAnalyzer
+    from src.utils.resources import require_nltk
+
+    require_nltk("vader_lexicon")
+    analyzer = SentimentIntensityAnalyzer()
+    return lambda texts: [analyzer.polarity_scores(text)["compound"] for text in texts]
+
+
+# Scorer name -> factory. The name is part of the cache key, so bump it when a scorer changes.
+SCORERS: Dict[str, Callable[[], BatchScorer]] = {
+    "vader": _vader_scorer,
+}
+DEFAULT_SCORER = "vader"
+
+_scorers: Dict[str, BatchScorer] = {}
+
+
+def register_scorer(name: str, factory: Callable[[], BatchScorer]) -> None:
+    """Make a batch scorer available to score_texts(scorer=name)."""
+    SCORERS[name] = factory
+    _scorers.pop(name, None)
+
+
+def get_scorer(name: str = DEFAULT_SCORER) -> BatchScorer:
+    if name not in SCORERS:
+        raise ValueError(f"Unknown sentiment scorer '{name}'. Expected one of {list(SCORERS)}")
+    if name not in _scorers:
+        _scorers[name] = SCORERS[name]()
+    return _scorers[name]
+
+
+def _score_chunk(args) -> List[float]:
+    # Runs in pool workers: each process builds its own scorer once
+    name, texts = args
+    return get_scorer(name)(texts)
+
+
+def _score_uncached(texts: List[str], scorer: str, chunk_size: int, num_workers: int) -> List[float]:
+    chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+    if num_workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            results = executor.map(_score_chunk, [(scorer, chunk) for chunk in chunks])
+            return [score for chunk_scores in results for score in chunk_scores]
+    return [score for chunk in chunks for score in _score_chunk((scorer, chunk))]
+
+
+def score_texts(texts: List[str], scorer: str = DEFAULT_SCORER, chunk_size: int = CHUNK_SIZE,
+                num_workers: int = 1, use_cache: bool = True) -> np.ndarray:
+    """
+    Compound sentiment score per text.
+
+    Args:
+        texts (List[str]): Texts to score
+        scorer (str): Name of a registered batch scorer
+        chunk_size (int): Texts per scorer call / pool task
+        num_workers (int): Processes to score with (1 = in this process)
+        use_cache (bool): Read and write the per-text-hash score cache
+
+    Returns:
+        np.ndarray: Scores in input order
+    """
+    texts = ["" if not isinstance(text, str) else text for text in texts]
+    hashes = [text_hash(text) for text in texts]
+
+    cached: Dict[str, float] = {}
+    conn = get_connection() if use_cache else None
+    try:
+        if conn is not None:
+            cached = read_sentiment_cache(conn, list(set(hashes)), scorer)
+
+        # Score each distinct uncached text once
+        to_score = {}
+        for h, text in zip(hashes, texts):
+            if h not in cached and h not in to_score:
+                to_score[h] = text
+
+        if to_score:
+            scores = _score_uncached(list(to_score.values()), scorer, chunk_size, num_workers)
+            new_scores = dict(zip(to_score.keys(), scores))
+            cached.update(new_scores)
+            if conn is not None:
+                save_sentiment_cache(conn, new_scores, scorer)
+    finally:
+        if conn is not None:
+            conn.close()
+
+    return np.array([cached[h] for h in hashes], dtype=np.float64)
+
+
+def label_sentiment(scores) -> np.ndarray:
+    """Vectorized Positive / Negative / Neutral labels using the VADER thresholds."""
+    scores = np.asarray(scores, dtype=np.float64)
+    return np.select(
+        [scores >= POSITIVE_THRESHOLD, scores <= NEGATIVE_THRESHOLD],
+        ["Positive", "Negative"],
+        default="Neutral",
+    )
@@ -1,50 +1,57 @@
 # src/analyzers/trend_sentiment_analyser.py
 
+import hashlib
 import os
-import sqlite3
 import string
+import time
+import uuid
 from collections import Counter
-from pathlib import Path
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Dict, Optional
 
-import nltk
+import numpy as np
 import pandas as pd
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.sentiment import SentimentIntensityAnalyzer
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.decomposition import NMF, PCA
-from sklearn.cluster import KMeans
-from sklearn.decomposition import PCA
-
-from sentence_transformers import SentenceTransformer
+from src.analyzers.model_registry import DEFAULT_MODEL_NAME
+from src.analyzers.embedding_store import EMBED_INCLUDE_SUMMARY, encode_with_cache
+from src.analyzers.vector_index import get_vector_index
+from src.analyzers.sentiment_analyzer import DEFAULT_SCORER, label_sentiment, score_texts
+from src.database.db_reader import iter_content, read_content
+from src.utils.resources import require_nltk
+from src.utils.text_cleaner import clean_texts, get_stop_words
 
 # --- Setup ---
-nltk.download("punkt", quiet=True)
-nltk.download("stopwords", quiet=True)
-nltk.download("vader_lexicon", quiet=True)
+# NLTK data is provisioned once with `python -m src.utils.resources setup`, and
+# nltk / scikit-learn / scipy / sentence-transformers are imported on first use,
+# so importing this module (and the Analyze tab) stays cheap.
+
+
+# Bump when the cleaning / keyword / sentiment steps change, so stored rows are recomputed
+ANALYSIS_VERSION = 1
+
+# Refit TF-IDF, topics, clustering and the projection once this share of rows is new since the last refit
+REFIT_THRESHOLD = float(os.getenv("ANALYSIS_REFIT_THRESHOLD", 0.2))
 
-stop_words = set(stopwords.words("english"))
-sentiment_analyzer = SentimentIntensityAnalyzer()
+# Rows per chunk in streaming mode (bounds peak memory, see analyze_trends_streaming)
+ANALYSIS_CHUNK_SIZE = int(os.getenv("ANALYSIS_CHUNK_SIZE", 20000))
+# Appended to the model keys of streaming runs, so they never replace the batch models
+STREAMING_KEY_SUFFIX = ":streaming"
 
 
 # === Step 1: Load Data ===
-def load_content_data() -> pd.DataFrame:
-    root = Path(__file__).resolve().parents[2]
-    db_path = root / "data" / "content_data.db"
-    conn = sqlite3.connect(db_path)
-    df = pd.read_sql_query("SELECT * FROM content", conn)
-    conn.close()
-
-    df["publishedAt"] = pd.to_datetime(df["publishedAt"], utc=True)
-    return df
+def load_content_data(since=None, until=None, sources: List[str] = None, themes: List[str] = None) -> pd.DataFrame:
+    # Only the slice being analyzed is read; filters hit the publishedAt/source/theme indexes
+    return read_content(since=since, until=until, sources=sources, themes=themes)
 
 
 # === Step 2: Clean Text ===
 def clean_text(text: str) -> str:
+    # Reference (NLTK) implementation; the pipeline uses the vectorized clean_texts()
     if not isinstance(text, str):
         return ""
+    from nltk.tokenize import word_tokenize
+    require_nltk("punkt", "punkt_tab")
+
+    stop_words = get_stop_words()
     text = text.lower()
     text = text.translate(str.maketrans("", "", string.punctuation))
     tokens = word_tokenize(text)
@@ -52,16 +59,29 @@ def clean_text(text: str) -> str:
     return " ".join(tokens)
 
 
+def find_clean_text_mismatches(titles: pd.Series) -> pd.DataFrame:
+    """Parity check: titles where clean_texts() differs from the NLTK clean_text() reference."""
+    fast = clean_texts(titles)
+    reference = titles.apply(clean_text)
+    mismatched = fast != reference
+    return pd.DataFrame({"title": titles[mismatched], "reference": reference[mismatched], "fast": fast[mismatched]})
+
+
 # === Step 3: TF-IDF Vectorization ===
-def vectorize_text(text_series: pd.Series, max_features: int = 100) -> Tuple[pd.DataFrame, TfidfVectorizer]:
-    vectorizer = TfidfVectorizer(max_features=max_features, ngram_range=(1, 2))
+def vectorize_text(text_series: pd.Series, max_features: Optional[int] = None,
+                   min_df=1) -> Tuple["sparse.csr_matrix", "TfidfVectorizer"]:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    # Stays sparse: memory scales with non-zeros, so the vocabulary no longer needs a small cap
+    vectorizer = TfidfVectorizer(max_features=max_features, ngram_range=(1, 2), min_df=min_df, dtype=np.float32)
     tfidf_matrix = vectorizer.fit_transform(text_series)
-    tfidf_df = pd.DataFrame(tfidf_matrix.toarray(), columns=vectorizer.get_feature_names_out())
-    return tfidf_df, vectorizer
+    return tfidf_matrix.tocsr(), vectorizer
 
 
 # === Step 4: Topic Modeling ===
 def extract_topics(tfidf_matrix, vectorizer, n_topics: int = 5) -> List[List[str]]:
+    from sklearn.decomposition import NMF
+
     nmf = NMF(n_components=n_topics, random_state=42)
     nmf.fit(tfidf_matrix)
     feature_names = vectorizer.get_feature_names_out()
@@ -73,16 +93,29 @@ def extract_topics(tfidf_matrix, vectorizer, n_topics: int = 5) -> List[List[str
 
 
 # === Step 5: Extract Keywords Per Title ===
-def extract_keywords(tfidf_df: pd.DataFrame, vectorizer, top_n: int = 3) -> List[List[str]]:
-    feature_names = vectorizer.get_feature_names_out()
-    keywords_per_title = []
+def top_n_per_row(matrix: "sparse.csr_matrix", top_n: int = 3) -> List[np.ndarray]:
+    """Column indices of the top_n largest non-zeros of each row, highest first, without densifying."""
+    from scipy import sparse
 
-    for row in tfidf_df.values:   # ✅ fixed here
-        sorted_indices = row.argsort()[::-1][:top_n]
-        keywords = [feature_names[i] for i in sorted_indices]
-        keywords_per_title.append(keywords)
+    matrix = sparse.csr_matrix(matrix)
+    row_lengths = np.diff(matrix.indptr)
+    row_ids = np.repeat(np.arange(matrix.shape[0]), row_lengths)
 
-    return keywords_per_title
+    # Sort all non-zeros by row, then by weight descending, and keep each row's first top_n
+    order = np.lexsort((-matrix.data, row_ids))
+    rank_in_row = np.arange(len(order)) - matrix.indptr[row_ids[order]]
+    top_columns = matrix.indices[order[rank_in_row < top_n]]
+
+    counts = np.minimum(row_lengths, top_n)
+    return np.split(top_columns, np.cumsum(counts)[:-1])
+
+
+def extract_keywords(tfidf_matrix, vectorizer, top_n: int = 3) -> List[List[str]]:
+    # Rows with fewer than top_n non-zero terms get only those terms
+    if isinstance(tfidf_matrix, pd.DataFrame):
+        tfidf_matrix = tfidf_matrix.values
+    feature_names = vectorizer.get_feature_names_out()
+    return [feature_names[columns].tolist() for columns in top_n_per_row(tfidf_matrix, top_n)]
 
 
 # === Step 6: Sentiment Analysis ===
@@ -95,36 +128,279 @@ def get_sentiment_label(score: float) -> str:
         return "Neutral"
 
 
-def compute_sentiment_scores(df: pd.DataFrame) -> pd.DataFrame:
-    df["sentiment_score"] = df["title"].apply(lambda x: sentiment_analyzer.polarity_scores(x)["compound"])
-    df["sentiment_label"] = df["sentiment_score"].apply(get_sentiment_label)
+def compute_sentiment_scores(df: pd.DataFrame, num_workers: int = 1) -> pd.DataFrame:
+    # Chunked batch scoring with a per-title cache; labels via vectorized thresholds
+    df["sentiment_score"] = score_texts(df["title"].tolist(), num_workers=num_workers)
+    df["sentiment_label"] = label_sentiment(df["sentiment_score"].values)
     return df
 
 
 # === Step 7: Semantic Clustering ===
-def cluster_titles(df: pd.DataFrame, n_clusters: int = 5) -> Tuple[pd.DataFrame, List[int]]:
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-    embeddings = model.encode(df["title"].tolist(), show_progress_bar=False)
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-    df["cluster"] = kmeans.fit_predict(embeddings)
+def build_embedding_texts(df: pd.DataFrame, include_summary: bool = False) -> List[str]:
+    # Optionally append the Google snippet / RSS summary to give the encoder more context
+    texts = df["title"].fillna("")
+    if include_summary and "summary" in df:
+        summary = df["summary"].fillna("").str.strip()
+        texts = texts.where(summary == "", texts + ". " + summary)
+    return texts.tolist()
+
+
+def cluster_titles(df: pd.DataFrame, n_clusters: Optional[int] = None, model_name: str = DEFAULT_MODEL_NAME,
+                   include_summary: bool = EMBED_INCLUDE_SUMMARY, method: str = "minibatch",
+                   **encode_options) -> Tuple[pd.DataFrame, List[int]]:
+    from src.analyzers.clustering import cluster_embeddings
+
+    # Only titles not embedded by a previous run hit the encoder.
+    # encode_options: batch_size, num_workers, dtype (see encode_with_cache)
+    texts = build_embedding_texts(df, include_summary)
+    embeddings = encode_with_cache(texts, model_name=model_name, **encode_options)
+    if "id" in df:
+        # Keep the similarity index (used to ground topic / brief generation) in sync
+        get_vector_index(model_name).add(df["id"].tolist(), embeddings)
+    # n_clusters=None picks k automatically; centroids from the previous run seed this one if k matches
+    df["cluster"], _ = cluster_embeddings(embeddings, n_clusters=n_clusters, method=method, warm_start_key=model_name)
     return df, embeddings
 
 
 # === Master Function ===
-def analyze_trends_and_sentiment() -> pd.DataFrame:
-    df = load_content_data()
-    df["clean_title"] = df["title"].apply(clean_text)
+def analysis_model_version(model_name: str = DEFAULT_MODEL_NAME, include_summary: bool = EMBED_INCLUDE_SUMMARY,
+                           scorer: str = DEFAULT_SCORER) -> str:
+    """Version string stored with every analysis row; rows with another version are recomputed."""
+    return f"analysis-v{ANALYSIS_VERSION}|sentiment:{scorer}|embed:{model_name}{'+summary' if include_summary else ''}"
+
+
+def content_hashes(df: pd.DataFrame) -> List[str]:
+    # Changes to the title or summary invalidate a row's stored analysis
+    summaries = df["summary"].fillna("") if "summary" in df else [""] * len(df)
+    return [hashlib.sha1(f"{title}\x1f{summary}".encode("utf-8")).hexdigest()
+            for title, summary in zip(df["title"], summaries)]
+
+
+def _set_rows(df: pd.DataFrame, column: str, mask: np.ndarray, values) -> None:
+    # Assign values (possibly lists) to the masked rows of one column
+    column_values = df[column].tolist() if column in df else [None] * len(df)
+    for position, value in zip(np.flatnonzero(mask), values):
+        column_values[position] = value
+    df[column] = column_values
+
+
+def analyze_trends_and_sentiment(since=None, until=None, sources: List[str] = None, themes: List[str] = None,
+                                 refit_threshold: float = REFIT_THRESHOLD,
+                                 force_refit: bool = False) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Analyze a slice of the content table, reusing stored results for unchanged rows.
+
+    Per-row outputs are persisted in the analysis table keyed by content id, together with
+    a hash of the analyzed text and the model versions. Only new or changed rows are
+    cleaned, scored and embedded. The corpus-level models (TF-IDF, NMF topics, clustering,
+    2D projection) are refitted on the whole slice only when the share of rows added since
+    the last refit exceeds refit_threshold; otherwise new rows are keyword-extracted,
+    clustered and projected with the saved models.
+
+    Every row records the fit (fit_id) its keywords, cluster and coordinates came from. Rows
+    from another fit (e.g. an earlier run over a different slice, or a streaming run) count
+    as added since the last refit and are reassigned with the current models, so one slice's
+    labels and coordinates are never mixed with another's.
+
+    Args:
+        since, until, sources, themes: Filters on the content table (see read_content)
+        refit_threshold (float): Share of new/changed rows that triggers a full refit
+        force_refit (bool): Refit the corpus-level models regardless of the delta
+
+    Returns:
+        Tuple[pd.DataFrame, np.ndarray]: Analyzed rows and their 2D coordinates
+    """
+    from src.analyzers.clustering import assign_clusters, fit_projection, load_centroids, load_model, project_2d, save_model
+    from src.database.db_reader import load_last_refit, read_analysis_rows
+    from src.database.db_writer import save_analysis_run, upsert_analysis
+    from src.database.schema import get_connection
+
+    start = time.perf_counter()
+    version = analysis_model_version()
+
+    df = load_content_data(since=since, until=until, sources=sources, themes=themes)
+    if df.empty:
+        return df, np.empty((0, 2))
+
+    df["content_hash"] = content_hashes(df)
+    conn = get_connection()
+    try:
+        stored = read_analysis_rows(conn, df["id"].tolist())
+        stored = stored.rename(columns={"content_hash": "stored_hash", "model_version": "stored_version"})
+        df = df.merge(stored, on="id", how="left")
+        df["model_version"] = version
+
+        pending = ((df["stored_hash"] != df["content_hash"]) | (df["stored_version"] != version)
+                   | df["cluster"].isna()).to_numpy()
+
+        # Rows added since the last refit accumulate until the corpus-level models are refitted
+        last_refit = load_last_refit(conn)
+        vectorizer, pca = load_model("tfidf_vectorizer"), load_model("projection_2d")
+        centroids = load_centroids(DEFAULT_MODEL_NAME)
+        fit_id = last_refit["fit_id"] if last_refit is not None else None
+        # Keywords, cluster and x/y of these rows come from other models than the current ones
+        stale = pending | (df["fit_id"] != fit_id).to_numpy() if fit_id else np.ones(len(df), dtype=bool)
+        drift = len(df)
+        if last_refit is not None:
+            drift = stale.sum() + (~stale & (df["analyzedAt"] > last_refit["run_at"]).to_numpy()).sum()
+        refit = (force_refit or fit_id is None or last_refit["model_version"] != version
+                 or vectorizer is None or pca is None or centroids is None
+                 or drift > refit_threshold * len(df))
+
+        # Per-row steps: only new or changed rows
+        _set_rows(df, "clean_title", pending, clean_texts(df.loc[pending, "title"]))
+        scores = score_texts(df.loc[pending, "title"].tolist())
+        _set_rows(df, "sentiment_score", pending, scores)
+        _set_rows(df, "sentiment_label", pending, label_sentiment(scores))
+
+        if refit:
+            tfidf_matrix, vectorizer = vectorize_text(df["clean_title"])
+            topics = extract_topics(tfidf_matrix, vectorizer)
+            df["top_keywords"] = extract_keywords(tfidf_matrix, vectorizer)
+            df, embeddings = cluster_titles(df)
+
+            # Reduce dimensions for plotting (PCA fitted on a sample)
+            pca = fit_projection(embeddings)
+            coords = project_2d(embeddings, pca=pca)
+            df["x"], df["y"] = coords[:, 0], coords[:, 1]
+
+            save_model("tfidf_vectorizer", vectorizer)
+            save_model("projection_2d", pca)
+            fit_id = uuid.uuid4().hex
+            to_write = np.ones(len(df), dtype=bool)
+        else:
+            topics = last_refit["topics"]
+            if stale.any():
+                stale_rows = df.loc[stale]
+                _set_rows(df, "top_keywords", stale,
+                          extract_keywords(vectorizer.transform(stale_rows["clean_title"]).tocsr(), vectorizer))
+                # Embeddings of rows that were only refitted elsewhere are cache hits
+                embeddings = encode_with_cache(build_embedding_texts(stale_rows, EMBED_INCLUDE_SUMMARY))
+                get_vector_index().add(df.loc[pending, "id"].tolist(), embeddings[pending[stale]])
+                coords = pca.transform(embeddings)
+                _set_rows(df, "cluster", stale, assign_clusters(embeddings, centroids))
+                _set_rows(df, "x", stale, coords[:, 0])
+                _set_rows(df, "y", stale, coords[:, 1])
+            to_write = stale
+
+        df["cluster"] = df["cluster"].astype(int)
+        df["fit_id"] = fit_id
+        upsert_analysis(conn, df.loc[to_write])
+        seconds = round(time.perf_counter() - start, 3)
+        save_analysis_run(conn, len(df), to_write.sum(), refit, version, topics, seconds, fit_id)
+    finally:
+        conn.close()
+
+    print(f"Analyzed {len(df)} rows ({pending.sum()} new/changed, {stale.sum() - pending.sum()} reassigned, "
+          f"{'refit' if refit else 'incremental'}) in {seconds:.2f}s")
+    df = df.drop(columns=["stored_hash", "stored_version"])
+    return df, df[["x", "y"]].to_numpy(dtype=np.float32)
+
+
+# === Streaming Mode ===
+def analyze_trends_streaming(since=None, until=None, sources: List[str] = None, themes: List[str] = None,
+                             chunk_size: int = ANALYSIS_CHUNK_SIZE, n_clusters: Optional[int] = None,
+                             model_name: str = DEFAULT_MODEL_NAME, include_summary: bool = EMBED_INCLUDE_SUMMARY,
+                             **encode_options) -> Dict:
+    """
+    Analyze the content table chunk by chunk and write the results to the analysis table.
+
+    Only one chunk of rows (and its embeddings) is in memory at a time, so corpora larger
+    than RAM can be analyzed. The first pass cleans, scores sentiment, extracts keywords and
+    embeds each chunk while updating the TF-IDF document frequencies, the MiniBatchKMeans
+    centroids and an IncrementalPCA with partial fits. A second pass re-reads the cached
+    embeddings and relabels every row against the final centroids and 2D projection.
+    Read the results back with read_analysis().
+
+    The streaming centroids and projection are saved under their own keys, apart from the
+    models analyze_trends_and_sentiment() assigns new rows with, and the rows carry this
+    run's fit_id, so a later batch run treats them as stale and reassigns them.
+
+    Args:
+        since, until, sources, themes: Filters on the content table (see read_content)
+        chunk_size (int): Rows per chunk
+        n_clusters (int): Number of clusters. None = choose_k() on the first chunk (saved centroids
+                          seed the fit when their k matches)
+        model_name (str): sentence-transformers model name
+        include_summary (bool): Append the summary to the title before embedding
+        encode_options: batch_size, num_workers, dtype (see encode_with_cache)
+
+    Returns:
+        Dict: rows analyzed, chunks, n_clusters and seconds
+    """
+    from sklearn.decomposition import IncrementalPCA
+    from src.analyzers.clustering import choose_k, fit_minibatch, load_centroids, save_centroids, save_model
+    from src.analyzers.incremental_tfidf import IncrementalTfidf
+    from src.database.db_writer import save_analysis_run, update_analysis_clusters, upsert_analysis
+    from src.database.schema import get_connection
+
+    start = time.perf_counter()
+    filters = dict(since=since, until=until, sources=sources, themes=themes)
+    columns = ["id", "title", "summary"]
+
+    # Separate connections: the reader holds a snapshot open while the writer commits each chunk
+    read_conn, write_conn = get_connection(), get_connection()
+    version = analysis_model_version(model_name, include_summary)
+    # Fresh document frequencies per pass: the pass reads the whole filtered slice
+    tfidf = IncrementalTfidf()
+    centroids_key = model_name + STREAMING_KEY_SUFFIX
+    saved = load_centroids(centroids_key)
+    kmeans, pca = None, IncrementalPCA(n_components=2)
+    fit_id = uuid.uuid4().hex
+    rows, chunks = 0, 0
+
+    try:
+        # Pass 1: per-chunk analysis with partial fits
+        for chunk in iter_content(read_conn, chunk_size, columns=columns, **filters):
+            chunk["clean_title"] = clean_texts(chunk["title"])
+            chunk["content_hash"] = content_hashes(chunk)
+            chunk["model_version"] = version
+            chunk["fit_id"] = fit_id
+
+            weights, feature_names = tfidf.partial_fit_transform(chunk["clean_title"])
+            chunk["top_keywords"] = [feature_names[cols].tolist() for cols in top_n_per_row(weights, 3)]
+            chunk = compute_sentiment_scores(chunk)
+
+            embeddings = encode_with_cache(build_embedding_texts(chunk, include_summary),
+                                           model_name=model_name, **encode_options)
+            get_vector_index(model_name).add(chunk["id"].tolist(), embeddings)
+            if kmeans is None:
+                if saved is not None and saved.shape[1] != embeddings.shape[1]:
+                    saved = None
+                k = min(n_clusters or choose_k(embeddings), len(embeddings))
+                init = saved if saved is not None and len(saved) == k else None
+            kmeans = fit_minibatch([embeddings], k, init, model=kmeans)
+            if len(embeddings) >= 2:
+                pca.partial_fit(embeddings)
+
+            chunk["cluster"] = kmeans.predict(embeddings)
+            upsert_analysis(write_conn, chunk)
+            rows += len(chunk)
+            chunks += 1
+            print(f"Analyzed chunk {chunks}: {rows} rows ({time.perf_counter() - start:.1f}s)")
+
+        if kmeans is None:
+            return {"rows": 0, "chunks": 0, "n_clusters": 0, "seconds": round(time.perf_counter() - start, 3)}
+
+        tfidf.save()
+        save_centroids(centroids_key, kmeans.cluster_centers_)
 
-    tfidf_df, vectorizer = vectorize_text(df["clean_title"])
-    topics = extract_topics(tfidf_df.values, vectorizer)
-    keywords = extract_keywords(tfidf_df, vectorizer)
+        # Pass 2: consistent labels and coordinates from the final models (embeddings are cache hits)
+        for chunk in iter_content(read_conn, chunk_size, columns=columns, **filters):
+            embeddings = encode_with_cache(build_embedding_texts(chunk, include_summary),
+                                           model_name=model_name, **encode_options)
+            coords = pca.transform(embeddings) if hasattr(pca, "components_") else np.zeros((len(chunk), 2))
+            update_analysis_clusters(write_conn, chunk["id"].tolist(), kmeans.predict(embeddings), coords)
 
-    df["top_keywords"] = keywords
-    df = compute_sentiment_scores(df)
-    df, embeddings = cluster_titles(df)
+        if hasattr(pca, "components_"):
+            save_model("projection_2d_streaming", pca)
 
-    # Reduce dimensions for plotting (PCA)
-    pca = PCA(n_components=2)
-    reduced_embeddings = pca.fit_transform(embeddings)
+        # Not a refit of the batch models: the next batch run sees these rows' fit_id as stale
+        save_analysis_run(write_conn, rows, rows, False, version, seconds=round(time.perf_counter() - start, 3),
+                          fit_id=fit_id)
+    finally:
+        read_conn.close()
+        write_conn.close()
 
-    return df, reduced_embeddings # Enhanced DataFrame
\ No newline at end of file
+    return {"rows": rows, "chunks": chunks, "n_clusters": int(kmeans.n_clusters),
+            "seconds": round(time.perf_counter() - start, 3)}
@@ -1,9 +1,12 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
-from wordcloud import WordCloud
 from collections import Counter
 
+# matplotlib / seaborn / wordcloud are imported inside each function so that
+# importing this module doesn't slow down app start-up.
+
 def plot_sentiment_distribution(df):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     plt.figure(figsize=(8, 5))
     sns.countplot(data=df, x="sentiment_label", palette="coolwarm")
     plt.title("Sentiment Distribution of Content Titles", fontsize=14)
@@ -13,6 +16,9 @@ def plot_sentiment_distribution(df):
     plt.show()
 
 def plot_top_keywords(df, top_n=15):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     all_keywords = [keyword for sublist in df["top_keywords"] for keyword in sublist]
     keyword_counts = Counter(all_keywords)
     top_keywords = keyword_counts.most_common(top_n)
@@ -27,6 +33,9 @@ def plot_top_keywords(df, top_n=15):
     plt.show()
 
 def plot_wordcloud(df):
+    import matplotlib.pyplot as plt
+    from wordcloud import WordCloud
+
     all_keywords = [keyword for sublist in df["top_keywords"] for keyword in sublist]
     keyword_counts = Counter(all_keywords)
 
@@ -39,6 +48,8 @@ def plot_wordcloud(df):
     plt.show()
 
 def plot_clusters(df, reduced_embeddings):
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(8, 6))
     plt.scatter(reduced_embeddings[:, 0], reduced_embeddings[:, 1], c=df["cluster"], cmap="tab10", s=30)
     plt.title("Title Clusters (PCA Projection)")
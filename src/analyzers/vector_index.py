@@ -0,0 +1,389 @@
+# src/analyzers/vector_index.py
+
+"""
+Persistent nearest-neighbour index over content embeddings.
+
+Vectors are L2-normalized and appended to a memory-mapped file next to the embedding
+store, keyed by content id, so similarity is a dot product. Small indexes are searched
+exactly; once an index grows past ANN_MIN_ITEMS an IVF (inverted file) structure is
+trained: the vectors are partitioned around k-means centroids and a query only scans
+the nprobe partitions whose centroids are closest to it. Inserts are incremental - new
+vectors are assigned to the nearest existing partition - and the partitions are
+retrained when the index has grown RETRAIN_GROWTH times since the last training.
+Vectors of content that is no longer stored are dropped with retain() /
+prune_vector_indexes(), which compact the files.
+"""
+
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.analyzers.embedding_store import EMBEDDINGS_DIR
+from src.analyzers.model_registry import DEFAULT_MODEL_NAME
+
+# Below this many vectors exact search is fast enough and no IVF is trained
+ANN_MIN_ITEMS = int(os.getenv("ANN_MIN_ITEMS", 50000))
+# Partitions scanned per query: higher = better recall, slower queries
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", 16))
+RETRAIN_GROWTH = 4
+TRAIN_SAMPLE_SIZE = 100000
+BATCH_SIZE = 50000
+# find_similar() asks the index for k * SEARCH_OVERFETCH ids and keeps the first k still stored
+SEARCH_OVERFETCH = 3
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    # Indices of the k highest scores, highest first
+    if len(scores) > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class VectorIndex:
+    """Cosine-similarity index from content id to embedding for one model."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, base_dir: Optional[Path] = None):
+        self.model_name = model_name
+        self.path = Path(base_dir or EMBEDDINGS_DIR) / re.sub(r"[^A-Za-z0-9_.-]", "_", model_name) / "vector_index"
+        self.vectors_path = self.path / "vectors.f32"
+        self.ids_path = self.path / "ids.txt"
+        self.lists_path = self.path / "lists.i32"
+        self.meta_path = self.path / "meta.json"
+        self.centroids_path = self.path / "centroids.npy"
+        self._lock = threading.Lock()
+
+        self.dim: Optional[int] = None
+        self.trained_size = 0
+        self.ids: List[str] = []
+        self.centroids = None
+        if self.meta_path.exists():
+            meta = json.loads(self.meta_path.read_text())
+            self.dim, self.trained_size = meta["dim"], meta["trained_size"]
+            self.ids = self.ids_path.read_text().split("\n") if self.ids_path.exists() else []
+            self.ids = [row_id for row_id in self.ids if row_id]
+            if self.trained_size and self.centroids_path.exists():
+                self.centroids = np.load(self.centroids_path)
+            self._repair()
+        self.rows: Dict[str, int] = {row_id: row for row, row_id in enumerate(self.ids)}
+        self._partitions = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def _repair(self) -> None:
+        # A crash mid-insert can leave the vector, id and partition files with different lengths
+        n_rows = min(self._n_rows(), len(self.ids))
+        if n_rows != self._n_rows():
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(n_rows * self.dim * 4)
+        if n_rows != len(self.ids):
+            self.ids = self.ids[:n_rows]
+            self.ids_path.write_text("\n".join(self.ids))
+        if self.is_trained:
+            n_lists = self.lists_path.stat().st_size // 4 if self.lists_path.exists() else 0
+            if n_lists < n_rows:
+                self.centroids, self.trained_size = None, 0  # retrained on the next insert
+            elif n_lists > n_rows:
+                with open(self.lists_path, "r+b") as f:
+                    f.truncate(n_rows * 4)
+
+    def _n_rows(self) -> int:
+        if self.dim is None or not self.vectors_path.exists():
+            return 0
+        return self.vectors_path.stat().st_size // (self.dim * 4)
+
+    def _vectors(self, mode: str = "r") -> np.ndarray:
+        return np.memmap(self.vectors_path, dtype=np.float32, mode=mode, shape=(len(self.ids), self.dim))
+
+    def _lists(self, mode: str = "r") -> np.ndarray:
+        return np.memmap(self.lists_path, dtype=np.int32, mode=mode, shape=(len(self.ids),))
+
+    def _save_meta(self) -> None:
+        tmp_path = self.meta_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"model": self.model_name, "dim": self.dim, "trained_size": self.trained_size}))
+        os.replace(tmp_path, self.meta_path)
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.concatenate([
+            np.argmax(vectors[start:start + BATCH_SIZE] @ self.centroids.T, axis=1).astype(np.int32)
+            for start in range(0, len(vectors), BATCH_SIZE)
+        ])
+
+    def add(self, ids: List[str], vectors: np.ndarray) -> None:
+        """
+        Insert or update vectors by content id.
+
+        Args:
+            ids (List[str]): Content ids
+            vectors (np.ndarray): (len(ids), dim) embeddings (normalized here)
+        """
+        ids = list(ids)
+        if not ids:
+            return
+        vectors = _normalize(vectors)
+
+        with self._lock:
+            if self.dim is None:
+                # New index: discard files left behind by an insert that never completed
+                for path in (self.vectors_path, self.ids_path, self.lists_path):
+                    path.unlink(missing_ok=True)
+                self.dim = vectors.shape[1]
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dim {vectors.shape[1]} does not match index dim {self.dim}")
+            self.path.mkdir(parents=True, exist_ok=True)
+
+            new = {}
+            updated_rows, updated_positions = [], []
+            for position, row_id in enumerate(ids):
+                if row_id in self.rows:
+                    updated_rows.append(self.rows[row_id])
+                    updated_positions.append(position)
+                else:
+                    new[row_id] = position  # last occurrence wins
+            new_positions = list(new.values())
+
+            # Changed content: overwrite in place
+            if updated_rows:
+                stored = self._vectors("r+")
+                stored[updated_rows] = vectors[updated_positions]
+                stored.flush()
+                if self.is_trained:
+                    lists = self._lists("r+")
+                    lists[updated_rows] = self._assign(vectors[updated_positions])
+                    lists.flush()
+
+            if new_positions:
+                with open(self.vectors_path, "ab") as f:
+                    f.write(vectors[new_positions].tobytes())
+                if self.is_trained:
+                    with open(self.lists_path, "ab") as f:
+                        f.write(self._assign(vectors[new_positions]).tobytes())
+                with open(self.ids_path, "a") as f:
+                    f.write(("\n" if self.ids else "") + "\n".join(new))
+                for row_id in new:
+                    self.rows[row_id] = len(self.ids)
+                    self.ids.append(row_id)
+
+            self._partitions = None
+            self._save_meta()
+
+        if len(self) >= ANN_MIN_ITEMS and (not self.is_trained or len(self) >= RETRAIN_GROWTH * self.trained_size):
+            self.train()
+
+    def retain(self, ids: Iterable[str]) -> int:
+        """
+        Drop the vectors of every content id not in ids and compact the index files.
+
+        Args:
+            ids (Iterable[str]): Content ids to keep (typically every id in the content table)
+
+        Returns:
+            int: Number of vectors removed
+        """
+        keep_ids = set(ids)
+        with self._lock:
+            keep = np.fromiter((row_id in keep_ids for row_id in self.ids), dtype=bool, count=len(self.ids))
+            removed = int((~keep).sum())
+            if not removed:
+                return 0
+
+            # Without meta.json a crash mid-rewrite leaves a "new" index that the next add() starts over
+            self.meta_path.unlink(missing_ok=True)
+            if not keep.any():
+                for path in (self.vectors_path, self.ids_path, self.lists_path, self.centroids_path):
+                    path.unlink(missing_ok=True)
+                self.dim, self.trained_size, self.centroids = None, 0, None
+                self.ids, self.rows, self._partitions = [], {}, None
+                return removed
+
+            vectors = self._vectors()
+            tmp_path = self.vectors_path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                for start in range(0, len(vectors), BATCH_SIZE):
+                    f.write(np.asarray(vectors[start:start + BATCH_SIZE])[keep[start:start + BATCH_SIZE]].tobytes())
+            del vectors
+            os.replace(tmp_path, self.vectors_path)
+            if self.is_trained:
+                lists = np.asarray(self._lists())[keep]
+                lists.tofile(self.lists_path)
+                # Growth since training is measured against the rows that are left
+                self.trained_size = min(self.trained_size, len(lists))
+
+            self.ids = [row_id for row_id, kept in zip(self.ids, keep) if kept]
+            self.ids_path.write_text("\n".join(self.ids))
+            self.rows = {row_id: row for row, row_id in enumerate(self.ids)}
+            self._partitions = None
+            self._save_meta()
+        return removed
+
+    def train(self, n_lists: Optional[int] = None) -> None:
+        """(Re)build the IVF partitions with spherical k-means on a sample of the vectors."""
+        from sklearn.cluster import MiniBatchKMeans
+
+        with self._lock:
+            vectors = self._vectors()
+            n_lists = n_lists or int(np.clip(4 * np.sqrt(len(vectors)), 16, 65536))
+            rng = np.random.default_rng(42)
+            sample_size = min(len(vectors), max(TRAIN_SAMPLE_SIZE, 20 * n_lists))
+            sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))])
+
+            kmeans = MiniBatchKMeans(n_clusters=min(n_lists, len(sample)), batch_size=4096, n_init=1, random_state=42)
+            kmeans.fit(sample)
+            self.centroids = _normalize(kmeans.cluster_centers_)
+
+            lists = np.concatenate([self._assign(np.asarray(vectors[start:start + BATCH_SIZE]))
+                                    for start in range(0, len(vectors), BATCH_SIZE)])
+            lists.tofile(self.lists_path)
+            np.save(self.centroids_path, self.centroids)
+            self.trained_size = len(vectors)
+            self._partitions = None
+            self._save_meta()
+
+    def _get_partitions(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Rows grouped by partition (CSR-style): rows[offsets[p]:offsets[p + 1]] belong to partition p
+        if self._partitions is None:
+            lists = np.asarray(self._lists())
+            order = np.argsort(lists, kind="stable")
+            offsets = np.searchsorted(lists[order], np.arange(len(self.centroids) + 1))
+            self._partitions = (order, offsets)
+        return self._partitions
+
+    def search(self, queries: np.ndarray, k: int = 10, nprobe: int = ANN_NPROBE,
+               exact: bool = False) -> List[List[Tuple[str, float]]]:
+        """
+        Most similar stored items for each query vector.
+
+        Args:
+            queries (np.ndarray): (n, dim) or (dim,) query embeddings
+            k (int): Results per query
+            nprobe (int): IVF partitions scanned per query
+            exact (bool): Scan every vector even if an IVF index is trained
+
+        Returns:
+            List[List[Tuple[str, float]]]: Per query, (content id, cosine similarity) pairs, most similar first
+        """
+        queries = _normalize(queries)
+        if not self.ids:
+            return [[] for _ in queries]
+        vectors = self._vectors()
+
+        if exact or not self.is_trained:
+            # Exact: scan in batches, keeping a running top-k
+            results = []
+            for query in queries:
+                best_rows, best_scores = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+                for start in range(0, len(vectors), BATCH_SIZE):
+                    scores = np.asarray(vectors[start:start + BATCH_SIZE]) @ query
+                    top = _top_k(scores, k)
+                    best_rows = np.concatenate([best_rows, top + start])
+                    best_scores = np.concatenate([best_scores, scores[top]])
+                top = _top_k(best_scores, k)
+                results.append([(self.ids[row], float(score)) for row, score in zip(best_rows[top], best_scores[top])])
+            return results
+
+        order, offsets = self._get_partitions()
+        probes = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :nprobe]
+        results = []
+        for query, partitions in zip(queries, probes):
+            rows = np.concatenate([order[offsets[p]:offsets[p + 1]] for p in partitions])
+            rows.sort()  # sequential reads from the memmap
+            scores = np.asarray(vectors[rows]) @ query
+            top = _top_k(scores, k)
+            results.append([(self.ids[row], float(score)) for row, score in zip(rows[top], scores[top])])
+        return results
+
+
+_indexes: Dict[str, VectorIndex] = {}
+
+
+def get_vector_index(model_name: str = DEFAULT_MODEL_NAME) -> VectorIndex:
+    if model_name not in _indexes:
+        _indexes[model_name] = VectorIndex(model_name)
+    return _indexes[model_name]
+
+
+def prune_vector_indexes(ids: Iterable[str], base_dir: Optional[Path] = None) -> int:
+    """
+    Drop vectors of content that is no longer stored from every model's index.
+
+    Args:
+        ids (Iterable[str]): Content ids that are still stored
+        base_dir (Path): Embedding store directory (default EMBEDDINGS_DIR)
+
+    Returns:
+        int: Number of vectors removed across indexes
+    """
+    ids = set(ids)
+    removed = 0
+    for meta_path in Path(base_dir or EMBEDDINGS_DIR).glob("*/vector_index/meta.json"):
+        model_name = json.loads(meta_path.read_text())["model"]
+        index = get_vector_index(model_name) if base_dir is None else VectorIndex(model_name, base_dir)
+        removed += index.retain(ids)
+    return removed
+
+
+def find_similar(text: str, k: int = 5, model_name: str = DEFAULT_MODEL_NAME,
+                 min_score: float = 0.0) -> pd.DataFrame:
+    """
+    Already-collected items most similar to a text (topic, brief, keyword list...).
+
+    Args:
+        text (str): Query text, embedded with the same model as the content
+        k (int): Max number of items
+        model_name (str): sentence-transformers model name
+        min_score (float): Drop items with a lower cosine similarity
+
+    Returns:
+        pd.DataFrame: Content rows (title, url, source, publishedAt, summary) with a score column, best first
+    """
+    from src.analyzers.model_registry import get_sentence_model
+    from src.database.db_reader import read_content_by_ids
+
+    query = get_sentence_model(model_name).encode([text], show_progress_bar=False)
+    # Over-fetch: vectors of deleted content may still be indexed until the next prune
+    matches = [(row_id, score) for row_id, score in get_vector_index(model_name).search(query, k * SEARCH_OVERFETCH)[0]
+               if score >= min_score]
+    if not matches:
+        return pd.DataFrame(columns=["id", "title", "url", "source", "publishedAt", "summary", "score"])
+
+    scores = dict(matches)
+    df = read_content_by_ids([row_id for row_id, _ in matches],
+                             columns=["id", "title", "url", "source", "publishedAt", "summary"])
+    df["score"] = df["id"].map(scores)
+    return df.sort_values("score", ascending=False, ignore_index=True).head(k)
+
+
+def grounding_context(query: str, k: int = 5, min_score: float = 0.3) -> str:
+    """
+    Related collected items formatted for an LLM prompt.
+
+    Returns:
+        str: A short bullet list, or "" if nothing is similar enough or the index is unavailable
+    """
+    try:
+        related = find_similar(query, k=k, min_score=min_score)
+    except Exception as e:
+        print(f"Warning: similarity search unavailable ({e}). Continuing without related content.")
+        return ""
+    if related.empty:
+        return ""
+    items = "\n".join(f"- {row.title} ({row.source})" for row in related.itertuples(index=False))
+    return f"For context, recently collected items on this subject:\n{items}\n\n"
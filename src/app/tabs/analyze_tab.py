@@ -2,24 +2,34 @@
 
 import streamlit as st
 import sys
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 # Ensure we can import from src/analyzers
 root_dir = Path(__file__).resolve().parents[2]
 sys.path.append(str(root_dir))
 
-from src.analyzers.trend_sentiment_analyzer import analyze_trends_and_sentiment
+from src.analyzers.trend_sentiment_analyzer import analyze_trends_and_sentiment, analyze_trends_streaming
 from src.analyzers.trend_viz import plot_sentiment_distribution, plot_top_keywords, plot_wordcloud, plot_clusters
 from src.data_collection.collect_data import collect_data
+from src.database.db_reader import read_analysis
 
-import matplotlib.pyplot as plt
-import seaborn as sns
+# Newest analyzed rows loaded back from the database (streaming mode and app restarts)
+ANALYSIS_PREVIEW_ROWS = 20000
 
 def render_analyze_tab():
     st.header("Step 3: Collect & Analyze Trends")
 
     st.info("This section will scrape data, analyze sentiment, extract keywords, and visualize insights like sentiment distribution, keyword clouds, or clusters.")
 
+    # Analysis results are stored in the database: restore the last run after an app restart
+    if "analyzed_df" not in st.session_state:
+        previous_df = read_analysis(limit=ANALYSIS_PREVIEW_ROWS)
+        if not previous_df.empty:
+            st.session_state.analyzed_df = previous_df
+            st.session_state.reduced_embeddings = previous_df[["x", "y"]].to_numpy()
+            st.caption(f"Loaded {len(previous_df)} analyzed items from the previous run.")
+
     # Check theme and platform selection
     themes = st.session_state.get("themes", [])
     platforms = st.session_state.get("selected_platforms", [])
@@ -35,19 +45,50 @@ def render_analyze_tab():
     st.subheader("📡 Selected Platforms")
     st.write(", ".join(platforms))
 
+    incremental = st.checkbox(
+        "Incremental collection (keep history, fetch only new items)",
+        value=st.session_state.get("incremental_collection", False),
+        help="Only items newer than the last run for each platform/query are fetched and added to the database.",
+    )
+    st.session_state.incremental_collection = incremental
+
+    # The database keeps history in incremental mode, so only analyze a recent window of it
+    lookback_days = 0
+    if incremental:
+        lookback_days = st.number_input("Analyze items published in the last N days (0 = all)", min_value=0, value=30)
+
+    streaming = st.checkbox(
+        "Streaming analysis (for large databases)",
+        value=st.session_state.get("streaming_analysis", False),
+        help="Analyze the database in chunks and store the results, instead of loading everything into memory at once.",
+    )
+    st.session_state.streaming_analysis = streaming
+
     # Run button
     if st.button("Run Trend & Sentiment Analysis"):
         with st.spinner("📥 Collecting fresh data from selected platforms..."):
             try:
-                collect_data(themes, platform_selections)
+                collected_df = collect_data(themes, platform_selections, incremental=incremental)
                 st.success("✅ Data collection completed.")
             except Exception as e:
                 st.error(f"❌ Failed to collect data: {e}")
                 return
 
+        timings = collected_df.attrs.get("timings", [])
+        if timings:
+            with st.expander(f"⏱️ Collection timings ({len(timings)} calls)"):
+                st.dataframe(timings, use_container_width=True)
+
         with st.spinner("Analyzing content and extracting insights..."):
             try:
-                df, reduced_embeddings = analyze_trends_and_sentiment()
+                since = datetime.now(timezone.utc) - timedelta(days=lookback_days) if lookback_days else None
+                if streaming:
+                    stats = analyze_trends_streaming(since=since)
+                    st.caption(f"Analyzed {stats['rows']} rows in {stats['chunks']} chunks ({stats['seconds']:.1f}s)")
+                    df = read_analysis(since=since, limit=ANALYSIS_PREVIEW_ROWS)
+                    reduced_embeddings = df[["x", "y"]].to_numpy()
+                else:
+                    df, reduced_embeddings = analyze_trends_and_sentiment(since=since)
                 if df.empty:
                     st.warning("⚠️ No content found after analysis.")
                     return
@@ -71,6 +112,8 @@ def render_analyze_tab():
                          )
 
             # Visualizations
+            import matplotlib.pyplot as plt
+
             st.markdown("---")
             st.subheader("📈 Sentiment Distribution")
             #fig1 = plt.figure()
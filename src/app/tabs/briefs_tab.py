@@ -8,7 +8,7 @@ from pathlib import Path
 root_dir = Path(__file__).resolve().parents[2]
 sys.path.append(str(root_dir))
 
-from src.agents.brief_writer import generate_brief
+from src.agents.brief_writer import generate_briefs
 
 def render_briefs_tab():
     st.header("Step 5: Write Briefs")
@@ -32,16 +32,26 @@ def render_briefs_tab():
     # Temperature slider
     # temperature = st.slider("🎨 Creativity Level (LLM Temperature)", 0.0, 1.0, 0.7, 0.1)
 
+    ground = st.checkbox("Ground briefs in similar collected content", value=False,
+                         help="Adds the most similar already-collected items to each prompt.")
+    regenerate = st.checkbox("🔄 Regenerate (skip cache)", value=False, key="regenerate_briefs",
+                             help="Ignore cached responses and ask the model again for a new variant.")
+
     # Generate briefs
     if st.button("📝 Generate Briefs"):
         with st.spinner("Generating content briefs..."):
+            # All briefs are requested concurrently; results come back in topic order
+            results = generate_briefs(selected_topics, model_name="gpt-4o-mini", related_items=5 if ground else 0,
+                                      use_cache=not regenerate)
             generated_briefs = []
-            for topic in selected_topics:
-                brief = generate_brief(topic["title"], topic["description"], model_name="gpt-4o-mini")
+            for topic, result in zip(selected_topics, results):
+                if result["error"]:
+                    st.error(f"❌ Brief for '{topic['title']}' failed: {result['error']}")
+                    continue
                 generated_briefs.append({
                     "title": topic["title"],
                     "description": topic["description"],
-                    "brief": brief
+                    "brief": result["result"]
                 })
 
         st.session_state.generated_briefs = generated_briefs
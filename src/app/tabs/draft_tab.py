@@ -8,7 +8,8 @@ from pathlib import Path
 root_dir = Path(__file__).resolve().parents[2]
 sys.path.append(str(root_dir))
 
-from src.agents.content_drafter import generate_draft
+from src.agents.content_drafter import generate_drafts, stream_draft
+from src.agents.content_pipeline import draft_and_polish_many, draft_by_sections_many
 
 def render_draft_tab():
     st.header("Step 6: Draft Content")
@@ -43,25 +44,80 @@ def render_draft_tab():
     st.markdown("---")
     st.subheader("⚙️ Draft Generation Settings")
     #temperature = st.slider("🎨 Creativity Level (LLM Temperature)", 0.0, 1.0, 0.7, 0.1)
+    modes = {
+        "🚀 All drafts at once": "All drafts are generated concurrently.",
+        "✍️ Show drafts as they are written": "Streams each draft in turn.",
+        "⚡ Draft and polish in one pass": "Drafts directly in the brief's tone and audience, then polishes only the "
+                                          "sections a quality check flags, instead of rewriting the whole draft in Step 7.",
+        "🧩 Draft outline sections in parallel": "Writes every outline section concurrently, then adds an introduction "
+                                                "and transitions. Failed sections are retried on their own.",
+    }
+    mode = st.radio("Drafting mode", list(modes), index=1 if len(selected_briefs) == 1 else 0,
+                    captions=list(modes.values()))
+    regenerate = st.checkbox("🔄 Regenerate (skip cache)", value=False, key="regenerate_drafts",
+                             help="Ignore cached responses and ask the model again for a new variant.")
+    stream = mode.startswith("✍️")
+    fused = mode.startswith("⚡")
+    sectioned = mode.startswith("🧩")
 
     if st.button("🚀 Generate Draft Content"):
-        with st.spinner("Generating drafts..."):
-            generated_drafts = []
-            for brief in selected_briefs:
-                brief_input = {
-                    "title": brief.get("title"),
-                    "description": brief.get("description"),
-                    "brief": brief.get("brief"),
-                    "tone": brief.get("tone"),
-                    "audience": brief.get("audience"),
-                    "outline": brief.get("outline"),
-                    "cta": brief.get("cta"),
-                }
-                draft = generate_draft(brief_input, model_name="gpt-4o-mini")
-                generated_drafts.append({**brief_input, "draft": draft})
-
-            st.session_state.generated_drafts = generated_drafts
-            st.success(f"✅ Generated {len(generated_drafts)} draft(s).")
+        brief_inputs = []
+        for brief in selected_briefs:
+            details = brief.get("brief") if isinstance(brief.get("brief"), dict) else {}
+            brief_inputs.append({
+                "title": brief.get("title"),
+                "description": brief.get("description"),
+                "brief": brief.get("brief"),
+                "tone": brief.get("tone") or details.get("tone"),
+                "audience": brief.get("audience") or details.get("audience"),
+                "outline": brief.get("outline") or details.get("outline"),
+                "cta": brief.get("cta") or details.get("cta"),
+            })
+
+        if fused:
+            with st.spinner("Drafting and polishing..."):
+                results = draft_and_polish_many(brief_inputs, model_name="gpt-4o-mini", use_cache=not regenerate)
+            # Keep the final article as the draft; usage shows the saving against the two-pass path
+            results = [
+                result if result["error"] else {"result": result["result"]["polished"], "error": None,
+                                                "usage": result["result"]["usage"],
+                                                "flagged": result["result"]["flagged"]}
+                for result in results
+            ]
+        elif sectioned:
+            with st.spinner("Drafting sections..."):
+                results = draft_by_sections_many(brief_inputs, model_name="gpt-4o-mini", use_cache=not regenerate)
+            for result in results:
+                if not result["error"] and result["result"]["failed"]:
+                    result["error"] = (f"{len(result['result']['failed'])} section(s) failed. "
+                                       "Generate again to retry only those sections.")
+            results = [result if result["error"] else {"result": result["result"]["article"], "error": None}
+                       for result in results]
+        elif stream:
+            # One draft at a time, rendered token by token
+            results = []
+            for brief_input in brief_inputs:
+                st.markdown(f"**📄 {brief_input['title']}**")
+                try:
+                    draft = st.write_stream(stream_draft(brief_input, model_name="gpt-4o-mini", use_cache=not regenerate))
+                    results.append({"result": draft.strip(), "error": None})
+                except Exception as e:
+                    results.append({"result": None, "error": f"{type(e).__name__}: {e}"})
+        else:
+            # All drafts are requested concurrently; results come back in brief order
+            with st.spinner("Generating drafts..."):
+                results = generate_drafts(brief_inputs, model_name="gpt-4o-mini", use_cache=not regenerate)
+
+        generated_drafts = []
+        for brief_input, result in zip(brief_inputs, results):
+            if result["error"]:
+                st.error(f"❌ Draft for '{brief_input['title']}' failed: {result['error']}")
+                continue
+            generated_drafts.append({**brief_input, "draft": result["result"], "fused": fused,
+                                     "usage": result.get("usage"), "flagged": result.get("flagged")})
+
+        st.session_state.generated_drafts = generated_drafts
+        st.success(f"✅ Generated {len(generated_drafts)} draft(s).")
 
 
     # Display generated drafts
@@ -90,6 +146,16 @@ def render_draft_tab():
 
                 st.markdown("**Draft Content:**")
                 st.markdown(draft["draft"])
+                usage = draft.get("usage")
+                if usage:
+                    spent = usage["total"]["prompt_tokens"] + usage["total"]["completion_tokens"]
+                    two_pass = usage["two_pass_estimate"]["prompt_tokens"] + usage["two_pass_estimate"]["completion_tokens"]
+                    st.caption(
+                        f"Tokens — draft: {usage['draft']['prompt_tokens']} in / {usage['draft']['completion_tokens']} out, "
+                        f"polish ({len(draft.get('flagged') or [])} flagged section(s)): "
+                        f"{usage['polish']['prompt_tokens']} in / {usage['polish']['completion_tokens']} out. "
+                        f"Total {spent} vs ~{two_pass} for draft + full polish."
+                    )
                 if st.checkbox("✅ Select this draft for polishing", key=f"select_draft_{i}"):
                     selected_draft_indices.append(i)
 
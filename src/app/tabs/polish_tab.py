@@ -8,7 +8,7 @@ from pathlib import Path
 root_dir = Path(__file__).resolve().parents[2]
 sys.path.append(str(root_dir))
 
-from src.agents.content_polisher import polish_draft
+from src.agents.content_polisher import polish_drafts, stream_polish
 
 def render_polish_tab():
     st.header("Step 7: Polish Content")
@@ -22,10 +22,18 @@ def render_polish_tab():
 
     st.subheader("📝 Selected Drafts to Polish")
 
+    regenerate = st.checkbox("🔄 Regenerate (skip cache)", value=False, key="regenerate_polish",
+                             help="Ignore cached responses and ask the model again for a new variant.")
+
     polished_outputs = []
     polish_triggered = False
+    polish_settings = []
 
     for i, draft in enumerate(selected_drafts):
+        # Drafts from the one-pass mode are already polished
+        if draft.get("fused") and f"polished_{i}" not in st.session_state:
+            st.session_state[f"polished_{i}"] = draft.get("draft", "")
+
         with st.expander(f"📄 {draft.get('title', f'Draft {i+1}')}"):
 
             # Extract tone and audience from brief
@@ -53,30 +61,46 @@ def render_polish_tab():
                 value=default_audience,
                 key=f"audience_{i}"
             )
+            polish_settings.append({"draft": draft.get("draft", ""), "tone": tone, "audience": audience})
 
             if st.button("✨ Polish This Draft", key=f"polish_{i}"):
-                with st.spinner("Polishing..."):
-                    polished = polish_draft(
+                # Rendered as it is generated, so the first words show up right away
+                try:
+                    polished = st.write_stream(stream_polish(
                         draft=draft.get("draft", ""),
                         tone=tone,
                         audience=audience,
-                        model_name="gpt-4o-mini"
-                    )
-                    polished_outputs.append({
-                        "title": draft.get("title", f"Draft {i+1}"),
-                        "original": draft.get("draft", ""),
-                        "polished": polished,
+                        model_name="gpt-4o-mini",
+                        use_cache=not regenerate
+                    ))
+                except Exception as e:
+                    st.error(f"❌ Polishing failed: {type(e).__name__}: {e}")
+                    continue
+                polished_outputs.append({
+                    "title": draft.get("title", f"Draft {i+1}"),
+                    "original": draft.get("draft", ""),
+                    "polished": polished,
+                    "tone": tone,
+                    "audience": audience,
+                    "brief": {
+                        **draft.get("brief", {}),
                         "tone": tone,
                         "audience": audience,
-                        "brief": {
-                            **draft.get("brief", {}),
-                            "tone": tone,
-                            "audience": audience,
-                        },
-                    })
-                    st.session_state[f"polished_{i}"] = polished
-                    st.success("✅ Draft polished!")
-
+                    },
+                })
+                st.session_state[f"polished_{i}"] = polished
+                st.success("✅ Draft polished!")
+
+    # Polish every selected draft at once; requests run concurrently and results come back in draft order
+    if len(selected_drafts) > 1 and st.button("✨ Polish All Drafts"):
+        with st.spinner(f"Polishing {len(selected_drafts)} drafts..."):
+            results = polish_drafts(polish_settings, model_name="gpt-4o-mini", use_cache=not regenerate)
+        for i, result in enumerate(results):
+            if result["error"]:
+                st.error(f"❌ Polishing '{selected_drafts[i].get('title', f'Draft {i+1}')}' failed: {result['error']}")
+            else:
+                st.session_state[f"polished_{i}"] = result["result"]
+        st.success(f"✅ Polished {sum(1 for result in results if not result['error'])} draft(s)!")
 
     # Show polished drafts (either from current or session)
     final_selection = []
@@ -9,6 +9,7 @@ from pathlib import Path
 root_dir = Path(__file__).resolve().parents[2]
 sys.path.append(str(root_dir))
 
+from src.agents.budget import TOPIC_KEYWORD_BUDGET, fit_keywords, keyword_weights
 from src.agents.topic_generator import generate_topics
 
 
@@ -38,13 +39,28 @@ def render_topics_tab():
     # Optional temperature setting
     # temperature = st.slider("🎨 Creativity Level (LLM Temperature)", 0.0, 1.0, 0.7, 0.1)
 
+    ground = st.checkbox("Ground topics in similar collected content", value=False,
+                         help="Adds the most similar already-collected items to the prompt.")
+    reuse = st.checkbox("Reuse topics for a nearly identical keyword selection", value=False,
+                        help="Returns cached topics when most of the selected keywords match an earlier run.")
+    regenerate = st.checkbox("🔄 Regenerate (skip cache)", value=False, key="regenerate_topics",
+                             help="Ignore cached responses and ask the model again for a new variant.")
+
     if st.button("🚀 Generate Topics"):
         if not selected_keywords:
             st.warning("Please select at least one keyword.")
             return
 
+        # Rank by TF-IDF weight so the most informative keywords survive the token budget
+        weights = keyword_weights(selected_keywords, df)
+        kept = fit_keywords(selected_keywords, TOPIC_KEYWORD_BUDGET, weights)
+        if len(kept) < len(selected_keywords):
+            st.info(f"Using the {len(kept)} highest-weighted of {len(selected_keywords)} keywords "
+                    f"to stay within the {TOPIC_KEYWORD_BUDGET}-token keyword budget.")
+
         with st.spinner("Generating article topics using LLM..."):
-            topics = generate_topics(selected_keywords, model_name="gpt-4o-mini")
+            topics = generate_topics(kept, model_name="gpt-4o-mini", related_items=5 if ground else 0,
+                                     semantic_cache=reuse, keyword_weights=weights, use_cache=not regenerate)
 
         if isinstance(topics, str):
             st.error("⚠️ Could not parse LLM output. Raw response:")
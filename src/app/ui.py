@@ -1,5 +1,6 @@
 # src/app/ui.py
 
+import os
 import streamlit as st
 from pathlib import Path
 import sys
@@ -26,6 +27,11 @@ def main():
         layout="wide"
     )
 
+    # Optionally start loading the embedding model before the first analysis run
+    if os.getenv("PREWARM_MODELS", "").lower() in ("1", "true", "yes"):
+        from src.analyzers.model_registry import prewarm
+        prewarm()
+
     st.title("Content Marketing Agent")
     st.markdown("---")
 
@@ -64,6 +70,16 @@ def main():
     # Update session state with selection
     st.session_state.current_tab = selected_tab
 
+    # Prompt/completion tokens recorded per LLM call, summed per stage
+    with st.sidebar.expander("🧮 LLM Token Usage"):
+        from src.database.db_reader import read_llm_usage
+        usage = read_llm_usage()
+        if usage.empty:
+            st.caption("No LLM calls recorded yet.")
+        else:
+            st.dataframe(usage[["stage", "calls", "cached_calls", "prompt_tokens", "completion_tokens"]],
+                         hide_index=True)
+
     # === Render the tab content ===
     tabs[selected_tab]()  # Call the appropriate tab render function
 
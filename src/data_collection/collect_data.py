@@ -2,9 +2,11 @@
 
 import os
 import sys
+import time
 import pandas as pd
-import sqlite3
-from typing import List, Dict
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List, Dict, Optional, Tuple
 
 # Ensure the scrapers folder is accessible
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -17,18 +19,39 @@ from scrapers.google_search_scraper import fetch_google_search_results
 from scrapers.youtube_scraper import fetch_youtube_videos
 from scrapers.news_scraper import fetch_news_articles
 
-def collect_data(themes: List[str], platform_selections: Dict, max_results: int = 10) -> pd.DataFrame:
+from src.data_collection.dedup import lsh_buckets, remove_near_duplicates
+from src.database.schema import get_connection, url_hash
+from src.database.db_reader import load_high_water_marks
+from src.database.db_writer import upsert_content, replace_content, save_high_water_marks, save_minhash_signatures
+from src.utils import outbound
+
+# Max number of in-flight scraper calls per platform.
+# Keeps us under per-API rate limits while still overlapping network waits.
+PLATFORM_CONCURRENCY = {
+    "Reddit": 2,
+    "Hacker News": 1,
+    "Google News": 4,
+    "YouTube": 4,
+    "RSS Feeds": 8,
+    "Web Search": 4,
+}
+DEFAULT_CONCURRENCY = 2
+MAX_WORKERS = 32
+
+
+def build_collection_tasks(themes: List[str], platform_selections: Dict, max_results: int = 10) -> List[Dict]:
     """
-    Collect data based on user-selected platforms and input values.
+    Expand the platform selections into one task per scraper call.
     Args:
         themes (List[str]): List of themes selected by the user.
         platform_selections (Dict): Platform-specific input info from session state.
         max_results (int): Max number of results per scraper.
     Returns:
-        pd.DataFrame: Combined cleaned DataFrame with columns: title, url, publishedAt, source
+        List[Dict]: Tasks with keys platform, query, label, func, kwargs and optionally theme and
+                    since_param (name of the scraper argument that filters by publish date)
     """
 
-    dfs = []
+    tasks = []
 
     for platform, config in platform_selections.items():
         input_type = config["type"]
@@ -40,70 +63,278 @@ def collect_data(themes: List[str], platform_selections: Dict, max_results: int
         if platform == "Reddit":
             for subreddit in queries:
                 for theme in themes:
-                    print(f"Fetching Reddit posts from r/{subreddit} on '{theme}'...")
-                    try:
-                        df = pd.DataFrame(fetch_reddit_posts(subreddit=subreddit, query=theme, max_results=max_results))
-                        dfs.append(df)
-                    except Exception as e:
-                        print(f"Fetching Reddit posts from r/{subreddit} on '{theme}' skipped due to an error")
+                    tasks.append({
+                        "platform": platform,
+                        "query": f"r/{subreddit}:{theme}",
+                        "theme": theme,
+                        "label": f"Reddit posts from r/{subreddit} on '{theme}'",
+                        "func": fetch_reddit_posts,
+                        "kwargs": {"subreddit": subreddit, "query": theme, "max_results": max_results},
+                    })
 
         elif platform == "Hacker News":
-            print("Fetching HackerNews posts...")
-            df = pd.DataFrame(fetch_top_hackernews_posts(max_results=max_results))
-            dfs.append(df)
+            tasks.append({
+                "platform": platform,
+                "query": "top",
+                "label": "HackerNews posts",
+                "func": fetch_top_hackernews_posts,
+                "kwargs": {"max_results": max_results},
+            })
 
         elif platform == "Google News":
             for theme in queries:
-                print(f"Fetching Google News for theme '{theme}'...")
-                df = pd.DataFrame(fetch_google_search_results(query=theme, max_results=max_results))
-                dfs.append(df)
+                tasks.append({
+                    "platform": platform,
+                    "query": theme,
+                    "theme": theme,
+                    "label": f"Google News for theme '{theme}'",
+                    "func": fetch_google_search_results,
+                    "kwargs": {"query": theme, "max_results": max_results},
+                })
 
         elif platform == "YouTube":
             for query in queries:
-                print(f"Fetching YouTube results for '{query}'...")
-                df = pd.DataFrame(fetch_youtube_videos(query=query, max_results=max_results))
-                dfs.append(df)
+                tasks.append({
+                    "platform": platform,
+                    "query": query,
+                    "theme": query,
+                    "label": f"YouTube results for '{query}'",
+                    "func": fetch_youtube_videos,
+                    "kwargs": {"query": query, "max_results": max_results},
+                    "since_param": "published_after",
+                })
 
         elif platform == "RSS Feeds":
             for rss_url in queries:
-                print(f"Fetching RSS articles from {rss_url}...")
-                df = pd.DataFrame(fetch_rss_articles([rss_url], max_results=max_results))
-                dfs.append(df)
+                tasks.append({
+                    "platform": platform,
+                    "query": rss_url,
+                    "label": f"RSS articles from {rss_url}",
+                    "func": fetch_rss_articles,
+                    "kwargs": {"feed_urls": [rss_url], "max_results": max_results},
+                })
 
         elif platform == "Web Search":
             for theme in queries:
-                print(f"Fetching Web search results for '{theme}'...")
-                df = pd.DataFrame(fetch_news_articles(query=theme, max_results=max_results))
-                dfs.append(df)
+                tasks.append({
+                    "platform": platform,
+                    "query": theme,
+                    "theme": theme,
+                    "label": f"Web search results for '{theme}'",
+                    "func": fetch_news_articles,
+                    "kwargs": {"query": theme, "max_results": max_results},
+                    "since_param": "published_after",
+                })
 
         else:
             print(f"⚠️ Unknown platform: {platform}. Skipping.")
 
+    return tasks
+
+
+def _run_task(task: Dict) -> Tuple[Optional[pd.DataFrame], Dict]:
+    print(f"Fetching {task['label']}...")
+    start = time.perf_counter()
+    df, error = None, None
+    try:
+        df = pd.DataFrame(task["func"](**task["kwargs"]))
+        df["theme"] = task.get("theme")
+    except Exception as e:
+        error = str(e)
+    elapsed = time.perf_counter() - start
+
+    latest, rows = None, 0 if df is None else len(df)
+    if rows and "publishedAt" in df:
+        published = pd.to_datetime(df["publishedAt"], errors="coerce", utc=True)
+        latest = published.max() if published.notna().any() else None
+
+        # Incremental mode: the API was asked for items after the high-water mark; drop any it sent anyway
+        if task.get("since") is not None:
+            df = df[published.isna() | (published > task["since"])]
+
+    timing = {
+        "platform": task["platform"],
+        "query": task.get("query"),
+        "label": task["label"],
+        "seconds": round(elapsed, 3),
+        "rows": rows,
+        "new_rows": 0 if df is None else len(df),
+        "latest": latest,
+        "error": error,
+    }
+    return df, timing
+
+
+def run_collection_tasks(tasks: List[Dict], max_workers: Optional[int] = None,
+                         platform_limits: Optional[Dict] = None) -> Tuple[List[pd.DataFrame], List[Dict]]:
+    """
+    Run scraper tasks concurrently on a thread pool, capped per platform.
+    A task is only submitted once its platform has a free slot, so tasks queued for a slow or
+    tightly limited platform never hold pool threads that other platforms could use.
+    Args:
+        tasks (List[Dict]): Tasks from build_collection_tasks().
+        max_workers (int): Size of the thread pool. Defaults to the sum of the platform limits.
+        platform_limits (Dict): Overrides for PLATFORM_CONCURRENCY, e.g. {"YouTube": 1}.
+    Returns:
+        Tuple[List[pd.DataFrame], List[Dict]]: Result frames (in completion order) and per-call timings
+    """
+
+    if not tasks:
+        return [], []
+
+    limits = {**PLATFORM_CONCURRENCY, **(platform_limits or {})}
+    queues: Dict[str, deque] = {}
+    for task in tasks:
+        queues.setdefault(task["platform"], deque()).append(task)
+    free = {p: max(1, limits.get(p, DEFAULT_CONCURRENCY)) for p in queues}
+
+    if max_workers is None:
+        max_workers = min(MAX_WORKERS, len(tasks), sum(free.values()))
+
+    dfs, timings = [], []
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="collect") as executor:
+        running = {}
+
+        def _submit(platform: str) -> None:
+            # Fill the platform's free slots from its queue
+            while free[platform] and queues[platform]:
+                free[platform] -= 1
+                running[executor.submit(_run_task, queues[platform].popleft())] = platform
+
+        for platform in queues:
+            _submit(platform)
+
+        # Gather results as they complete; each one frees a slot for the next task of its platform
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                platform = running.pop(future)
+                free[platform] += 1
+                _submit(platform)
+
+                df, timing = future.result()
+                timings.append(timing)
+                if timing["error"]:
+                    print(f"Fetching {timing['label']} skipped due to an error: {timing['error']}")
+                else:
+                    print(f"Fetched {timing['new_rows']} rows: {timing['label']} ({timing['seconds']:.2f}s)")
+                    dfs.append(df)
+
+    return dfs, timings
+
+
+def collect_data(themes: List[str], platform_selections: Dict, max_results: int = 10,
+                 max_workers: Optional[int] = None, platform_limits: Optional[Dict] = None,
+                 incremental: bool = False) -> pd.DataFrame:
+    """
+    Collect data based on user-selected platforms and input values.
+    All scraper calls are fanned out concurrently (see run_collection_tasks), so wall time
+    is close to the slowest single call rather than the sum of all calls.
+
+    Near-duplicate items (same canonical URL, syndicated news, reposts, re-uploads) are
+    collapsed into one record, which keeps its original URL, before anything is stored (see dedup.py).
+
+    By default the content table and CSV are rebuilt from this run's results. With
+    incremental=True, sources that filter by publish date (YouTube, NewsAPI) are only asked
+    for items newer than their (source, query) high-water mark, all rows are upserted into
+    the content table by URL, and only unseen URLs are appended to the CSV.
+    Args:
+        themes (List[str]): List of themes selected by the user.
+        platform_selections (Dict): Platform-specific input info from session state.
+        max_results (int): Max number of results per scraper.
+        max_workers (int): Optional thread pool size.
+        platform_limits (Dict): Optional per-platform concurrency overrides.
+        incremental (bool): Fetch and store only the delta since the previous run.
+    Returns:
+        pd.DataFrame: Combined cleaned DataFrame with columns: title, url, publishedAt, source, theme, summary.
+                      In incremental mode only the new/updated rows are returned.
+                      Per-call timings are attached as df.attrs["timings"].
+    """
+
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+    os.makedirs(os.path.join(root, "data"), exist_ok=True)
+    output_path = os.path.join(root, "data", "combined_data.csv")
+
+    tasks = build_collection_tasks(themes, platform_selections, max_results)
+
+    if incremental:
+        conn = get_connection()
+        high_water_marks = load_high_water_marks(conn)
+        conn.close()
+
+        # Only sources whose API filters by publish date get a high-water mark. Ranked feeds (HN top,
+        # Reddit relevance, Google, RSS) can surface older items we haven't seen; the URL upsert handles those.
+        for task in tasks:
+            hwm = high_water_marks.get((task["platform"], task["query"]))
+            if hwm is not None and task.get("since_param"):
+                task["since"] = hwm
+                task["kwargs"][task["since_param"]] = hwm
+
+    start = time.perf_counter()
+    dfs, timings = run_collection_tasks(tasks, max_workers=max_workers, platform_limits=platform_limits)
+    wall_time = time.perf_counter() - start
+
+    if timings:
+        print(f"Collected {len(timings)} calls in {wall_time:.2f}s "
+              f"(sum of call times {sum(t['seconds'] for t in timings):.2f}s)")
+        for provider, s in outbound.stats().items():
+            if s["retries"] or s["failures"] or s["throttled_seconds"] or s["circuit"] != "closed":
+                print(f"  {provider}: {s['calls']} requests, {s['retries']} retries, {s['failures']} failures, "
+                      f"{s['throttled_seconds']:.1f}s rate-limited, circuit {s['circuit']}")
+
+    # Every call failed - surface the error rather than silently returning nothing
+    if timings and all(t["error"] for t in timings):
+        raise RuntimeError(f"All {len(timings)} scraper calls failed. First error: {timings[0]['error']}")
+
     # Combine all and drop duplicates/nulls
+    dfs = [df for df in dfs if not df.empty]
     if not dfs:
-        return pd.DataFrame(columns=["title", "url", "publishedAt", "source"])
+        empty_df = pd.DataFrame(columns=["title", "url", "publishedAt", "source", "theme", "summary"])
+        empty_df.attrs["timings"] = timings
+        return empty_df
 
     all_df = pd.concat(dfs, ignore_index=True)
     all_df = all_df.dropna(subset=["title", "url"]).drop_duplicates(subset=["title", "url"])
-    all_df = all_df[["title", "url", "publishedAt", "source"]]  # standard format
 
-    # Save to SQLite-compatible CSV for analysis
-    root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
-    os.makedirs(os.path.join(root, "data"), exist_ok=True)
+    # Google returns a snippet and RSS a summary; keep whichever the platform provides
+    summary = pd.Series(None, index=all_df.index, dtype="object")
+    for column in ("snippet", "summary"):
+        if column in all_df:
+            summary = summary.fillna(all_df[column])
+    all_df["summary"] = summary
 
-    # Save to SCV
-    output_path = os.path.join(root, "data", "combined_data.csv")
-    all_df.to_csv(output_path, index=False)
+    all_df = all_df[["title", "url", "publishedAt", "source", "theme", "summary"]]  # standard format
 
-    #Save to SQLite database
-    sqlite_path = os.path.join(root, "data", "content_data.db")
     #Connect to (or create) SQLite database
-    conn = sqlite3.connect(sqlite_path)
+    conn = get_connection()
+
+    # Collapse syndicated / reposted copies (and, when incremental, copies of stored items) into one record
+    all_df, signatures = remove_near_duplicates(all_df, conn=conn if incremental else None)
+
+    if incremental:
+        # Upsert by URL and append only never-seen URLs to the CSV
+        new_df = upsert_content(conn, all_df)
+        new_df.to_csv(output_path, mode="a", index=False, header=not os.path.exists(output_path))
+        print(f"Incremental collection: {len(new_df)} new, {len(all_df) - len(new_df)} updated rows")
+    else:
+        # Save to SCV
+        all_df.to_csv(output_path, index=False)
+
+        # Rebuild the "content" table from this run
+        replace_content(conn, all_df)
+
+        # Drop the similarity-search vectors of content that was not re-collected
+        from src.analyzers.vector_index import prune_vector_indexes
+        removed = prune_vector_indexes(url_hash(url) for url in all_df["url"])
+        if removed:
+            print(f"Removed {removed} stale vectors from the similarity index")
 
-    # Export to table name "content"
-    all_df.to_sql("content", conn, if_exists="replace", index=False)
+    save_minhash_signatures(conn, [url_hash(url) for url in all_df["url"]], signatures, lsh_buckets(signatures))
+    save_high_water_marks(conn, timings, replace=not incremental)
 
     # Close the connection
     conn.close()
 
-    return all_df
\ No newline at end of file
+    all_df.attrs["timings"] = timings
+    return all_df
@@ -0,0 +1,275 @@
+# src/data_collection/dedup.py
+
+"""
+Near-duplicate detection for collected items.
+
+Syndicated articles, reposted links and re-uploads are collapsed into one canonical
+record in three steps, each linear in the number of items:
+
+1. URL canonicalization: tracking params, fragments, www./m./amp variants and
+   YouTube short links are normalized, so the same page gets the same dedup key.
+   The key is only used for grouping; stored rows keep the URL the source returned.
+2. MinHash signatures over character shingles of the title + summary, bucketed with
+   LSH banding, so only items sharing a bucket are ever compared.
+3. Union-find over same-URL items and verified LSH candidates; each group keeps the
+   record with a summary and the earliest publish date.
+
+Signatures are stored in the database, so incremental collections also drop items
+that duplicate content collected in earlier runs.
+"""
+
+import re
+import sqlite3
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+import pandas as pd
+
+from src.database.schema import url_hash
+
+# Estimated Jaccard similarity above which two items are the same story
+DEDUP_THRESHOLD = 0.7
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 16  # 16 bands x 4 rows: ~99% of pairs at 0.7 similarity become candidates
+SUMMARY_CHARS = 300
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "ref", "ref_src", "ref_url", "cmpid", "ncid", "spm", "share", "si", "feature",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_", "hsa_")
+HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+# Second-level labels under country TLDs (co.uk, com.au, ...) that are not registrable on their own
+PUBLIC_SECOND_LEVEL = {"co", "com", "net", "org", "gov", "edu", "ac", "ne", "or"}
+YOUTUBE_HOSTS = {"youtube.com", "youtu.be", "youtube-nocookie.com"}
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+# Multiply-shift hash family: h(x) = (a * x + b) mod 2^64, top 32 bits (a odd)
+_rng = np.random.default_rng(1)
+_PERM_A = _rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_PERM_B = _rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64)
+_EMPTY_HASH = np.uint64(1 << 32)  # above any 32-bit hash value
+
+def _is_registrable(host: str) -> bool:
+    # At least a name plus a suffix ("example.com"), and not a bare country second level ("co.uk")
+    labels = host.split(".")
+    if len(labels) < 2 or not all(labels):
+        return False
+    return not (len(labels) == 2 and len(labels[1]) == 2 and labels[0] in PUBLIC_SECOND_LEVEL)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Dedup key of a URL: copies of the same page map to the same key.
+
+    Lowercases the host, drops www./m./amp. prefixes (when a registrable domain remains),
+    default ports, fragments, trailing slashes, AMP suffixes and tracking params, sorts the
+    remaining params, upgrades http to https and rewrites YouTube short / shorts links to
+    watch?v=<id>. The key is not meant to be fetched or shown.
+    """
+    if not isinstance(url, str) or not url.strip():
+        return url
+    parts = urlsplit(url.strip())
+    if parts.scheme not in ("http", "https"):
+        return url.strip()
+
+    host = (parts.hostname or "").rstrip(".")
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix) and _is_registrable(host[len(prefix):]):
+            host = host[len(prefix):]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = re.sub(r"/+", "/", parts.path)
+    path = re.sub(r"/amp/?$", "", path).rstrip("/")
+    params = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+
+    if host in YOUTUBE_HOSTS:
+        video_id = dict(params).get("v")
+        if host == "youtu.be" and path:
+            video_id = path.lstrip("/")
+        elif path.startswith(("/shorts/", "/embed/", "/live/")):
+            video_id = path.split("/")[2]
+        if video_id:
+            host, path, params = "youtube.com", "/watch", [("v", video_id)]
+
+    return urlunsplit(("https", host, path, urlencode(sorted(params)), ""))
+
+
+def _shingles(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    # Every character SHINGLE_SIZE-gram of the normalized texts packed into one integer, computed for
+    # all texts at once on a single byte buffer. Returns the shingle values and each one's text index.
+    normalized = [_NON_ALNUM.sub(" ", text.lower()).strip() if isinstance(text, str) else "" for text in texts]
+    lengths = np.array([len(text) for text in normalized], dtype=np.int64)
+    if not lengths.sum():
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)
+
+    # Texts shorter than a shingle are padded so they still get one shingle
+    padded = [text.ljust(SHINGLE_SIZE) if 0 < len(text) < SHINGLE_SIZE else text for text in normalized]
+    lengths = np.array([len(text) for text in padded], dtype=np.int64)
+    buffer = np.frombuffer("".join(padded).encode("ascii"), dtype=np.uint8).astype(np.uint64)
+
+    n_windows = len(buffer) - SHINGLE_SIZE + 1
+    values = np.zeros(max(n_windows, 0), dtype=np.uint64)
+    for k in range(SHINGLE_SIZE):
+        values |= buffer[k:k + n_windows] << np.uint64(8 * k)
+
+    # Keep windows that start and end inside the same text
+    text_index = np.repeat(np.arange(len(texts)), lengths)[:n_windows]
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    position = np.arange(n_windows) - offsets[text_index]
+    inside = position <= lengths[text_index] - SHINGLE_SIZE
+    return values[inside], text_index[inside]
+
+
+def minhash_signatures(texts: List[str], max_chunk: int = 200000) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    MinHash signature of each text's character shingles.
+
+    Args:
+        texts (List[str]): Texts to sign
+        max_chunk (int): Max shingles hashed at once (bounds memory to ~max_chunk * NUM_PERM * 8 bytes)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (len(texts), NUM_PERM) uint64 signatures, and a mask of
+                                       texts that had any shingles (empty texts are never matched)
+    """
+    values, text_index = _shingles(texts)
+    signatures = np.full((len(texts), NUM_PERM), _EMPTY_HASH, dtype=np.uint64)
+    valid = np.bincount(text_index, minlength=len(texts)) > 0
+
+    # Shingles are grouped by text, so each chunk is a vectorized (perm x shingle) hash and a min per text
+    for start in range(0, len(values), max_chunk):
+        chunk, rows = values[start:start + max_chunk], text_index[start:start + max_chunk]
+        hashed = (_PERM_A[:, None] * chunk[None, :] + _PERM_B[:, None]) >> np.uint64(32)
+        segment_starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        minima = np.minimum.reduceat(hashed, segment_starts, axis=1).T
+        # A text split across two chunks keeps the smaller of both minima
+        signatures[rows[segment_starts]] = np.minimum(signatures[rows[segment_starts]], minima)
+
+    return signatures, valid
+
+
+def lsh_buckets(signatures: np.ndarray, bands: int = BANDS) -> np.ndarray:
+    """(n, bands) int64 bucket keys: band number in the high 32 bits, a hash of the band's rows below."""
+    rows_per_band = signatures.shape[1] // bands
+    buckets = np.empty((len(signatures), bands), dtype=np.int64)
+    for band in range(bands):
+        block = signatures[:, band * rows_per_band:(band + 1) * rows_per_band]
+        combined = (block * _PERM_A[:rows_per_band]).sum(axis=1, dtype=np.uint64) >> np.uint64(32)
+        buckets[:, band] = (np.int64(band) << np.int64(32)) | combined.astype(np.int64)
+    return buckets
+
+
+def _similarity(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # Share of equal MinHash values estimates the Jaccard similarity (row-wise for 2D inputs)
+    return np.mean(a == b, axis=-1)
+
+
+def _head_pairs(keys: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Pair every row with the first row that has the same key (linear: one sort, no all-pairs)
+    order = rows[np.argsort(keys[rows], kind="stable")]
+    sorted_keys = keys[order]
+    is_head = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+    heads = order[np.maximum.accumulate(np.where(is_head, np.arange(len(order)), 0))]
+    return order[~is_head], heads[~is_head]
+
+
+def group_duplicates(urls: List[str], signatures: np.ndarray, valid: np.ndarray, buckets: np.ndarray,
+                     threshold: float = DEDUP_THRESHOLD, batch_size: int = 100000) -> np.ndarray:
+    """
+    Group label per item: items with the same canonical URL or similar signatures share a label.
+
+    In each LSH band, an item is compared with the first item of its bucket only; the other
+    bands give it further chances to meet its duplicates, so no bucket is ever compared all-pairs.
+
+    Returns:
+        np.ndarray: Connected-component label per item
+    """
+    from scipy import sparse
+    from scipy.sparse.csgraph import connected_components
+
+    n = len(urls)
+    url_codes = pd.factorize(pd.Series(urls, dtype="object"))[0]
+    sources, targets = _head_pairs(url_codes, np.arange(n))
+    edges_from, edges_to = [sources], [targets]
+
+    valid_rows = np.flatnonzero(valid)
+    for band in range(buckets.shape[1]):
+        rows, heads = _head_pairs(buckets[:, band], valid_rows)
+        for start in range(0, len(rows), batch_size):
+            chunk_rows, chunk_heads = rows[start:start + batch_size], heads[start:start + batch_size]
+            similar = _similarity(signatures[chunk_rows], signatures[chunk_heads]) >= threshold
+            edges_from.append(chunk_rows[similar])
+            edges_to.append(chunk_heads[similar])
+
+    edges_from, edges_to = np.concatenate(edges_from), np.concatenate(edges_to)
+    graph = sparse.coo_matrix((np.ones(len(edges_from), dtype=np.int8), (edges_from, edges_to)), shape=(n, n))
+    return connected_components(graph, directed=False)[1]
+
+
+def _matches_stored(conn: sqlite3.Connection, df: pd.DataFrame, signatures: np.ndarray, valid: np.ndarray,
+                    buckets: np.ndarray, threshold: float) -> np.ndarray:
+    # Items similar to content collected in an earlier run (other than the same URL itself)
+    from src.database.db_reader import read_lsh_buckets, read_minhash_signatures
+
+    stored_buckets = read_lsh_buckets(conn, np.unique(buckets[valid]).tolist())
+    ids = [url_hash(url) for url in df["url"]]
+    candidates = [
+        {row_id for bucket in buckets[i] for row_id in stored_buckets.get(int(bucket), []) if row_id != ids[i]}
+        if valid[i] else set()
+        for i in range(len(df))
+    ]
+    stored = read_minhash_signatures(conn, sorted(set().union(*candidates)))
+    return np.array([
+        any(_similarity(signatures[i], stored[row_id]) >= threshold for row_id in candidates[i]
+            if row_id in stored and len(stored[row_id]) == len(signatures[i]))
+        for i in range(len(df))
+    ], dtype=bool)
+
+
+def remove_near_duplicates(df: pd.DataFrame, conn: Optional[sqlite3.Connection] = None,
+                           threshold: float = DEDUP_THRESHOLD) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Collapse near-duplicate items (same canonical URL or similar text) into one record each.
+
+    Args:
+        df (pd.DataFrame): Collected rows with title, url and optionally summary and publishedAt
+        conn (sqlite3.Connection): If given, rows duplicating previously stored content are dropped too
+        threshold (float): Estimated Jaccard similarity above which two items are duplicates
+
+    Returns:
+        Tuple[pd.DataFrame, np.ndarray]: Canonical rows (with their original URLs) and their MinHash
+                                         signatures, to be stored with save_minhash_signatures()
+    """
+    if df.empty:
+        return df, np.empty((0, NUM_PERM), dtype=np.uint64)
+
+    df = df.reset_index(drop=True)
+    keys = [canonicalize_url(url) for url in df["url"]]
+
+    summaries = (df["summary"] if "summary" in df else pd.Series(None, index=df.index)).fillna("").astype(str)
+    texts = (df["title"].fillna("").astype(str) + " " + summaries.str[:SUMMARY_CHARS]).tolist()
+    signatures, valid = minhash_signatures(texts)
+    buckets = lsh_buckets(signatures)
+    labels = group_duplicates(keys, signatures, valid, buckets, threshold)
+
+    # Canonical record per group: has a summary, then earliest publish date, then first collected
+    published = pd.to_datetime(df["publishedAt"] if "publishedAt" in df else pd.Series(None, index=df.index),
+                               errors="coerce", utc=True)
+    order = pd.DataFrame({"label": labels, "no_summary": summaries.str.strip() == "", "published": published,
+                          "position": np.arange(len(df))})
+    order = order.sort_values(["label", "no_summary", "published", "position"], na_position="last")
+    keep = order.drop_duplicates(subset="label")["position"].sort_values().to_numpy()
+
+    if conn is not None:
+        keep = keep[~_matches_stored(conn, df.iloc[keep], signatures[keep], valid[keep], buckets[keep], threshold)]
+
+    print(f"Near-duplicate removal: {len(df)} -> {len(keep)} rows")
+    return df.iloc[keep].reset_index(drop=True), signatures[keep]
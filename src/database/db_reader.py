@@ -0,0 +1,283 @@
+# src/database/db_reader.py
+
+"""
+Read helpers for the content database.
+"""
+
+import json
+import sqlite3
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.database.schema import ANALYSIS_COLUMNS, CONTENT_COLUMNS, get_connection, to_iso
+
+
+def _check_columns(columns: List[str]) -> None:
+    unknown = set(columns) - set(CONTENT_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown content columns: {sorted(unknown)}")
+
+
+def _content_filters(since=None, until=None, sources: Optional[List[str]] = None,
+                     themes: Optional[List[str]] = None, table: str = "content") -> Tuple[List[str], List]:
+    # WHERE clauses and params shared by the content readers
+    where, params = [], []
+    if since is not None:
+        where.append(f"{table}.publishedAt >= ?")
+        params.append(to_iso(since))
+    if until is not None:
+        where.append(f"{table}.publishedAt <= ?")
+        params.append(to_iso(until))
+    if sources:
+        where.append(f"{table}.source IN ({', '.join('?' * len(sources))})")
+        params.extend(sources)
+    if themes:
+        where.append(f"{table}.theme IN ({', '.join('?' * len(themes))})")
+        params.extend(themes)
+    return where, params
+
+
+def read_content(conn: Optional[sqlite3.Connection] = None, since=None, until=None,
+                 sources: Optional[List[str]] = None, themes: Optional[List[str]] = None,
+                 columns: Optional[List[str]] = None, limit: Optional[int] = None) -> pd.DataFrame:
+    """
+    Read a filtered slice of the content table.
+
+    Args:
+        conn (sqlite3.Connection): Optional open connection (a new one is opened and closed otherwise)
+        since, until (str | datetime): Publish date window (inclusive)
+        sources (List[str]): Only rows from these sources
+        themes (List[str]): Only rows collected for these themes
+        columns (List[str]): Columns to return. Defaults to all content columns
+        limit (int): Max number of rows, newest first
+
+    Returns:
+        pd.DataFrame: Matching rows with publishedAt parsed as UTC datetimes
+    """
+    columns = columns or list(CONTENT_COLUMNS)
+    _check_columns(columns)
+
+    where, params = _content_filters(since, until, sources, themes)
+    query = f"SELECT {', '.join(columns)} FROM content"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    if limit:
+        query += " ORDER BY publishedAt DESC LIMIT ?"
+        params.append(int(limit))
+
+    own_conn = conn is None
+    conn = conn or get_connection()
+    try:
+        df = pd.read_sql_query(query, conn, params=params)
+    finally:
+        if own_conn:
+            conn.close()
+
+    if "publishedAt" in df:
+        df["publishedAt"] = pd.to_datetime(df["publishedAt"], utc=True)
+    return df
+
+
+def read_content_by_ids(ids: List[str], conn: Optional[sqlite3.Connection] = None,
+                        columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Content rows for the given ids (unknown ids are left out, order is not preserved)."""
+    columns = columns or list(CONTENT_COLUMNS)
+    _check_columns(columns)
+
+    own_conn = conn is None
+    conn = conn or get_connection()
+    try:
+        chunks = []
+        for start in range(0, len(ids), 900):  # stay under SQLite's bound-variable limit
+            chunk = ids[start:start + 900]
+            placeholders = ", ".join("?" * len(chunk))
+            chunks.append(pd.read_sql_query(
+                f"SELECT {', '.join(columns)} FROM content WHERE id IN ({placeholders})", conn, params=chunk
+            ))
+    finally:
+        if own_conn:
+            conn.close()
+
+    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
+    if "publishedAt" in df:
+        df["publishedAt"] = pd.to_datetime(df["publishedAt"], utc=True)
+    return df
+
+
+def iter_content(conn: sqlite3.Connection, chunk_size: int = 50000, since=None, until=None,
+                 sources: Optional[List[str]] = None, themes: Optional[List[str]] = None,
+                 columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream a filtered slice of the content table in chunks of at most chunk_size rows.
+
+    Args:
+        conn (sqlite3.Connection): Open connection, used only for reading while the iterator is alive
+        chunk_size (int): Rows per chunk
+        since, until, sources, themes: Same filters as read_content()
+        columns (List[str]): Columns to return. Defaults to all content columns
+
+    Yields:
+        pd.DataFrame: Chunks in rowid order with publishedAt parsed as UTC datetimes
+    """
+    columns = columns or list(CONTENT_COLUMNS)
+    _check_columns(columns)
+
+    where, params = _content_filters(since, until, sources, themes)
+    query = f"SELECT {', '.join(columns)} FROM content"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+
+    for chunk in pd.read_sql_query(query, conn, params=params, chunksize=chunk_size):
+        if "publishedAt" in chunk:
+            chunk["publishedAt"] = pd.to_datetime(chunk["publishedAt"], utc=True)
+        yield chunk
+
+
+def read_analysis(conn: Optional[sqlite3.Connection] = None, since=None, until=None,
+                  sources: Optional[List[str]] = None, themes: Optional[List[str]] = None,
+                  limit: Optional[int] = None) -> pd.DataFrame:
+    """
+    Content rows joined with their stored analysis results.
+
+    Args:
+        conn (sqlite3.Connection): Optional open connection (a new one is opened and closed otherwise)
+        since, until, sources, themes: Same filters as read_content()
+        limit (int): Max number of rows, newest first
+
+    Returns:
+        pd.DataFrame: Content columns plus the analysis columns, with top_keywords as lists
+    """
+    analysis_columns = [f"analysis.{name}" for name in ANALYSIS_COLUMNS if name != "id"]
+    where, params = _content_filters(since, until, sources, themes)
+    query = f"SELECT content.*, {', '.join(analysis_columns)} FROM content JOIN analysis ON analysis.id = content.id"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    if limit:
+        query += " ORDER BY content.publishedAt DESC LIMIT ?"
+        params.append(int(limit))
+
+    own_conn = conn is None
+    conn = conn or get_connection()
+    try:
+        df = pd.read_sql_query(query, conn, params=params)
+    finally:
+        if own_conn:
+            conn.close()
+
+    df["publishedAt"] = pd.to_datetime(df["publishedAt"], utc=True)
+    df["top_keywords"] = [json.loads(value) if value else [] for value in df["top_keywords"]]
+    return df
+
+
+def read_analysis_rows(conn: sqlite3.Connection, ids: List[str]) -> pd.DataFrame:
+    """Stored analysis rows for the given content ids (ids never analyzed are left out)."""
+    columns = list(ANALYSIS_COLUMNS)
+    chunks = []
+    for start in range(0, len(ids), 900):  # stay under SQLite's bound-variable limit
+        chunk = ids[start:start + 900]
+        placeholders = ", ".join("?" * len(chunk))
+        chunks.append(pd.read_sql_query(
+            f"SELECT {', '.join(columns)} FROM analysis WHERE id IN ({placeholders})", conn, params=chunk
+        ))
+    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
+    df["top_keywords"] = [json.loads(value) if value else [] for value in df["top_keywords"]]
+    return df
+
+
+def load_last_refit(conn: sqlite3.Connection) -> Optional[Dict]:
+    """The most recent analysis run that refitted the corpus-level models, or None."""
+    row = conn.execute(
+        "SELECT run_at, rows, model_version, topics, fit_id FROM analysis_runs WHERE refit = 1 ORDER BY run_at DESC LIMIT 1"
+    ).fetchone()
+    if row is None:
+        return None
+    run_at, rows, model_version, topics, fit_id = row
+    return {"run_at": run_at, "rows": rows, "model_version": model_version, "topics": json.loads(topics or "[]"),
+            "fit_id": fit_id}
+
+
+def read_lsh_buckets(conn: sqlite3.Connection, buckets: List[int]) -> Dict[int, List[str]]:
+    """Stored content ids per LSH bucket, for the given buckets."""
+    matches: Dict[int, List[str]] = {}
+    for start in range(0, len(buckets), 900):  # stay under SQLite's bound-variable limit
+        chunk = buckets[start:start + 900]
+        placeholders = ", ".join("?" * len(chunk))
+        for bucket, row_id in conn.execute(f"SELECT bucket, id FROM content_lsh WHERE bucket IN ({placeholders})", chunk):
+            matches.setdefault(bucket, []).append(row_id)
+    return matches
+
+
+def read_minhash_signatures(conn: sqlite3.Connection, ids: List[str]) -> Dict[str, np.ndarray]:
+    """Stored MinHash signatures for the given content ids."""
+    signatures = {}
+    for start in range(0, len(ids), 900):
+        chunk = ids[start:start + 900]
+        placeholders = ", ".join("?" * len(chunk))
+        for row_id, blob in conn.execute(f"SELECT id, signature FROM content_minhash WHERE id IN ({placeholders})", chunk):
+            signatures[row_id] = np.frombuffer(blob, dtype=np.uint64)
+    return signatures
+
+
+def read_sentiment_cache(conn: sqlite3.Connection, hashes: List[str], scorer: str) -> Dict[str, float]:
+    """Cached sentiment scores for the given text hashes (missing hashes are left out)."""
+    scores = {}
+    for start in range(0, len(hashes), 900):  # stay under SQLite's bound-variable limit
+        chunk = hashes[start:start + 900]
+        placeholders = ", ".join("?" * len(chunk))
+        rows = conn.execute(
+            f"SELECT text_hash, score FROM sentiment_cache WHERE scorer = ? AND text_hash IN ({placeholders})",
+            [scorer, *chunk],
+        )
+        scores.update(rows)
+    return scores
+
+
+def read_llm_cache(conn: sqlite3.Connection, key: str, min_created: float) -> Optional[str]:
+    """Cached model response for a key, if it was stored after min_created (epoch seconds)."""
+    row = conn.execute(
+        "SELECT response FROM llm_cache WHERE key = ? AND created_at >= ?", (key, min_created)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def read_llm_cache_namespace(conn: sqlite3.Connection, namespace: str, min_created: float) -> List[Tuple[str, List[str], str]]:
+    """(key, keywords, response) of the unexpired cache entries in a namespace that have keywords."""
+    rows = conn.execute(
+        "SELECT key, keywords, response FROM llm_cache WHERE namespace = ? AND created_at >= ? AND keywords IS NOT NULL",
+        (namespace, min_created),
+    ).fetchall()
+    return [(key, json.loads(keywords), response) for key, keywords, response in rows]
+
+
+def read_llm_usage(conn: Optional[sqlite3.Connection] = None, since: Optional[str] = None) -> pd.DataFrame:
+    """
+    Token usage per stage and model.
+
+    Args:
+        conn (sqlite3.Connection): Open connection (a new one is opened if None)
+        since (str): Only count calls made at or after this timestamp
+
+    Returns:
+        pd.DataFrame: stage, model, calls, cached_calls, prompt_tokens, completion_tokens, seconds
+    """
+    own_conn = conn is None
+    conn = conn or get_connection()
+    try:
+        return pd.read_sql_query("""
+            SELECT stage, model, COUNT(*) AS calls, SUM(cached) AS cached_calls,
+                   SUM(prompt_tokens) AS prompt_tokens, SUM(completion_tokens) AS completion_tokens,
+                   SUM(seconds) AS seconds
+            FROM llm_calls WHERE called_at >= ?
+            GROUP BY stage, model ORDER BY stage, model
+        """, conn, params=[to_iso(since) if since else ""])
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def load_high_water_marks(conn: sqlite3.Connection) -> Dict[Tuple[str, str], pd.Timestamp]:
+    """Latest publishedAt seen per (source, query), as stored by the previous run."""
+    rows = conn.execute("SELECT source, query, high_water_mark FROM collection_state").fetchall()
+    return {(source, query): pd.Timestamp(hwm) for source, query, hwm in rows if hwm}
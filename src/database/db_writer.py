@@ -0,0 +1,245 @@
+# src/database/db_writer.py
+
+"""
+Write helpers for the content database.
+"""
+
+import json
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.database.schema import ANALYSIS_COLUMNS, CONTENT_COLUMNS, url_hash, to_iso
+
+BATCH_SIZE = 5000
+
+UPSERT_CONTENT = f"""
+    INSERT INTO content ({", ".join(CONTENT_COLUMNS)})
+    VALUES ({", ".join("?" * len(CONTENT_COLUMNS))})
+    ON CONFLICT(id) DO UPDATE SET
+        title = excluded.title,
+        publishedAt = COALESCE(excluded.publishedAt, content.publishedAt),
+        source = excluded.source,
+        theme = COALESCE(excluded.theme, content.theme),
+        summary = COALESCE(excluded.summary, content.summary),
+        collectedAt = excluded.collectedAt
+"""
+
+
+def _content_records(df: pd.DataFrame) -> List[tuple]:
+    collected_at = pd.Timestamp.now(tz="UTC").isoformat()
+    records = []
+    for row in df.itertuples(index=False):
+        row = row._asdict()
+        records.append((
+            url_hash(row["url"]),
+            row["title"],
+            row["url"],
+            to_iso(row.get("publishedAt")),
+            row.get("source"),
+            row.get("theme") if pd.notna(row.get("theme")) else None,
+            row.get("summary") if pd.notna(row.get("summary")) else None,
+            collected_at,
+        ))
+    return records
+
+
+def upsert_content(conn: sqlite3.Connection, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Insert or update content rows keyed by URL hash, in batches.
+
+    Args:
+        conn (sqlite3.Connection): Connection from get_connection()
+        df (pd.DataFrame): Rows with at least title, url, publishedAt and source
+
+    Returns:
+        pd.DataFrame: The rows whose URL was not in the table before
+    """
+    df = df.dropna(subset=["title", "url"]).drop_duplicates(subset=["url"], keep="last")
+    if df.empty:
+        return df
+
+    ids = [url_hash(url) for url in df["url"]]
+    existing = set()
+    for start in range(0, len(ids), 900):  # stay under SQLite's bound-variable limit
+        chunk = ids[start:start + 900]
+        placeholders = ", ".join("?" * len(chunk))
+        existing.update(row[0] for row in conn.execute(f"SELECT id FROM content WHERE id IN ({placeholders})", chunk))
+
+    with conn:
+        _write_content(conn, df)
+
+    return df[[row_id not in existing for row_id in ids]]
+
+
+def _write_content(conn: sqlite3.Connection, df: pd.DataFrame) -> None:
+    # Runs inside the caller's transaction
+    records = _content_records(df)
+    for start in range(0, len(records), BATCH_SIZE):
+        conn.executemany(UPSERT_CONTENT, records[start:start + BATCH_SIZE])
+
+
+def replace_content(conn: sqlite3.Connection, df: pd.DataFrame) -> None:
+    """Replace the whole content table with df (schema and indexes are kept), in one transaction."""
+    df = df.dropna(subset=["title", "url"]).drop_duplicates(subset=["url"], keep="last")
+    with conn:
+        conn.execute("DELETE FROM content")
+        conn.execute("DELETE FROM content_minhash")
+        conn.execute("DELETE FROM content_lsh")
+        _write_content(conn, df)
+
+
+def save_minhash_signatures(conn: sqlite3.Connection, ids: List[str], signatures: np.ndarray,
+                            buckets: np.ndarray) -> None:
+    """
+    Store near-duplicate signatures so later collections can be matched against this content.
+
+    Args:
+        conn (sqlite3.Connection): Connection from get_connection()
+        ids (List[str]): Content ids
+        signatures (np.ndarray): (len(ids), num_perm) MinHash signatures
+        buckets (np.ndarray): (len(ids), bands) LSH bucket keys
+    """
+    rows = [(row_id, signature.tobytes()) for row_id, signature in zip(ids, signatures)]
+    lsh_rows = [(int(bucket), row_id) for row_id, row_buckets in zip(ids, buckets) for bucket in row_buckets]
+    with conn:
+        # Replace the buckets of content that was re-collected with a new title / summary
+        conn.executemany("DELETE FROM content_lsh WHERE id = ?", [(row_id,) for row_id in ids])
+        for start in range(0, len(rows), BATCH_SIZE):
+            conn.executemany("INSERT OR REPLACE INTO content_minhash VALUES (?, ?)", rows[start:start + BATCH_SIZE])
+        for start in range(0, len(lsh_rows), BATCH_SIZE):
+            conn.executemany("INSERT INTO content_lsh VALUES (?, ?)", lsh_rows[start:start + BATCH_SIZE])
+
+
+def upsert_analysis(conn: sqlite3.Connection, df: pd.DataFrame) -> None:
+    """
+    Insert or replace analysis rows keyed by content id, in batches.
+
+    Args:
+        conn (sqlite3.Connection): Connection from get_connection()
+        df (pd.DataFrame): Rows with id plus any analysis columns (missing columns are stored as NULL)
+    """
+    analyzed_at = pd.Timestamp.now(tz="UTC").isoformat()
+    columns = list(ANALYSIS_COLUMNS)
+    records = []
+    for row in df.itertuples(index=False):
+        row = row._asdict()
+        values = []
+        for column in columns:
+            value = row.get(column)
+            if column == "analyzedAt":
+                value = analyzed_at
+            elif column == "top_keywords":
+                value = json.dumps(list(value)) if value is not None else None
+            elif value is not None and pd.isna(value):
+                value = None
+            elif isinstance(value, np.generic):
+                value = value.item()
+            values.append(value)
+        records.append(tuple(values))
+
+    with conn:
+        for start in range(0, len(records), BATCH_SIZE):
+            conn.executemany(
+                f"INSERT OR REPLACE INTO analysis ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                records[start:start + BATCH_SIZE],
+            )
+
+
+def update_analysis_clusters(conn: sqlite3.Connection, ids: List[str], clusters, coords) -> None:
+    """Overwrite cluster labels and 2D coordinates of existing analysis rows."""
+    rows = [(int(c), float(x), float(y), row_id) for row_id, c, (x, y) in zip(ids, clusters, coords)]
+    with conn:
+        for start in range(0, len(rows), BATCH_SIZE):
+            conn.executemany("UPDATE analysis SET cluster = ?, x = ?, y = ? WHERE id = ?", rows[start:start + BATCH_SIZE])
+
+
+def save_analysis_run(conn: sqlite3.Connection, rows: int, processed: int, refit: bool,
+                      model_version: str, topics: Optional[List[List[str]]] = None, seconds: float = None,
+                      fit_id: Optional[str] = None) -> None:
+    """Record an analysis run (used to decide when the corpus-level models need a refit)."""
+    with conn:
+        conn.execute(
+            "INSERT INTO analysis_runs (run_at, rows, processed, refit, model_version, topics, seconds, fit_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (pd.Timestamp.now(tz="UTC").isoformat(), int(rows), int(processed), int(refit),
+             model_version, json.dumps(topics) if topics is not None else None, seconds, fit_id),
+        )
+
+
+def save_sentiment_cache(conn: sqlite3.Connection, scores: Dict[str, float], scorer: str) -> None:
+    """Store sentiment scores keyed by text hash."""
+    rows = [(text_hash, scorer, float(score)) for text_hash, score in scores.items()]
+    with conn:
+        for start in range(0, len(rows), BATCH_SIZE):
+            conn.executemany("INSERT OR REPLACE INTO sentiment_cache VALUES (?, ?, ?)", rows[start:start + BATCH_SIZE])
+
+
+def save_llm_cache(conn: sqlite3.Connection, key: str, namespace: str, response: str, size: int,
+                   keywords: Optional[List[str]] = None) -> None:
+    """Store a model response under its cache key."""
+    now = time.time()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, namespace, json.dumps(keywords) if keywords is not None else None, response, size, now, now),
+        )
+
+
+def touch_llm_cache(conn: sqlite3.Connection, key: str) -> None:
+    """Mark a cache entry as recently used, so size-bound eviction keeps it."""
+    with conn:
+        conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+
+
+def evict_llm_cache(conn: sqlite3.Connection, min_created: float, max_bytes: int) -> int:
+    """
+    Drop expired cache entries, then the least recently used ones until the cache fits in max_bytes.
+
+    Returns:
+        int: Entries removed
+    """
+    with conn:
+        removed = conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (min_created,)).rowcount
+        removed += conn.execute("""
+            DELETE FROM llm_cache WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY last_used DESC, key) AS running FROM llm_cache
+                ) WHERE running > ?
+            )
+        """, (max_bytes,)).rowcount
+    return removed
+
+
+def save_llm_call(conn: sqlite3.Connection, stage: str, model: str, prompt_tokens: int, completion_tokens: int,
+                  cached: bool = False, seconds: Optional[float] = None) -> None:
+    """Record the token usage of one model call."""
+    with conn:
+        conn.execute(
+            "INSERT INTO llm_calls VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (pd.Timestamp.now(tz="UTC").isoformat(), stage, model, int(prompt_tokens), int(completion_tokens),
+             int(cached), seconds),
+        )
+
+
+def save_high_water_marks(conn: sqlite3.Connection, timings: List[Dict], replace: bool = False) -> None:
+    """Advance the high-water mark of every successful call (never moves a mark backwards)."""
+    now = pd.Timestamp.now(tz="UTC").isoformat()
+    rows = [
+        (t["platform"], t["query"], to_iso(t["latest"]), now)
+        for t in timings
+        if not t["error"] and t["latest"] is not None
+    ]
+    with conn:
+        if replace:
+            conn.execute("DELETE FROM collection_state")
+        conn.executemany("""
+            INSERT INTO collection_state (source, query, high_water_mark, updated_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(source, query) DO UPDATE SET
+                high_water_mark = MAX(high_water_mark, excluded.high_water_mark),
+                updated_at = excluded.updated_at
+        """, rows)
@@ -0,0 +1,187 @@
+# src/database/schema.py
+
+"""
+SQLite schema for the collected content database (data/content_data.db).
+"""
+
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]
+DB_PATH = ROOT / "data" / "content_data.db"
+
+# Column name -> SQLite type, in table order
+CONTENT_COLUMNS = {
+    "id": "TEXT PRIMARY KEY",      # sha1 of the URL
+    "title": "TEXT NOT NULL",
+    "url": "TEXT NOT NULL",
+    "publishedAt": "TEXT",         # ISO-8601, UTC
+    "source": "TEXT",
+    "theme": "TEXT",               # theme / query the item was collected for
+    "summary": "TEXT",             # snippet or summary when the platform provides one
+    "collectedAt": "TEXT",
+}
+
+# Per-row outputs of the streaming analysis, keyed by content id
+ANALYSIS_COLUMNS = {
+    "id": "TEXT PRIMARY KEY",      # content.id
+    "clean_title": "TEXT",
+    "top_keywords": "TEXT",        # JSON list
+    "sentiment_score": "REAL",
+    "sentiment_label": "TEXT",
+    "cluster": "INTEGER",
+    "x": "REAL",                   # 2D projection for plotting
+    "y": "REAL",
+    "analyzedAt": "TEXT",
+    "content_hash": "TEXT",        # hash of the title + summary the row was analyzed from
+    "model_version": "TEXT",       # versions of the per-row steps (cleaner, scorer, embedding model)
+    "fit_id": "TEXT",              # corpus-level models (analysis_runs.fit_id) top_keywords, cluster and x/y come from
+}
+
+# Columns added to analysis_runs after it was first created
+ANALYSIS_RUN_COLUMNS = {
+    "fit_id": "TEXT",
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS content (
+    {", ".join(f"{name} {sql_type}" for name, sql_type in CONTENT_COLUMNS.items())}
+);
+CREATE INDEX IF NOT EXISTS idx_content_published ON content(publishedAt);
+CREATE INDEX IF NOT EXISTS idx_content_source ON content(source, publishedAt);
+CREATE INDEX IF NOT EXISTS idx_content_theme ON content(theme);
+
+CREATE TABLE IF NOT EXISTS analysis (
+    {", ".join(f"{name} {sql_type}" for name, sql_type in ANALYSIS_COLUMNS.items())}
+);
+
+CREATE TABLE IF NOT EXISTS analysis_runs (
+    run_at        TEXT NOT NULL,
+    rows          INTEGER NOT NULL,   -- rows in the analyzed slice
+    processed     INTEGER NOT NULL,   -- rows (re)computed by this run
+    refit         INTEGER NOT NULL,   -- 1 if TF-IDF, clustering and projection were refitted on the whole slice
+    model_version TEXT,
+    topics        TEXT,               -- JSON list of NMF topics from the last refit
+    seconds       REAL,
+    fit_id        TEXT                -- id of the corpus-level models the run wrote rows with
+);
+
+CREATE TABLE IF NOT EXISTS content_minhash (
+    id        TEXT PRIMARY KEY,     -- content.id
+    signature BLOB NOT NULL         -- MinHash signature (uint64 array) of the title + summary
+);
+
+CREATE TABLE IF NOT EXISTS content_lsh (
+    bucket INTEGER NOT NULL,        -- band number and hash of that band of the signature
+    id     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_content_lsh_bucket ON content_lsh(bucket);
+
+CREATE TABLE IF NOT EXISTS collection_state (
+    source          TEXT NOT NULL,
+    query           TEXT NOT NULL,
+    high_water_mark TEXT,
+    updated_at      TEXT,
+    PRIMARY KEY (source, query)
+);
+
+CREATE TABLE IF NOT EXISTS sentiment_cache (
+    text_hash TEXT NOT NULL,
+    scorer    TEXT NOT NULL,
+    score     REAL NOT NULL,
+    PRIMARY KEY (text_hash, scorer)
+);
+
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key        TEXT PRIMARY KEY,    -- hash of the rendered prompt, model and temperature
+    namespace  TEXT NOT NULL,       -- hash of the template, model, temperature and non-keyword variables
+    keywords   TEXT,                -- JSON list of normalized keywords, for semantic lookups
+    response   TEXT NOT NULL,
+    size       INTEGER NOT NULL,    -- bytes of prompt + response
+    created_at REAL NOT NULL,
+    last_used  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_namespace ON llm_cache(namespace);
+
+CREATE TABLE IF NOT EXISTS llm_calls (
+    called_at         TEXT NOT NULL,
+    stage             TEXT NOT NULL,    -- topics, brief, draft, polish, ...
+    model             TEXT NOT NULL,
+    prompt_tokens     INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    cached            INTEGER NOT NULL, -- 1 if served from llm_cache (no tokens spent)
+    seconds           REAL
+);
+"""
+
+
+def url_hash(url: str) -> str:
+    """Primary key of a content row."""
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def to_iso(value) -> Optional[str]:
+    """Normalize a timestamp to the ISO-8601 UTC string stored in the database."""
+    ts = pd.to_datetime(value, errors="coerce", utc=True)
+    if pd.isna(ts):
+        return None
+    return ts.isoformat()
+
+
+def _migrate_legacy_content(conn: sqlite3.Connection) -> None:
+    # Tables written by DataFrame.to_sql have no id column: rebuild them with the typed schema
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(content)")]
+    if not columns or "id" in columns:
+        return
+
+    legacy = pd.read_sql_query("SELECT * FROM content", conn)
+    conn.execute("DROP TABLE content")
+    conn.executescript(SCHEMA)
+
+    legacy = legacy.dropna(subset=["title", "url"]).drop_duplicates(subset=["url"], keep="last")
+    rows = [
+        (url_hash(url), title, url, to_iso(published), source, None, None, None)
+        for title, url, published, source in zip(legacy["title"], legacy["url"], legacy["publishedAt"], legacy["source"])
+    ]
+    conn.executemany(f"INSERT INTO content VALUES ({', '.join('?' * len(CONTENT_COLUMNS))})", rows)
+
+
+def _add_missing_columns(conn: sqlite3.Connection, table: str, columns: dict) -> None:
+    # Columns added to an existing table after it was first created
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if not existing:
+        return
+    for name, sql_type in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}")
+
+
+def get_connection(db_path: Optional[Path] = None) -> sqlite3.Connection:
+    """
+    Open the content database, creating/migrating the schema if needed.
+
+    Args:
+        db_path (Path): Database file. Defaults to data/content_data.db
+
+    Returns:
+        sqlite3.Connection: Connection in WAL journal mode
+    """
+    db_path = Path(db_path or DB_PATH)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    # WAL lets the analyzer read while a collection run is writing
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+
+    with conn:
+        _migrate_legacy_content(conn)
+        _add_missing_columns(conn, "analysis", ANALYSIS_COLUMNS)
+        _add_missing_columns(conn, "analysis_runs", ANALYSIS_RUN_COLUMNS)
+        conn.executescript(SCHEMA)
+
+    return conn
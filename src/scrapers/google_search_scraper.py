@@ -1,9 +1,11 @@
 import os
-import requests
 import pandas as pd
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 
+from src.utils.http_cache import cached_get
+from src.utils.outbound import json_body
+
 load_dotenv()
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
@@ -32,8 +34,9 @@ def fetch_google_search_results(query: str, max_results: int = 10):
 
     results = []
     
-    response = requests.get(url, params=params)
-    items = response.json()
+    response = cached_get(url, params=params, source="google_search")
+    # Error pages (quota exceeded, bad key) aren't always JSON: raise a readable error instead
+    items = json_body(response, "Google Search")
 
     now = pd.to_datetime(datetime.now(timezone.utc)).floor("s")
     
@@ -1,28 +1,63 @@
 import requests
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
-def fetch_top_hackernews_posts(max_results: int = 10):
+from src.utils.http_cache import cached_get
+from src.utils.outbound import OutboundError, json_body
+
+BASE_URL = "https://hacker-news.firebaseio.com/v0"
+HEADERS = {"User-Agent": "ContentMarketingAgent/0.1"}
+
+# Story lists exposed by the API (each returns up to 500 IDs)
+STORY_LISTS = {
+    "top": "topstories",
+    "new": "newstories",
+    "best": "beststories",
+}
+
+DEFAULT_MAX_WORKERS = 16
+
+# Shared keep-alive session so item requests reuse pooled TCP/TLS connections
+session = requests.Session()
+session.headers.update(HEADERS)
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=DEFAULT_MAX_WORKERS * 2))
+
+
+def _fetch_item(story_id: int):
+    try:
+        response = cached_get(f"{BASE_URL}/item/{story_id}.json", source="hackernews_item", session=session)
+        return json_body(response, "Hacker News")
+    except (requests.RequestException, OutboundError):
+        return None
+
+
+def fetch_top_hackernews_posts(max_results: int = 10, list_name: str = "top", max_workers: int = DEFAULT_MAX_WORKERS):
     """
     Fetch top Hacker News posts using the public API.
 
     Args:
-        limit (int): Number of posts to fetch (max 500)
+        max_results (int): Number of posts to fetch (max 500)
+        list_name (str): Story list to read: "top", "new" or "best"
+        max_workers (int): Max number of item requests in flight at once
 
     Returns:
-        List[Dict]: List of post dictionaries with title, url, and publishedAt
+        pd.DataFrame: Posts with title, url, publishedAt and source
     """
-    
-    base = "https://hacker-news.firebaseio.com/v0"
-    headers = {"User-Agent": "ContentMarketingAgent/0.1"}
-    
-    response = requests.get(f"{base}/topstories.json", headers=headers)
-    top_stories = response.json()[:max_results]
 
-    stories = []
+    if list_name not in STORY_LISTS:
+        raise ValueError(f"Unknown Hacker News list '{list_name}'. Expected one of {list(STORY_LISTS)}")
 
-    for story_id in top_stories:
-        story = requests.get(f"{base}/item/{story_id}.json").json()
+    response = cached_get(f"{BASE_URL}/{STORY_LISTS[list_name]}.json", source="hackernews_list", session=session)
+    story_ids = json_body(response, "Hacker News")[:max_results]
+
+    # Fetch items concurrently; map() keeps the list's ranking order
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(story_ids) or 1))) as executor:
+        items = list(executor.map(_fetch_item, story_ids))
+
+    stories = []
 
+    for story in items:
         if story and "title" in story:
             published_at = pd.to_datetime(story.get("time", 0), unit="s", utc=True)
             stories.append(
@@ -35,4 +70,4 @@ def fetch_top_hackernews_posts(max_results: int = 10):
                 }
             )
 
-    return pd.DataFrame(stories)
\ No newline at end of file
+    return pd.DataFrame(stories)
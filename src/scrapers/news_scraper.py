@@ -1,21 +1,24 @@
 # src/scrapers/news_scraper.py
 
 import os
-import requests
 import pandas as pd
 from dotenv import load_dotenv
 
+from src.utils.http_cache import cached_get
+from src.utils.outbound import json_body
+
 # Load API key
 load_dotenv()
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 
-def fetch_news_articles(query: str, max_results: int = 10):
+def fetch_news_articles(query: str, max_results: int = 10, published_after=None):
     """
     Fetch news articles matching the query using NewsAPI.
 
     Args:
         query (str): Search term
         max_results (int): Number of articles to return
+        published_after (str | datetime): Only return articles published after this time
 
     Returns:
         pd.DataFrame: DataFrame with title, url, publishedAt, and source
@@ -31,11 +34,14 @@ def fetch_news_articles(query: str, max_results: int = 10):
         "pageSize": max_results
     }
 
+    if published_after is not None:
+        params["from"] = pd.Timestamp(published_after).strftime("%Y-%m-%dT%H:%M:%S")
+
     results = []
 
-    response = requests.get(url, params=params)
+    response = cached_get(url, params=params, source="newsapi")
 
-    articles = response.json().get("articles", [])
+    articles = json_body(response, "NewsAPI").get("articles", [])
 
     for article in articles:
         published_at = pd.to_datetime(article.get("publishedAt", ""), errors="coerce", utc=True)
@@ -6,6 +6,8 @@ import praw
 from typing import List, Dict
 import pandas as pd
 
+from src.utils import outbound
+
 # Load Reddit credentials
 load_dotenv()
 REDDIT_CLIENT_ID = os.getenv("REDDIT_CLIENT_ID")
@@ -34,7 +36,10 @@ def fetch_reddit_posts(subreddit: str, query: str, max_results: int = 10) -> Lis
     subreddit = reddit.subreddit(subreddit)
     posts = []
 
-    for submission in subreddit.search(query, limit=max_results, sort="relevance"):
+    # PRAW pages lazily, so the whole search runs inside the scheduler (rate limit, retries, breaker)
+    submissions = outbound.call("reddit", lambda: list(subreddit.search(query, limit=max_results, sort="relevance")))
+
+    for submission in submissions:
         created_at = pd.to_datetime((submission.created_utc), unit="s", utc=True)
         posts.append({
             "title": submission.title,
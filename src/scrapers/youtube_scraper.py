@@ -1,14 +1,16 @@
 # src/scrapers/youtube_scraper.py
 
 import os
-import requests
 import pandas as pd
 from dotenv import load_dotenv
 
+from src.utils.http_cache import cached_get
+from src.utils.outbound import json_body
+
 load_dotenv()
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
-def fetch_youtube_videos(query: str, max_results: int = 10):
+def fetch_youtube_videos(query: str, max_results: int = 10, published_after=None):
     """
     Search YouTube for videos matching the query.
     Use the YouTube Data API v3 to search for videos related to a keyword or topic, and return structured metadata (title, URL, published date, etc.) in a DataFrame.
@@ -16,6 +18,7 @@ def fetch_youtube_videos(query: str, max_results: int = 10):
     Args:
         query (str): Search term
         max_results (int): Number of results to fetch
+        published_after (str | datetime): Only return videos published after this time
 
     Returns:
         pd.DataFrame: DataFrame with title, url, publishedAt, and source
@@ -31,10 +34,13 @@ def fetch_youtube_videos(query: str, max_results: int = 10):
         'maxResults': max_results
     }
 
+    if published_after is not None:
+        params['publishedAfter'] = pd.Timestamp(published_after).strftime("%Y-%m-%dT%H:%M:%SZ")
+
     videos = []
 
-    response = requests.get(url, params=params)
-    items = response.json().get("items", [])
+    response = cached_get(url, params=params, source="youtube")
+    items = json_body(response, "YouTube").get("items", [])
     
     for item in items:
         published_at = pd.to_datetime(item["snippet"]["publishedAt"], errors="coerce", utc=True)
@@ -0,0 +1,229 @@
+# src/utils/http_cache.py
+
+"""
+Persistent on-disk HTTP response cache shared by the scrapers.
+
+Responses are stored in a SQLite file keyed on endpoint + normalized query params.
+Each source has its own TTL; stale entries are revalidated with ETag / Last-Modified
+conditional requests, and the file is kept under a size budget with LRU eviction.
+Network requests go through the outbound scheduler (rate limits, retries, circuit breaker).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+import requests
+
+from src.utils import outbound
+
+ROOT = Path(__file__).resolve().parents[2]
+CACHE_PATH = Path(os.getenv("HTTP_CACHE_PATH", ROOT / "data" / "http_cache.db"))
+MAX_CACHE_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+CACHE_DISABLED = os.getenv("HTTP_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+# Seconds a cached response is served without revalidation
+SOURCE_TTLS = {
+    "google_search": 6 * 3600,
+    "youtube": 6 * 3600,
+    "newsapi": 3600,
+    "hackernews_list": 300,
+    "hackernews_item": 24 * 3600,
+    "rss": 1800,
+}
+DEFAULT_TTL = 3600
+
+# Rate-limit provider (see outbound) per source, when it isn't the source name itself
+SOURCE_PROVIDERS = {
+    "hackernews_list": "hackernews",
+    "hackernews_item": "hackernews",
+}
+
+# Credentials are left out of the cache key so rotating a key doesn't invalidate the cache
+CREDENTIAL_PARAMS = {"key", "apikey", "api_key", "access_token"}
+
+_write_lock = threading.Lock()
+_initialized = False
+
+
+class CachedResponse:
+    """Minimal response object returned by cached_get (cache hits and misses alike)."""
+
+    def __init__(self, status_code: int, content: bytes, headers: Dict, from_cache: bool = False):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = from_cache
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def _connect() -> sqlite3.Connection:
+    global _initialized
+    if not _initialized:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(CACHE_PATH, timeout=30)
+    if not _initialized:
+        with _write_lock:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    cache_key     TEXT PRIMARY KEY,
+                    url           TEXT NOT NULL,
+                    source        TEXT NOT NULL,
+                    status_code   INTEGER NOT NULL,
+                    body          BLOB NOT NULL,
+                    headers       TEXT NOT NULL,
+                    etag          TEXT,
+                    last_modified TEXT,
+                    fetched_at    REAL NOT NULL,
+                    accessed_at   REAL NOT NULL,
+                    size          INTEGER NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+            conn.commit()
+            _initialized = True
+    return conn
+
+
+def make_cache_key(url: str, params: Optional[Dict] = None) -> str:
+    """Hash of the endpoint and its sorted, credential-free query params."""
+    items = sorted(
+        (str(k), str(v)) for k, v in (params or {}).items()
+        if v is not None and str(k).lower() not in CREDENTIAL_PARAMS
+    )
+    return hashlib.sha256(f"{url}?{urlencode(items)}".encode("utf-8")).hexdigest()
+
+
+def _evict(conn: sqlite3.Connection, max_bytes: int) -> None:
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    if total <= max_bytes:
+        return
+
+    # Drop least recently used entries until we are back under budget
+    to_delete = []
+    for cache_key, size in conn.execute("SELECT cache_key, size FROM responses ORDER BY accessed_at"):
+        to_delete.append((cache_key,))
+        total -= size
+        if total <= max_bytes:
+            break
+    conn.executemany("DELETE FROM responses WHERE cache_key = ?", to_delete)
+
+
+def _store(conn: sqlite3.Connection, cache_key: str, url: str, source: str, response: requests.Response) -> None:
+    now = time.time()
+    headers = {k: v for k, v in response.headers.items() if k.lower() in ("content-type", "etag", "last-modified")}
+    with _write_lock:
+        conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (cache_key, url, source, response.status_code, response.content, json.dumps(headers),
+             response.headers.get("ETag"), response.headers.get("Last-Modified"),
+             now, now, len(response.content)),
+        )
+        _evict(conn, MAX_CACHE_BYTES)
+        conn.commit()
+
+
+def cached_get(url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None, source: str = "default",
+               ttl: Optional[int] = None, session: Optional[requests.Session] = None,
+               timeout: float = 10) -> CachedResponse:
+    """
+    GET a URL through the on-disk cache.
+
+    Args:
+        url (str): Endpoint URL
+        params (Dict): Query params (credentials are excluded from the cache key)
+        headers (Dict): Extra request headers
+        source (str): Source name used to pick the TTL from SOURCE_TTLS
+        ttl (int): Override TTL in seconds. 0 bypasses the cache.
+        session (requests.Session): Optional session to send the request with
+        timeout (float): Request timeout in seconds
+
+    Returns:
+        CachedResponse: Response with status_code, content, headers, json() and from_cache
+    """
+
+    http = session or requests
+    ttl = SOURCE_TTLS.get(source, DEFAULT_TTL) if ttl is None else ttl
+
+    def _get(request_headers):
+        return outbound.call(SOURCE_PROVIDERS.get(source, source), http.get, url, params=params,
+                             headers=request_headers, timeout=timeout)
+
+    if CACHE_DISABLED or ttl <= 0:
+        response = _get(headers)
+        return CachedResponse(response.status_code, response.content, dict(response.headers))
+
+    cache_key = make_cache_key(url, params)
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT status_code, body, headers, etag, last_modified, fetched_at FROM responses WHERE cache_key = ?",
+            (cache_key,),
+        ).fetchone()
+
+        if row is not None:
+            status_code, body, cached_headers, etag, last_modified, fetched_at = row
+            cached = CachedResponse(status_code, body, json.loads(cached_headers), from_cache=True)
+
+            if time.time() - fetched_at < ttl:
+                with _write_lock:
+                    conn.execute("UPDATE responses SET accessed_at = ? WHERE cache_key = ?", (time.time(), cache_key))
+                    conn.commit()
+                return cached
+
+            # Stale: revalidate with a conditional request
+            headers = dict(headers or {})
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        response = _get(headers)
+
+        if response.status_code == 304 and row is not None:
+            now = time.time()
+            with _write_lock:
+                conn.execute("UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE cache_key = ?",
+                             (now, now, cache_key))
+                conn.commit()
+            return cached
+
+        # Only successful responses are cached; errors are passed straight through
+        if response.status_code == 200:
+            _store(conn, cache_key, url, source, response)
+
+        return CachedResponse(response.status_code, response.content, dict(response.headers))
+    finally:
+        conn.close()
+
+
+def clear_cache(source: Optional[str] = None) -> int:
+    """Delete cached responses (for one source, or all). Returns the number of rows removed."""
+    conn = _connect()
+    try:
+        with _write_lock:
+            if source:
+                cursor = conn.execute("DELETE FROM responses WHERE source = ?", (source,))
+            else:
+                cursor = conn.execute("DELETE FROM responses")
+            conn.commit()
+        return cursor.rowcount
+    finally:
+        conn.close()
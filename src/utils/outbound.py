@@ -0,0 +1,368 @@
+# src/utils/outbound.py
+
+"""
+Shared scheduler for outbound API calls (scrapers and LLM agents).
+
+Every call to an external provider goes through three layers:
+
+- A token bucket per provider, filled at the provider's configured quota. Callers
+  reserve a token and sleep until it is due, so requests are spread evenly at the
+  allowed rate instead of bursting into 429s.
+- Retries with exponential backoff and full jitter on 429, 5xx and connection errors.
+  A Retry-After header is honoured as the minimum wait, and a 429 also pushes back the
+  provider's token bucket so concurrent callers slow down together.
+- A circuit breaker per provider: after CIRCUIT_FAILURES consecutive failed calls (each
+  counted once, after its retries are exhausted) the provider is skipped (CircuitOpenError)
+  for CIRCUIT_COOLDOWN seconds, then a single trial call decides whether it closes again.
+  Throttling never trips the breaker, and calls already retrying are not cut short by it.
+
+Quotas are set per provider with RATE_LIMIT_<PROVIDER> (e.g. RATE_LIMIT_YOUTUBE=5/s,
+RATE_LIMIT_OPENAI=500/min) and may carry a burst size (RATE_LIMIT_RSS=10/s:20).
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Default quotas: "<requests>/<s|min|h|day>[:<burst>]"
+DEFAULT_RATE_LIMITS = {
+    "openai": "500/min:20",
+    "google_search": "100/min:5",
+    "youtube": "5/s:10",
+    "newsapi": "1/s:5",
+    "hackernews": "20/s:20",
+    "rss": "10/s:10",
+    "reddit": "60/min:5",
+}
+DEFAULT_RATE_LIMIT = "5/s:5"
+
+OUTBOUND_MAX_RETRIES = int(os.getenv("OUTBOUND_MAX_RETRIES", 4))
+BACKOFF_BASE = float(os.getenv("OUTBOUND_BACKOFF_BASE", 1.0))
+BACKOFF_MAX = float(os.getenv("OUTBOUND_BACKOFF_MAX", 60))
+# Longest a caller waits for a rate-limit token before giving up
+MAX_QUEUE_WAIT = float(os.getenv("OUTBOUND_MAX_QUEUE_WAIT", 300))
+
+CIRCUIT_FAILURES = int(os.getenv("CIRCUIT_FAILURES", 5))
+CIRCUIT_COOLDOWN = float(os.getenv("CIRCUIT_COOLDOWN", 30))
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+# Transport errors (requests, httpx, openai, prawcore) that are worth retrying
+RETRYABLE_ERRORS = {
+    "ConnectionError", "Timeout", "ConnectTimeout", "ReadTimeout", "ChunkedEncodingError",
+    "ConnectError", "ReadError", "RemoteProtocolError", "PoolTimeout",
+    "APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError",
+    "TooManyRequests", "ServerError", "RequestException",
+}
+# Errors meaning "slow down" rather than "the provider is down"
+THROTTLE_ERRORS = {"RateLimitError", "TooManyRequests"}
+
+_PERIODS = {"s": 1, "sec": 1, "min": 60, "h": 3600, "hour": 3600, "day": 86400}
+
+
+class OutboundError(Exception):
+    """A provider call failed (non-retryable status, or retries exhausted)."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(OutboundError):
+    """The provider failed repeatedly and is being skipped until its cooldown ends."""
+
+
+class RateLimitTimeout(OutboundError):
+    """No rate-limit token would become available within the allowed wait."""
+
+
+def parse_rate(spec: str):
+    """'500/min:20' -> (tokens per second, burst capacity)."""
+    rate, _, burst = spec.partition(":")
+    count, _, period = rate.partition("/")
+    per_second = float(count) / _PERIODS[period.strip().lower() or "s"]
+    return per_second, max(1.0, float(burst) if burst else 1.0)
+
+
+class TokenBucket:
+    """Thread-safe token bucket. Tokens are reserved up front, so waiting callers are served in order."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, max_wait: float = MAX_QUEUE_WAIT) -> float:
+        """Take a token and return how long to wait before using it."""
+        with self.lock:
+            self._refill()
+            wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+            if wait > max_wait:
+                raise RateLimitTimeout(f"Rate limit token not available for {wait:.0f}s")
+            self.tokens -= 1
+            return wait
+
+    def penalize(self, seconds: float) -> None:
+        """Push every caller back after the provider asked us to slow down (Retry-After / 429)."""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open trial call."""
+
+    def __init__(self, failures: int = CIRCUIT_FAILURES, cooldown: float = CIRCUIT_COOLDOWN):
+        self.max_failures = failures
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def before_call(self, provider: str) -> bool:
+        """Admit a new call, or raise CircuitOpenError. Returns True if it is the half-open trial call."""
+        with self.lock:
+            state = self.state
+            if state == "open" or (state == "half-open" and self.trial_running):
+                remaining = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+                raise CircuitOpenError(f"{provider} is failing; skipping calls for another {remaining:.0f}s")
+            self.trial_running = state == "half-open"
+            return self.trial_running
+
+    def record(self, success: Optional[bool], trial: bool = False) -> None:
+        """Record the outcome of a call: True, False, or None for neither (e.g. throttled)."""
+        with self.lock:
+            if trial:
+                self.trial_running = False
+            if success is None:
+                return
+            if success:
+                self.failures, self.opened_at = 0, None
+                return
+            self.failures += 1
+            if self.failures >= self.max_failures or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+
+_lock = threading.Lock()
+_buckets: Dict[str, TokenBucket] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+_stats: Dict[str, Dict[str, float]] = {}
+
+
+def _provider_state(provider: str):
+    with _lock:
+        if provider not in _buckets:
+            spec = os.getenv(f"RATE_LIMIT_{provider.upper()}", DEFAULT_RATE_LIMITS.get(provider, DEFAULT_RATE_LIMIT))
+            _buckets[provider] = TokenBucket(*parse_rate(spec))
+            _breakers[provider] = CircuitBreaker()
+            _stats[provider] = {"calls": 0, "retries": 0, "failures": 0, "throttled_seconds": 0.0}
+        return _buckets[provider], _breakers[provider], _stats[provider]
+
+
+def stats() -> Dict[str, Dict]:
+    """Calls, retries, failures, seconds spent waiting for tokens and breaker state per provider."""
+    with _lock:
+        return {provider: {**values, "circuit": _breakers[provider].state} for provider, values in _stats.items()}
+
+
+def _status_and_headers(result=None, error: Optional[BaseException] = None):
+    # Works for requests/httpx responses, CachedResponse, and openai/prawcore/requests exceptions
+    source = result if error is None else getattr(error, "response", None)
+    status = getattr(source, "status_code", None) or getattr(error, "status_code", None)
+    headers = getattr(source, "headers", None) or {}
+    return status, headers
+
+
+def retry_after(headers) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), if present."""
+    value = (headers.get("Retry-After") or headers.get("retry-after")) if headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def _is_retryable(status: Optional[int], error: Optional[BaseException]) -> bool:
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return error is not None and type(error).__name__ in RETRYABLE_ERRORS
+
+
+def _backoff(attempt: int, hinted: Optional[float]) -> float:
+    # Full jitter, never shorter than what the server asked for
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    return max(delay, hinted or 0.0)
+
+
+def _is_throttled(status: Optional[int], error: Optional[BaseException]) -> bool:
+    if status is not None:
+        return status == 429
+    return error is not None and type(error).__name__ in THROTTLE_ERRORS
+
+
+def _outcome(provider: str, result, error: Optional[BaseException]):
+    """(retryable, throttled, wait hint, final error) for one attempt."""
+    status, headers = _status_and_headers(result, error)
+    if error is None and (status is None or status < 400):
+        return False, False, None, None
+    retryable = _is_retryable(status, error)
+    if error is not None:
+        final = error
+    else:
+        body = getattr(result, "text", "")[:200].strip()
+        final = OutboundError(f"{provider} returned HTTP {status}" + (f": {body}" if body else ""), status)
+    return retryable, _is_throttled(status, error), retry_after(headers), final
+
+
+def _settle(provider: str, bucket: TokenBucket, breaker: CircuitBreaker, stat: Dict, trial: bool,
+            attempt: int, retries: int, result, error: Optional[BaseException]) -> Optional[float]:
+    """Record an attempt; return the delay before the next one, or None if the caller should stop."""
+    retryable, throttled, hinted, final = _outcome(provider, result, error)
+    if final is None:
+        breaker.record(True, trial)
+        return None
+
+    if not retryable or attempt >= retries:
+        # The breaker sees one outcome per call. 4xx other than throttling means the request itself is
+        # wrong, not that the provider is down; throttling only slows the bucket down.
+        breaker.record(None if throttled else not retryable, trial)
+        stat["failures"] += 1
+        if final is error:
+            raise error
+        if retryable:
+            raise OutboundError(f"{final} (gave up after {attempt + 1} attempts)", final.status_code)
+        return None  # non-retryable HTTP status: hand the response back to the caller
+
+    stat["retries"] += 1
+    delay = _backoff(attempt, hinted)
+    print(f"{provider}: {final} - retrying in {delay:.1f}s (attempt {attempt + 2}/{retries + 1})")
+    if throttled or hinted:
+        # The wait is taken through the bucket, so every caller of this provider backs off with us
+        bucket.penalize(delay)
+        return 0.0
+    return delay
+
+
+def call(provider: str, func: Callable, *args, retries: Optional[int] = None, max_wait: float = MAX_QUEUE_WAIT, **kwargs):
+    """
+    Call func(*args, **kwargs) under the provider's rate limit, retry policy and circuit breaker.
+
+    func may return an HTTP response (429/5xx responses are retried; other error responses are
+    returned for the caller to handle) or raise (transport and throttling errors are retried).
+
+    Args:
+        provider (str): Provider name, e.g. "openai", "youtube"
+        func (Callable): The call to make
+        retries (int): Extra attempts on retryable failures (default OUTBOUND_MAX_RETRIES)
+        max_wait (float): Longest to wait for a rate-limit token
+
+    Returns:
+        Whatever func returns
+
+    Raises:
+        CircuitOpenError: If the provider's circuit is open
+        RateLimitTimeout: If no token is available within max_wait
+        OutboundError: If a retryable HTTP status persists after all retries
+    """
+    bucket, breaker, stat = _provider_state(provider)
+    retries = OUTBOUND_MAX_RETRIES if retries is None else retries
+
+    # Only a new call is checked against the breaker; one that is already retrying runs to completion
+    trial = breaker.before_call(provider)
+    for attempt in range(retries + 1):
+        try:
+            wait = bucket.reserve(max_wait)
+        except RateLimitTimeout:
+            breaker.record(None, trial)
+            raise
+        if wait:
+            stat["throttled_seconds"] += wait
+            time.sleep(wait)
+        stat["calls"] += 1
+
+        result, error = None, None
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            error = e
+
+        delay = _settle(provider, bucket, breaker, stat, trial, attempt, retries, result, error)
+        if delay is None:
+            return result
+        time.sleep(delay)
+
+
+async def acall(provider: str, func: Callable[[], Awaitable], retries: Optional[int] = None,
+                max_wait: float = MAX_QUEUE_WAIT):
+    """Async version of call: func is a zero-argument function returning a coroutine."""
+    bucket, breaker, stat = _provider_state(provider)
+    retries = OUTBOUND_MAX_RETRIES if retries is None else retries
+
+    # Only a new call is checked against the breaker; one that is already retrying runs to completion
+    trial = breaker.before_call(provider)
+    for attempt in range(retries + 1):
+        try:
+            wait = bucket.reserve(max_wait)
+        except RateLimitTimeout:
+            breaker.record(None, trial)
+            raise
+        if wait:
+            stat["throttled_seconds"] += wait
+            await asyncio.sleep(wait)
+        stat["calls"] += 1
+
+        result, error = None, None
+        try:
+            result = await func()
+        except Exception as e:
+            error = e
+
+        delay = _settle(provider, bucket, breaker, stat, trial, attempt, retries, result, error)
+        if delay is None:
+            return result
+        await asyncio.sleep(delay)
+
+
+def raise_for_status(response, provider: str) -> None:
+    """Raise OutboundError for an error response (after the scheduler's retries), with a snippet of its body."""
+    if not response.ok:
+        body = response.text[:200].strip()
+        raise OutboundError(f"{provider} returned HTTP {response.status_code}" + (f": {body}" if body else ""),
+                            response.status_code)
+
+
+def json_body(response, provider: str):
+    """Parse a response's JSON, raising OutboundError (not a JSONDecodeError) on error or non-JSON bodies."""
+    raise_for_status(response, provider)
+    try:
+        return response.json()
+    except ValueError:
+        raise OutboundError(f"{provider} returned a non-JSON response: {response.text[:200]}",
+                            response.status_code) from None
@@ -0,0 +1,161 @@
+# src/utils/resources.py
+
+"""
+Lazily provisioned NLTK resources and an import-time benchmark.
+
+NLTK corpora are no longer downloaded when modules are imported. They are
+provisioned once with the setup command and only checked on first use:
+
+    python -m src.utils.resources setup        # download all NLTK data
+    python -m src.utils.resources check        # report what is missing
+    python -m src.utils.resources benchmark    # measure cold-start import time
+"""
+
+import argparse
+import csv
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+ROOT = Path(__file__).resolve().parents[2]
+BENCHMARK_LOG = ROOT / "data" / "benchmarks" / "import_times.csv"
+
+# Resource name -> path checked with nltk.data.find
+NLTK_RESOURCES = {
+    "punkt": "tokenizers/punkt",
+    "punkt_tab": "tokenizers/punkt_tab",
+    "stopwords": "corpora/stopwords",
+    "vader_lexicon": "sentiment/vader_lexicon.zip",
+}
+
+# Download missing resources on first use instead of failing (needs network)
+NLTK_AUTO_DOWNLOAD = os.getenv("NLTK_AUTO_DOWNLOAD", "").lower() in ("1", "true", "yes")
+
+# Modules whose import time the benchmark tracks
+BENCHMARK_MODULES = [
+    "src.analyzers.trend_sentiment_analyzer",
+    "src.app.tabs.analyze_tab",
+]
+
+_available = set()
+_lock = threading.Lock()
+
+
+def is_available(name: str) -> bool:
+    import nltk
+    try:
+        nltk.data.find(NLTK_RESOURCES[name])
+        return True
+    except LookupError:
+        return False
+
+
+def require_nltk(*names: str) -> None:
+    """
+    Make sure NLTK resources are present before first use (checked once per process).
+
+    Raises:
+        LookupError: If a resource is missing and NLTK_AUTO_DOWNLOAD is not set
+    """
+    missing = [name for name in names if name not in _available]
+    if not missing:
+        return
+
+    with _lock:
+        for name in missing:
+            if is_available(name):
+                _available.add(name)
+                continue
+            if NLTK_AUTO_DOWNLOAD:
+                import nltk
+                nltk.download(name, quiet=True)
+                _available.add(name)
+                continue
+            raise LookupError(
+                f"NLTK resource '{name}' is not installed. "
+                f"Run `python -m src.utils.resources setup` once to download the NLTK data."
+            )
+
+
+def setup_nltk(names: Optional[Iterable[str]] = None) -> Dict[str, bool]:
+    """Download any missing NLTK resources. Returns name -> available after setup."""
+    import nltk
+    status = {}
+    for name in names or NLTK_RESOURCES:
+        if not is_available(name):
+            print(f"Downloading NLTK resource '{name}'...")
+            nltk.download(name, quiet=True)
+        status[name] = is_available(name)
+    return status
+
+
+def benchmark_imports(modules: List[str] = BENCHMARK_MODULES, repeats: int = 5,
+                      log_path: Optional[Path] = BENCHMARK_LOG) -> Dict[str, float]:
+    """
+    Median cold-start import time per module, each measured in a fresh interpreter.
+
+    Args:
+        modules (List[str]): Dotted module names
+        repeats (int): Fresh interpreters per module
+        log_path (Path): CSV to append results to, so latency can be tracked over time (None = don't log)
+
+    Returns:
+        Dict[str, float]: Module -> median seconds
+    """
+    code = "import importlib, sys, time; t = time.perf_counter(); importlib.import_module(sys.argv[1]); print(time.perf_counter() - t)"
+    results = {}
+    for module in modules:
+        timings = []
+        for _ in range(repeats):
+            output = subprocess.run(
+                [sys.executable, "-c", code, module], cwd=ROOT, capture_output=True, text=True, check=True
+            ).stdout
+            timings.append(float(output.strip().splitlines()[-1]))
+        results[module] = statistics.median(timings)
+
+    if log_path is not None:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        new_file = not log_path.exists()
+        with open(log_path, "a", newline="") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(["timestamp", "module", "median_seconds", "repeats"])
+            now = time.strftime("%Y-%m-%dT%H:%M:%S")
+            for module, seconds in results.items():
+                writer.writerow([now, module, f"{seconds:.4f}", repeats])
+
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Provision NLTK data and benchmark cold-start imports.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("setup", help="Download all NLTK resources")
+    subparsers.add_parser("check", help="List missing NLTK resources")
+    bench = subparsers.add_parser("benchmark", help="Measure module import time in fresh interpreters")
+    bench.add_argument("--repeats", type=int, default=5)
+    bench.add_argument("--max-seconds", type=float, default=None, help="Exit non-zero if any module is slower")
+    bench.add_argument("modules", nargs="*", default=BENCHMARK_MODULES)
+    args = parser.parse_args(argv)
+
+    if args.command in ("setup", "check"):
+        status = setup_nltk() if args.command == "setup" else {name: is_available(name) for name in NLTK_RESOURCES}
+        for name, available in status.items():
+            print(f"{'✅' if available else '❌'} {name}")
+        return 0 if all(status.values()) else 1
+
+    results = benchmark_imports(args.modules, repeats=args.repeats)
+    for module, seconds in results.items():
+        print(f"{module}: {seconds * 1000:.0f} ms")
+    if args.max_seconds is not None and any(seconds > args.max_seconds for seconds in results.values()):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
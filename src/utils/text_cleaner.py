@@ -0,0 +1,105 @@
+# src/utils/text_cleaner.py
+
+"""
+Text normalization and cleaning helpers shared by the analyzers and caches.
+"""
+
+import hashlib
+import re
+import string
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+import pandas as pd
+
+_whitespace = re.compile(r"\s+")
+
+
+def normalize_text(text) -> str:
+    """Lowercase and collapse whitespace so trivially different copies of a text compare equal."""
+    if not isinstance(text, str):
+        return ""
+    return _whitespace.sub(" ", text).strip().lower()
+
+
+def text_hash(text) -> str:
+    """Stable key for a text: sha1 of its normalized form."""
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+# --- Fast title cleaning ---
+# Produces the same output as lowercase -> strip punctuation -> nltk.word_tokenize -> drop stopwords,
+# without running the Punkt / Treebank machinery once per title.
+
+_PUNCTUATION = re.compile(f"[{re.escape(string.punctuation)}]+")
+
+# Once ASCII punctuation is gone, the only things word_tokenize still splits off are
+# unicode quotes/dashes and a few fused contractions ("cannot" -> "can not")
+_SPLIT_CHARS = "«“‘„»”’\u2012\u2013\u2014\u2015"
+_CONTRACTIONS = re.compile(r"\b(?=[cglw])(?:(can)(not)|(gim)(me)|(gon)(na)|(got)(ta)|(lem)(me)|(wan)(na)(?=\s))\b")
+
+# Texts are cleaned as one joined string; the separator is whitespace-padded so it acts as a word boundary
+_SEPARATOR = "\x00"
+
+CLEAN_CHUNK_SIZE = 50000
+
+
+@lru_cache(maxsize=None)
+def get_stop_words(language: str = "english") -> frozenset:
+    from nltk.corpus import stopwords
+    from src.utils.resources import require_nltk
+
+    require_nltk("stopwords")
+    return frozenset(stopwords.words(language))
+
+
+def _split_contraction(match) -> str:
+    return " " + " ".join(part for part in match.groups() if part) + " "
+
+
+def _clean_chunk(texts: List, stop_words: frozenset) -> List[str]:
+    texts = [text.replace(_SEPARATOR, "") if isinstance(text, str) else "" for text in texts]
+
+    # One pass of each regex over the whole chunk instead of one per title
+    joined = f" {_SEPARATOR} ".join(texts).lower()
+    joined = _PUNCTUATION.sub("", joined)
+    for char in _SPLIT_CHARS:
+        if char in joined:
+            joined = joined.replace(char, f" {char} ")
+    joined = _CONTRACTIONS.sub(_split_contraction, f" {joined} ")
+
+    return [" ".join([word for word in text.split() if word not in stop_words]) for text in joined.split(_SEPARATOR)]
+
+
+def clean_texts(texts, stop_words: Optional[Iterable[str]] = None, num_workers: int = 1,
+                chunk_size: int = CLEAN_CHUNK_SIZE) -> pd.Series:
+    """
+    Lowercase, strip punctuation, tokenize and drop stopwords for a whole column at once.
+
+    Args:
+        texts (pd.Series | List[str]): Raw texts (non-strings become "")
+        stop_words (Iterable[str]): Stopwords to drop. Defaults to NLTK's English list
+        num_workers (int): Processes to clean with when there is more than one chunk
+        chunk_size (int): Texts per worker task
+
+    Returns:
+        pd.Series: Cleaned texts, aligned with the input index
+    """
+    if not isinstance(texts, pd.Series):
+        texts = pd.Series(list(texts), dtype="object")
+    stop_words = frozenset(stop_words) if stop_words is not None else get_stop_words()
+    values = texts.tolist()
+
+    if not values:
+        return pd.Series([], index=texts.index, dtype="object")
+
+    if num_workers > 1 and len(values) > chunk_size:
+        chunks = [values[start:start + chunk_size] for start in range(0, len(values), chunk_size)]
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            results = executor.map(_clean_chunk, chunks, [stop_words] * len(chunks))
+            cleaned = [text for chunk in results for text in chunk]
+    else:
+        cleaned = _clean_chunk(values, stop_words)
+
+    return pd.Series(cleaned, index=texts.index, dtype="object")
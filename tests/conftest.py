@@ -0,0 +1,8 @@
+# tests/conftest.py
+
+import sys
+from pathlib import Path
+
+# Add the repo root to sys.path so tests can import src.*
+root_dir = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_dir))
@@ -0,0 +1,204 @@
+# tests/test_outbound.py
+
+import pytest
+
+from src.utils import outbound
+
+
+class FakeClock:
+    """Stands in for the time module: sleeping advances the clock instead of blocking."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        self.slept += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None, text="{}"):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+        self.ok = status_code < 400
+
+    def json(self):
+        import json
+        return json.loads(self.text)
+
+
+def responses(*statuses, retry_after=None):
+    """A function returning one FakeResponse per call, with the given statuses in order."""
+    queue = list(statuses)
+
+    def func():
+        status = queue.pop(0)
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None and status == 429 else {}
+        return FakeResponse(status, headers)
+
+    func.remaining = queue
+    return func
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(outbound, "time", clock)
+    monkeypatch.setattr(outbound, "_buckets", {})
+    monkeypatch.setattr(outbound, "_breakers", {})
+    monkeypatch.setattr(outbound, "_stats", {})
+    monkeypatch.setattr(outbound, "BACKOFF_BASE", 0.5)
+    monkeypatch.setenv("RATE_LIMIT_TEST", "100/s:100")
+    return clock
+
+
+def test_parse_rate():
+    assert outbound.parse_rate("500/min:20") == (500 / 60, 20.0)
+    assert outbound.parse_rate("5/s") == (5.0, 1.0)
+    assert outbound.parse_rate("2/h:3") == (2 / 3600, 3.0)
+
+
+def test_token_bucket_paces_after_burst(clock):
+    bucket = outbound.TokenBucket(rate=2.0, capacity=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+    clock.sleep(1.0)
+    assert bucket.reserve() == pytest.approx(0.5)
+
+
+def test_token_bucket_penalize_and_max_wait(clock):
+    bucket = outbound.TokenBucket(rate=1.0, capacity=5)
+    bucket.penalize(3)
+    assert bucket.reserve() == pytest.approx(3.0)
+    with pytest.raises(outbound.RateLimitTimeout):
+        bucket.reserve(max_wait=1)
+
+
+def test_backoff_is_bounded_and_honours_retry_after(monkeypatch):
+    monkeypatch.setattr(outbound, "BACKOFF_BASE", 1.0)
+    monkeypatch.setattr(outbound, "BACKOFF_MAX", 8.0)
+    for attempt in range(10):
+        delay = outbound._backoff(attempt, None)
+        assert 0 <= delay <= min(8.0, 2 ** attempt)
+    assert outbound._backoff(0, 30.0) >= 30.0
+
+
+def test_retry_after_formats():
+    assert outbound.retry_after({"Retry-After": "2.5"}) == 2.5
+    assert outbound.retry_after({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0.0
+    assert outbound.retry_after({}) is None
+
+
+def test_call_retries_429_and_waits_for_retry_after(clock):
+    func = responses(429, 429, 200, retry_after=2)
+    assert outbound.call("test", func).status_code == 200
+    assert clock.slept >= 4
+    assert outbound.stats()["test"]["retries"] == 2
+    assert outbound.stats()["test"]["circuit"] == "closed"
+
+
+def test_throttling_does_not_trip_breaker(clock):
+    # More 429s than CIRCUIT_FAILURES within one call must not open the circuit mid-retry
+    func = responses(*[429] * (outbound.CIRCUIT_FAILURES + 1), 200, retry_after=1)
+    assert outbound.call("test", func, retries=outbound.CIRCUIT_FAILURES + 2).status_code == 200
+
+    for _ in range(outbound.CIRCUIT_FAILURES + 1):
+        with pytest.raises(outbound.OutboundError):
+            outbound.call("test", responses(429, 429, retry_after=1), retries=1)
+    assert outbound.stats()["test"]["circuit"] == "closed"
+    assert outbound.call("test", responses(200)).status_code == 200
+
+
+def test_breaker_counts_one_failure_per_call(clock):
+    for _ in range(outbound.CIRCUIT_FAILURES - 1):
+        with pytest.raises(outbound.OutboundError):
+            outbound.call("test", responses(503, 503, 503), retries=2)
+    assert outbound.stats()["test"]["circuit"] == "closed"
+
+    with pytest.raises(outbound.OutboundError):
+        outbound.call("test", responses(503, 503, 503), retries=2)
+    assert outbound.stats()["test"]["circuit"] == "open"
+
+    func = responses(200)
+    with pytest.raises(outbound.CircuitOpenError):
+        outbound.call("test", func)
+    assert func.remaining == [200]
+
+
+def test_retrying_call_survives_breaker_opening(clock):
+    breaker = outbound._provider_state("test")[1]
+    statuses = [503, 200]
+
+    def func():
+        # Other calls fail meanwhile and open the circuit
+        for _ in range(outbound.CIRCUIT_FAILURES):
+            breaker.record(False)
+        return FakeResponse(statuses.pop(0))
+
+    assert outbound.call("test", func, retries=1).status_code == 200
+    assert outbound.stats()["test"]["circuit"] == "closed"
+
+
+def test_half_open_admits_a_single_trial(clock):
+    breaker = outbound.CircuitBreaker(failures=2, cooldown=10)
+    breaker.record(False)
+    breaker.record(False)
+    assert breaker.state == "open"
+    with pytest.raises(outbound.CircuitOpenError):
+        breaker.before_call("test")
+
+    clock.sleep(10)
+    assert breaker.before_call("test") is True
+    with pytest.raises(outbound.CircuitOpenError):
+        breaker.before_call("test")
+
+    # A failed trial reopens the circuit for another cooldown
+    breaker.record(False, trial=True)
+    assert breaker.state == "open"
+    clock.sleep(10)
+    assert breaker.before_call("test") is True
+    breaker.record(True, trial=True)
+    assert breaker.state == "closed"
+    assert breaker.before_call("test") is False
+
+
+def test_client_errors_are_returned_without_retry(clock):
+    func = responses(404, 200)
+    assert outbound.call("test", func).status_code == 404
+    assert func.remaining == [200]
+    assert outbound.stats()["test"]["circuit"] == "closed"
+
+
+def test_transport_errors_are_retried(clock):
+    class ConnectionError(Exception):
+        pass
+
+    attempts = []
+
+    def func():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("reset")
+        return "ok"
+
+    assert outbound.call("test", func) == "ok"
+    assert len(attempts) == 3
+
+
+def test_json_body_rejects_error_and_non_json_responses():
+    assert outbound.json_body(FakeResponse(200, text='{"a": 1}'), "test") == {"a": 1}
+    with pytest.raises(outbound.OutboundError, match="non-JSON"):
+        outbound.json_body(FakeResponse(200, text="<html>"), "test")
+    with pytest.raises(outbound.OutboundError, match="HTTP 403"):
+        outbound.json_body(FakeResponse(403, text="quota"), "test")
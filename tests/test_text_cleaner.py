@@ -0,0 +1,63 @@
+# tests/test_text_cleaner.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.resources import is_available
+
+# The reference cleaner tokenizes with Punkt; provision the data with `python -m src.utils.resources setup`
+pytestmark = pytest.mark.skipif(
+    not all(is_available(name) for name in ("punkt", "punkt_tab", "stopwords")),
+    reason="NLTK punkt / stopwords data not installed",
+)
+
+ADVERSARIAL_TITLES = [
+    "“Smart” quotes and ‘single’ quotes in AI marketing",
+    "«Guillemets» and „low-high” quotes",
+    "Dashes – en, — em, ‒ figure and ― horizontal bar",
+    "Word–joined—by—dashes",
+    "You cannot ignore SEO; we CANNOT either",
+    "Gimme the data, gonna need it, gotta go, lemme see, wanna know more",
+    "Top 10 tools for 2024: GPT-4o vs. Claude 3.5 (99.9% uptime)",
+    "Don't, won't, isn't: what's next for B2B?",
+    "Trailing ellipsis… and mid…word",
+    "Tabs\tand\nnewlines   and  spaces",
+    "ALL CAPS TITLE WITH THE STOPWORDS",
+    "the a an of",
+    "!!!",
+    "",
+    "   ",
+]
+
+
+def _reference(titles: pd.Series) -> pd.Series:
+    from src.analyzers.trend_sentiment_analyzer import clean_text
+    return titles.apply(clean_text)
+
+
+@pytest.mark.parametrize("title", ADVERSARIAL_TITLES)
+def test_clean_texts_matches_reference(title):
+    from src.utils.text_cleaner import clean_texts
+
+    titles = pd.Series([title], dtype="object")
+    assert clean_texts(titles).tolist() == _reference(titles).tolist()
+
+
+def test_clean_texts_matches_reference_on_a_batch():
+    # Cleaned as one joined string, so neighbouring titles must not bleed into each other
+    from src.analyzers.trend_sentiment_analyzer import find_clean_text_mismatches
+
+    titles = pd.Series(ADVERSARIAL_TITLES * 3, dtype="object")
+    mismatches = find_clean_text_mismatches(titles)
+    assert mismatches.empty, mismatches.to_string()
+
+
+def test_missing_titles_clean_to_empty_strings():
+    from src.utils.text_cleaner import clean_texts
+
+    titles = pd.Series([np.nan, None, "AI marketing", np.nan], index=[10, 11, 12, 13], dtype="object")
+    cleaned = clean_texts(titles)
+    assert cleaned.tolist() == _reference(titles).tolist()
+    assert cleaned.iloc[[0, 1, 3]].tolist() == ["", "", ""]
+    assert cleaned.index.tolist() == [10, 11, 12, 13]
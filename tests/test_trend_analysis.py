@@ -0,0 +1,128 @@
+# tests/test_trend_analysis.py
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("sklearn")
+
+from src.analyzers import clustering
+from src.analyzers import trend_sentiment_analyzer as analyzer
+from src.database import schema
+
+GROUPS = [
+    ["marketing", "automation", "email", "campaign"],
+    ["python", "pandas", "dataframe", "analytics"],
+    ["climate", "solar", "energy", "battery"],
+    ["football", "league", "transfer", "coach"],
+]
+DIM = 8
+
+
+def _embed(texts, **_):
+    # Each title embeds near the centre of its word group, with a little per-title noise
+    vectors = []
+    for text in texts:
+        group = next((i for i, words in enumerate(GROUPS) if words[0] in text.lower()), 0)
+        seed = int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+        centre = np.zeros(DIM, dtype=np.float32)
+        centre[group * 2] = 5.0
+        vectors.append(centre + np.random.default_rng(seed).normal(scale=0.3, size=DIM).astype(np.float32))
+    return np.vstack(vectors) if vectors else np.empty((0, DIM), dtype=np.float32)
+
+
+class _Index:
+    def add(self, ids, vectors):
+        pass
+
+
+def _content(n, start, offset=0):
+    rows = []
+    for i in range(offset, offset + n):
+        words = GROUPS[i % len(GROUPS)]
+        rows.append({
+            "title": f"{words[0]} {words[1 + i % 3]} story {i}",
+            "url": f"https://example.com/{i}",
+            "publishedAt": (pd.Timestamp(start, tz="UTC") + pd.Timedelta(days=i)).isoformat(),
+            "source": "test",
+            "summary": None,
+        })
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    # NLTK data, the sentiment lexicon and the sentence encoder are not needed to test the refit logic
+    monkeypatch.setattr(schema, "DB_PATH", tmp_path / "content.db")
+    monkeypatch.setattr(clustering, "MODELS_DIR", tmp_path / "models")
+    monkeypatch.setattr(analyzer, "clean_texts", lambda texts: pd.Series(texts).fillna("").str.lower())
+    monkeypatch.setattr(analyzer, "score_texts", lambda texts, **_: [0.0] * len(texts))
+    monkeypatch.setattr(analyzer, "encode_with_cache", _embed)
+    monkeypatch.setattr(analyzer, "get_vector_index", lambda *_: _Index())
+
+    from src.database.db_writer import upsert_content
+    conn = schema.get_connection()
+    upsert_content(conn, _content(200, "2024-01-01"))
+    conn.close()
+
+
+def _assert_one_model_space(df):
+    # Every row's cluster and coordinates must come from the models saved by the last refit
+    assert df["fit_id"].nunique() == 1
+    embeddings = _embed(analyzer.build_embedding_texts(df, analyzer.EMBED_INCLUDE_SUMMARY))
+    centroids = clustering.load_centroids(analyzer.DEFAULT_MODEL_NAME)
+    pca = clustering.load_model("projection_2d")
+    np.testing.assert_array_equal(df["cluster"].to_numpy(), clustering.assign_clusters(embeddings, centroids))
+    np.testing.assert_allclose(df[["x", "y"]].to_numpy(), pca.transform(embeddings), rtol=1e-4, atol=1e-4)
+
+
+def test_slice_refit_then_full_run_keeps_one_model_space(db):
+    from src.database.db_reader import read_analysis
+
+    df, _ = analyzer.analyze_trends_and_sentiment()
+    _assert_one_model_space(df)
+
+    # A refit over a recent window replaces the saved corpus-level models
+    window, _ = analyzer.analyze_trends_and_sentiment(since="2024-06-01", force_refit=True)
+    assert 0 < len(window) < len(df)
+    _assert_one_model_space(window)
+
+    from src.database.db_writer import upsert_content
+    conn = schema.get_connection()
+    upsert_content(conn, _content(10, "2024-01-01", offset=200))
+    conn.close()
+
+    # The next full run must not keep labels / coordinates from the earlier full fit
+    full, _ = analyzer.analyze_trends_and_sentiment()
+    assert len(full) == 210
+    _assert_one_model_space(full)
+    _assert_one_model_space(read_analysis())
+
+
+def test_incremental_run_only_touches_new_rows(db):
+    from src.database.db_writer import upsert_content
+
+    first, _ = analyzer.analyze_trends_and_sentiment()
+    conn = schema.get_connection()
+    upsert_content(conn, _content(5, "2024-01-01", offset=200))
+    conn.close()
+
+    second, _ = analyzer.analyze_trends_and_sentiment()
+    assert second["fit_id"].nunique() == 1
+    assert second["fit_id"].iloc[0] == first["fit_id"].iloc[0]
+    _assert_one_model_space(second)
+
+
+def test_streaming_run_keeps_batch_models(db):
+    analyzer.analyze_trends_and_sentiment()
+    centroids = clustering.load_centroids(analyzer.DEFAULT_MODEL_NAME)
+
+    summary = analyzer.analyze_trends_streaming(chunk_size=64, n_clusters=3)
+    assert summary["rows"] == 200
+    np.testing.assert_array_equal(clustering.load_centroids(analyzer.DEFAULT_MODEL_NAME), centroids)
+
+    # The streamed rows carry their own fit_id, so the next batch run does not keep their labels
+    second, _ = analyzer.analyze_trends_and_sentiment()
+    _assert_one_model_space(second)
@@ -0,0 +1,65 @@
+# tests/test_vector_index.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analyzers import vector_index
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).normal(size=(300, 8)).astype(np.float32)
+
+
+@pytest.mark.parametrize("trained", [False, True])
+def test_retain_drops_deleted_ids_and_keeps_search_consistent(tmp_path, vectors, trained):
+    pytest.importorskip("sklearn")
+    ids = [f"id{i}" for i in range(len(vectors))]
+    index = vector_index.VectorIndex("test-model", tmp_path)
+    index.add(ids, vectors)
+    if trained:
+        index.train(n_lists=16)
+
+    assert index.retain(ids[::2]) == 150
+    assert index.retain(ids[::2]) == 0
+
+    reopened = vector_index.VectorIndex("test-model", tmp_path)
+    assert reopened.ids == ids[::2]
+    assert reopened.is_trained == trained
+    for row in (0, 4, 298):
+        assert reopened.search(vectors[row], 1, nprobe=16)[0][0][0] == ids[row]
+    assert all(row_id in set(ids[::2]) for row_id, _ in reopened.search(vectors[1], 10, exact=True)[0])
+
+
+def test_prune_vector_indexes_can_empty_an_index(tmp_path, vectors):
+    vector_index.VectorIndex("test-model", tmp_path).add(["a", "b"], vectors[:2])
+    assert vector_index.prune_vector_indexes([], base_dir=tmp_path) == 2
+
+    index = vector_index.VectorIndex("test-model", tmp_path)
+    assert len(index) == 0
+    index.add(["c"], vectors[:1])
+    assert vector_index.VectorIndex("test-model", tmp_path).ids == ["c"]
+
+
+def test_find_similar_skips_deleted_content(tmp_path, vectors, monkeypatch):
+    from src.analyzers import model_registry
+    from src.database import db_reader
+
+    # The three closest vectors belong to content that is no longer stored
+    index = vector_index.VectorIndex("test-model", tmp_path)
+    stored = np.vstack([vectors[0]] * 3 + [vectors[0] + 0.1, vectors[1]])
+    index.add(["gone1", "gone2", "gone3", "live1", "live2"], stored)
+    monkeypatch.setattr(vector_index, "_indexes", {"test-model": index})
+
+    class Model:
+        def encode(self, texts, **_):
+            return vectors[:1]
+
+    monkeypatch.setattr(model_registry, "get_sentence_model", lambda *_: Model())
+    monkeypatch.setattr(db_reader, "read_content_by_ids", lambda ids, columns: pd.DataFrame(
+        [{"id": row_id, "title": row_id, "url": "", "source": "", "publishedAt": "", "summary": None}
+         for row_id in ids if row_id.startswith("live")], columns=columns))
+
+    similar = vector_index.find_similar("query", k=2, model_name="test-model", min_score=-1.0)
+    assert similar["id"].tolist() == ["live1", "live2"]